@@ -3,18 +3,55 @@
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+import logging
+import math
+import multiprocessing
 import os
 import re
 import sys
-import difflib
-from typing import Any, Dict, List, Tuple
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import CancelledError, Future, as_completed
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+from flask import Flask, Response, jsonify, request, stream_with_context
+
+import canonicalize
+from canonicalize import (
+    match_program,
+    match_university,
+    reload_canon,
+    rules_resolve,
+    split_fallback,
+    watch_canon,
+)
+from cluster import cluster_strings
+from json_stream import iter_rows
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from metrics import Registry
+from scheduler import MicroBatchScheduler
 
-from flask import Flask, jsonify, request
-from huggingface_hub import hf_hub_download
-from llama_cpp import Llama  # CPU-only by default if N_GPU_LAYERS=0
+if TYPE_CHECKING:  # the model stack is imported lazily; see _load_llm
+    from llama_cpp import Llama, LlamaGrammar
 
 app = Flask(__name__)
+log = logging.getLogger("llm_hosting")
+
+_PROCESS_START = time.monotonic()
 
 # ---------------- Model config ----------------
 MODEL_REPO = os.getenv(
@@ -26,46 +63,62 @@ MODEL_FILE = os.getenv(
     "tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf",
 )
 
-N_THREADS = int(os.getenv("N_THREADS", str(os.cpu_count() or 2)))
-N_CTX = int(os.getenv("N_CTX", "2048"))
+# Local GGUF path; when set (or models/<MODEL_FILE> exists) the hub is skipped.
+MODEL_PATH = os.getenv("MODEL_PATH", "")
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+
+# Load the model and run one tiny inference at startup instead of on the
+# first request (also enabled by --warmup).
+WARMUP = os.getenv("WARMUP", "0").lower() in ("1", "true", "yes")
+
+# llama.cpp threads / prompt batch / context size. Unset (0) values come from
+# TUNING_FILE when it exists (written by tune.py), then from DEFAULT_LLM_PARAMS.
+N_THREADS = int(os.getenv("N_THREADS", "0"))
+N_BATCH = int(os.getenv("N_BATCH", "0"))
+N_CTX = int(os.getenv("N_CTX", "0"))
+TUNING_FILE = os.getenv("TUNING_FILE", "llm_tuning.json")
+DEFAULT_LLM_PARAMS = {"n_threads": os.cpu_count() or 2, "n_batch": 512, "n_ctx": 2048}
 N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "0"))  # 0 → CPU-only
 
-CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", "canon_universities.txt")
-CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", "canon_programs.txt")
+# Rows handed to each CLI pool worker at a time (small keeps output flowing).
+POOL_CHUNKSIZE = int(os.getenv("POOL_CHUNKSIZE", "8"))
 
-# Precompiled, non-greedy JSON object matcher to tolerate chatter around JSON
-JSON_OBJ_RE = re.compile(r"\{.*?\}", re.DOTALL)
+# HTTP micro-batching: rows from concurrent requests are collected for up to
+# BATCH_MAX_WAIT_MS (or until BATCH_MAX_SIZE rows) before the model runs them.
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
 
-# ---------------- Canonical lists + abbrev maps ----------------
-def _read_lines(path: str) -> List[str]:
-    """Read non-empty, stripped lines from a file (UTF-8)."""
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return [ln.strip() for ln in f if ln.strip()]
-    except FileNotFoundError:
-        return []
+# Load shedding: /standardize answers 503 + Retry-After while this many rows
+# wait for the model (0 = unbounded); rows that would overflow it mid-request
+# get the rules-only result instead of queueing.
+MAX_QUEUE_ROWS = int(os.getenv("MAX_QUEUE_ROWS", "256"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "1"))
 
+# Per-request deadline (override with ?timeout_ms=; 0 = none). Rows that
+# cannot finish in time fall back to the rules-only result.
+REQUEST_TIMEOUT_MS = float(os.getenv("REQUEST_TIMEOUT_MS", "30000"))
 
-CANON_UNIS = _read_lines(CANON_UNIS_PATH)
-CANON_PROGS = _read_lines(CANON_PROGS_PATH)
+# Model results kept per exact program text (0 disables the cache).
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
 
-ABBREV_UNI: Dict[str, str] = {
-    r"(?i)^mcg(\.|ill)?$": "McGill University",
-    r"(?i)^(ubc|u\.?b\.?c\.?)$": "University of British Columbia",
-    r"(?i)^uoft$": "University of Toronto",
-}
+# Poll the canonical list files and hot-reload them (seconds; 0 disables).
+# POST /admin/reload-canon forces a reload; set ADMIN_TOKEN to protect it.
+CANON_WATCH_SECONDS = float(os.getenv("CANON_WATCH_SECONDS", "2"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
-COMMON_UNI_FIXES: Dict[str, str] = {
-    "McGiill University": "McGill University",
-    "Mcgill University": "McGill University",
-    # Normalize 'Of' → 'of'
-    "University Of British Columbia": "University of British Columbia",
-}
+# Precompiled, non-greedy JSON object matcher to tolerate chatter around JSON
+JSON_OBJ_RE = re.compile(r"\{.*?\}", re.DOTALL)
 
-COMMON_PROG_FIXES: Dict[str, str] = {
-    "Mathematic": "Mathematics",
-    "Info Studies": "Information Studies",
-}
+# Constrain decoding to the exact output object; generation ends at its "}".
+GRAMMAR_DECODING = os.getenv("GRAMMAR_DECODING", "1").lower() in ("1", "true", "yes")
+MAX_TOKENS = int(os.getenv("MAX_TOKENS", "128"))
+
+OUTPUT_GBNF = r'''
+root   ::= "{" ws "\"standardized_program\"" ws ":" ws string ws "," ws "\"standardized_university\"" ws ":" ws string ws "}"
+string ::= "\"" char* "\""
+char   ::= [^"\\\x00-\x1f] | "\\" (["\\/bfnrt] | "u" [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F])
+ws     ::= " "?
+'''
 
 # ---------------- Few-shot prompt ----------------
 SYSTEM_PROMPT = (
@@ -111,104 +164,378 @@ FEW_SHOTS: List[Tuple[Dict[str, str], Dict[str, str]]] = [
 ]
 
 _LLM: Llama | None = None
+_MODEL_PATH: str | None = None  # set in pool workers so they skip the hub
+_LLM_LOCK = threading.Lock()
 
+# Readiness: set once the model has loaded (and warmed, when enabled).
+_READY = threading.Event()
+READY_INFO: Dict[str, Any] = {}
 
-def _load_llm() -> Llama:
-    """Download (or reuse) the GGUF file and initialize llama.cpp."""
-    global _LLM
-    if _LLM is not None:
-        return _LLM
 
-    model_path = hf_hub_download(
+def _resolve_model_path() -> str:
+    """Local GGUF path: MODEL_PATH, then MODEL_DIR/MODEL_FILE, then the hub."""
+    if MODEL_PATH:
+        if not os.path.isfile(MODEL_PATH):
+            raise FileNotFoundError(f"MODEL_PATH does not exist: {MODEL_PATH}")
+        return MODEL_PATH
+    local = os.path.join(MODEL_DIR, MODEL_FILE)
+    if os.path.isfile(local):
+        return local
+    from huggingface_hub import hf_hub_download
+
+    return hf_hub_download(
         repo_id=MODEL_REPO,
         filename=MODEL_FILE,
-        local_dir="models",
+        local_dir=MODEL_DIR,
         local_dir_use_symlinks=False,
         force_filename=MODEL_FILE,
     )
 
-    _LLM = Llama(
+
+def _read_tuning(path: str) -> Dict[str, int]:
+    """The "best" settings recorded by tune.py, or {} if there are none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        log.warning("ignoring tuning file %s: %s", path, exc)
+        return {}
+    best = data.get("best") if isinstance(data, dict) else None
+    if not isinstance(best, dict):
+        log.warning("ignoring tuning file %s: no \"best\" settings", path)
+        return {}
+    cpus = (data.get("host") or {}).get("cpu_count")
+    if cpus and cpus != os.cpu_count():
+        log.warning(
+            "tuning file %s was measured on %s CPUs, this host has %s",
+            path,
+            cpus,
+            os.cpu_count(),
+        )
+    return {
+        key: value
+        for key, value in best.items()
+        if key in DEFAULT_LLM_PARAMS and isinstance(value, int) and value > 0
+    }
+
+
+def _llm_params() -> Tuple[Dict[str, int], str]:
+    """llama.cpp settings to load with, and where they came from.
+
+    Env vars (and pool workers' thread budgets) win over the tuning file,
+    which wins over the built-in defaults.
+    """
+    explicit = {"n_threads": N_THREADS, "n_batch": N_BATCH, "n_ctx": N_CTX}
+    tuned = _read_tuning(TUNING_FILE) if TUNING_FILE else {}
+    params = {
+        key: explicit[key] or tuned.get(key) or default
+        for key, default in DEFAULT_LLM_PARAMS.items()
+    }
+    from_file = [key for key in tuned if not explicit[key]]
+    return params, TUNING_FILE if from_file else "defaults"
+
+
+def _new_llm(model_path: str, params: Dict[str, int]) -> Llama:
+    """Initialize llama.cpp with the given n_threads / n_batch / n_ctx."""
+    # use_mmap lets every pool worker share one page-cached copy of the weights
+    from llama_cpp import Llama  # CPU-only by default if N_GPU_LAYERS=0
+
+    return Llama(
         model_path=model_path,
-        n_ctx=N_CTX,
-        n_threads=N_THREADS,
         n_gpu_layers=N_GPU_LAYERS,
+        use_mmap=True,
         verbose=False,
+        **params,
+    )
+
+
+def _warm(llm: Llama) -> None:
+    """One throwaway completion so weights are paged in and buffers allocated."""
+    llm.create_chat_completion(
+        messages=_build_messages(FEW_SHOTS[0][0]["program"]),
+        temperature=0.0,
+        max_tokens=1,
+    )
+
+
+def _load_llm(warm: bool = False) -> Llama:
+    """Resolve the GGUF file and initialize llama.cpp (once per process).
+
+    Concurrent callers wait on the lock, so nobody sees a half-built or
+    still-warming model.
+    """
+    global _LLM
+    if _LLM is not None:
+        return _LLM
+
+    with _LLM_LOCK:
+        if _LLM is not None:
+            return _LLM
+        t0 = time.monotonic()
+        model_path = _MODEL_PATH or _resolve_model_path()
+        params, params_source = _llm_params()
+        t1 = time.monotonic()
+        llm = _new_llm(model_path, params)
+        t2 = time.monotonic()
+        if warm:
+            _warm(llm)
+        t3 = time.monotonic()
+        _LLM = llm
+
+    READY_INFO.pop("error", None)
+    READY_INFO.update(
+        {
+            "model_path": model_path,
+            "llm_params": params,
+            "llm_params_source": params_source,
+            "resolve_seconds": round(t1 - t0, 3),
+            "load_seconds": round(t2 - t1, 3),
+            "warmup_seconds": round(t3 - t2, 3) if warm else None,
+            "time_to_ready_seconds": round(t3 - _PROCESS_START, 3),
+        }
+    )
+    _READY.set()
+    log.info(
+        "model ready in %.2fs (resolve %.2fs, load %.2fs, warmup %s) from %s with %s (%s)",
+        t3 - _PROCESS_START,
+        t1 - t0,
+        t2 - t1,
+        f"{t3 - t2:.2f}s" if warm else "skipped",
+        model_path,
+        params,
+        params_source,
     )
     return _LLM
 
 
-def _split_fallback(text: str) -> Tuple[str, str]:
-    """Simple, rules-first parser if the model returns non-JSON."""
-    s = re.sub(r"\s+", " ", (text or "")).strip().strip(",")
-    parts = [p.strip() for p in re.split(r",| at | @ ", s) if p.strip()]
-    prog = parts[0] if parts else ""
-    uni = parts[1] if len(parts) > 1 else ""
+def set_model(llm: Any) -> None:
+    """Serve with an already-built model object (benchmarks, tests, stubs).
 
-    # High-signal expansions
-    if re.fullmatch(r"(?i)mcg(ill)?(\.)?", uni or ""):
-        uni = "McGill University"
-    if re.fullmatch(
-        r"(?i)(ubc|u\.?b\.?c\.?|university of british columbia)",
-        uni or "",
-    ):
-        uni = "University of British Columbia"
+    Anything with llama-cpp's `create_chat_completion` signature works.
+    """
+    global _LLM
+    with _LLM_LOCK:
+        _LLM = llm
+    READY_INFO.pop("error", None)
+    READY_INFO["model_path"] = None
+    _READY.set()
 
-    # Title-case program; normalize 'Of' → 'of' for universities
-    prog = prog.title()
-    if uni:
-        uni = re.sub(r"\bOf\b", "of", uni.title())
-    else:
-        uni = "Unknown"
-    return prog, uni
 
+def _load_in_background(warm: bool = False) -> threading.Thread:
+    """Start loading (and optionally warming) the model without blocking the server."""
 
-def _best_match(name: str, candidates: List[str], cutoff: float = 0.86) -> str | None:
-    """Fuzzy match via difflib (lightweight, Replit-friendly)."""
-    if not name or not candidates:
-        return None
-    matches = difflib.get_close_matches(name, candidates, n=1, cutoff=cutoff)
-    return matches[0] if matches else None
+    def run() -> None:
+        try:
+            _load_llm(warm=warm)
+        except Exception as exc:  # keep serving /ready with the reason
+            READY_INFO["error"] = f"{type(exc).__name__}: {exc}"
+            log.exception("model load failed")
+
+    thread = threading.Thread(target=run, name="model-load", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------- Metrics ----------------
+# Hot-path metrics are a perf_counter pair plus one histogram bucket update;
+# counters that already exist elsewhere are read only when /metrics is scraped.
+METRICS = Registry()
+INFERENCE_SECONDS = METRICS.histogram(
+    "llm_inference_seconds",
+    "Wall time of one model completion.",
+)
+NORMALIZE_SECONDS = METRICS.histogram(
+    "standardizer_normalize_seconds",
+    "Post-model canonical normalization time per field.",
+    labelnames=("field",),
+)
+CANON_MATCHES = METRICS.counter(
+    "standardizer_canonical_matches_total",
+    "Post-model normalization outcome per field: exact, fuzzy or none.",
+    labelnames=("field", "match"),
+)
+REQUEST_SECONDS = METRICS.histogram(
+    "standardize_request_seconds",
+    "Time to finish a /standardize request (json or stream response).",
+    labelnames=("mode",),
+)
+REJECTED_REQUESTS = METRICS.counter(
+    "standardize_rejected_total",
+    "/standardize requests refused with 503 because the model queue was full.",
+)
+METRICS.collect(
+    "standardizer_rows_total",
+    "Rows resolved, by path.",
+    lambda: {(k,): v for k, v in PATH_COUNTS.items()},
+    kind="counter",
+    labelnames=("path",),
+)
+METRICS.collect(
+    "llm_model_calls_total",
+    "Model completions run.",
+    lambda: DECODE_COUNTS["model_calls"],
+    kind="counter",
+)
+METRICS.collect(
+    "llm_completion_tokens_total",
+    "Tokens generated by the model.",
+    lambda: DECODE_COUNTS["completion_tokens"],
+    kind="counter",
+)
+METRICS.collect(
+    "llm_json_fallbacks_total",
+    "Model outputs that failed to parse and used the rules-based split.",
+    lambda: DECODE_COUNTS["fallbacks"],
+    kind="counter",
+)
+METRICS.collect(
+    "scheduler_queue_depth",
+    "Rows waiting for the model.",
+    lambda: SCHEDULER.queue_depth(),
+)
+METRICS.collect(
+    "scheduler_batches_total",
+    "Model batches run by the micro-batching scheduler.",
+    lambda: SCHEDULER.stats()["batches"],
+    kind="counter",
+)
+METRICS.collect(
+    "result_cache_entries",
+    "Model results held in the LRU cache.",
+    lambda: len(RESULT_CACHE),
+)
+METRICS.collect(
+    "canon_version",
+    "Generation of the canonical lists in use (bumps on every reload).",
+    lambda: canonicalize.CANON.version,
+)
+METRICS.collect(
+    "llm_model_ready",
+    "1 once the model is loaded and can serve.",
+    lambda: 1 if _READY.is_set() else 0,
+)
+
+
+def _observe_normalize(field: str, confidence: float, started: float) -> None:
+    """Record one post-model normalization: its time and match outcome."""
+    NORMALIZE_SECONDS.observe(time.perf_counter() - started, field=field)
+    if confidence >= 1.0:
+        match = "exact"
+    elif confidence > 0.0:
+        match = "fuzzy"
+    else:
+        match = "none"
+    CANON_MATCHES.inc(field=field, match=match)
 
 
 def _post_normalize_program(prog: str) -> str:
     """Apply common fixes, title case, then canonical/fuzzy mapping."""
-    p = (prog or "").strip()
-    p = COMMON_PROG_FIXES.get(p, p)
-    p = p.title()
-    if p in CANON_PROGS:
-        return p
-    match = _best_match(p, CANON_PROGS, cutoff=0.84)
-    return match or p
+    started = time.perf_counter()
+    name, confidence = match_program(prog)
+    _observe_normalize("program", confidence, started)
+    return name
 
 
 def _post_normalize_university(uni: str) -> str:
     """Expand abbreviations, apply common fixes, capitalization, and canonical map."""
-    u = (uni or "").strip()
+    started = time.perf_counter()
+    name, confidence = match_university(uni)
+    _observe_normalize("university", confidence, started)
+    return name
 
-    # Abbreviations
-    for pat, full in ABBREV_UNI.items():
-        if re.fullmatch(pat, u):
-            u = full
-            break
 
-    # Common spelling fixes
-    u = COMMON_UNI_FIXES.get(u, u)
+# ---------------- Path accounting + result cache ----------------
+PATH_COUNTS: Dict[str, int] = {"fast_path": 0, "cache": 0, "model_path": 0}
+_PATH_LOCK = threading.Lock()
 
-    # Normalize 'Of' → 'of'
-    if u:
-        u = re.sub(r"\bOf\b", "of", u.title())
 
-    # Canonical or fuzzy map
-    if u in CANON_UNIS:
-        return u
-    match = _best_match(u, CANON_UNIS, cutoff=0.86)
-    return match or u or "Unknown"
+def _record_path(path: str) -> None:
+    """Count one row as resolved by the fast path or by the model."""
+    with _PATH_LOCK:
+        PATH_COUNTS[path] = PATH_COUNTS.get(path, 0) + 1
 
 
-def _call_llm(program_text: str) -> Dict[str, str]:
-    """Query the tiny LLM and return standardized fields."""
-    llm = _load_llm()
+class _ResultCache:
+    """Thread-safe LRU keyed by the exact program text."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Dict[str, str] | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, str]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+# Entries are (canon version, raw model answer, normalized result). The raw
+# answer does not depend on the canonical lists, so after a reload stale
+# entries are re-normalized on their next hit instead of re-running the model.
+RESULT_CACHE = _ResultCache(RESULT_CACHE_SIZE)
+_CacheEntry = Tuple[int, Tuple[str, str], Dict[str, str]]
+
+
+def _normalize_output(std_prog: str, std_uni: str) -> Dict[str, str]:
+    """Map a raw model answer onto the canonical lists."""
+    return {
+        "standardized_program": _post_normalize_program(std_prog),
+        "standardized_university": _post_normalize_university(std_uni),
+    }
+
+
+def _cached_result(program_text: str) -> Dict[str, str] | None:
+    """Cached result for `program_text`, refreshed if the lists changed since."""
+    entry: _CacheEntry | None = RESULT_CACHE.get(program_text)
+    if entry is None:
+        return None
+    version, raw, result = entry
+    current = canonicalize.CANON.version
+    if version != current:
+        result = _normalize_output(*raw)
+        RESULT_CACHE.put(program_text, (current, raw, result))
+    return result
+
 
+def _call_llm_cached(program_text: str) -> Dict[str, str]:
+    """Run the model for one program string and remember the result."""
+    version = canonicalize.CANON.version
+    raw = _model_output(program_text)
+    result = _normalize_output(*raw)
+    RESULT_CACHE.put(program_text, (version, raw, result))
+    return result
+
+
+def _resolve(program_text: str) -> Tuple[Dict[str, str], str]:
+    """Standardize one program string; also return which path resolved it."""
+    result = rules_resolve(program_text)
+    if result is not None:
+        return result, "fast_path"
+    result = _cached_result(program_text)
+    if result is not None:
+        return result, "cache"
+    return _call_llm_cached(program_text), "model_path"
+
+
+def _build_messages(program_text: str) -> List[Dict[str, str]]:
+    """System prompt, few-shot examples and the row to standardize."""
     messages = [{"role": "system", "content": SYSTEM_PROMPT}]
     for x_in, x_out in FEW_SHOTS:
         messages.append(
@@ -226,38 +553,99 @@ def _call_llm(program_text: str) -> Dict[str, str]:
             "content": json.dumps({"program": program_text}, ensure_ascii=False),
         }
     )
+    return messages
+
+
+_GRAMMAR: LlamaGrammar | None = None
+
+# Per-process decoding counters (model calls only; merged from CLI workers).
+DECODE_COUNTS: Dict[str, int] = {
+    "model_calls": 0,
+    "completion_tokens": 0,
+    "fallbacks": 0,
+}
+
+
+def _output_grammar() -> LlamaGrammar | None:
+    """Compiled output grammar, or None when GRAMMAR_DECODING is off."""
+    global _GRAMMAR
+    if GRAMMAR_DECODING and _GRAMMAR is None:
+        from llama_cpp import LlamaGrammar
+
+        _GRAMMAR = LlamaGrammar.from_string(OUTPUT_GBNF, verbose=False)
+    return _GRAMMAR if GRAMMAR_DECODING else None
+
+
+def _record_decode(counts: Dict[str, int]) -> None:
+    """Add model-call counters (from this process or a pool worker)."""
+    with _PATH_LOCK:
+        for key, value in counts.items():
+            DECODE_COUNTS[key] = DECODE_COUNTS.get(key, 0) + value
+
+
+def _decode_summary() -> Dict[str, float]:
+    """Decoding counters plus tokens per call and fallback rate."""
+    with _PATH_LOCK:
+        snap: Dict[str, float] = dict(DECODE_COUNTS)
+    calls = snap["model_calls"]
+    snap["avg_completion_tokens"] = snap["completion_tokens"] / calls if calls else 0.0
+    snap["fallback_rate"] = snap["fallbacks"] / calls if calls else 0.0
+    return snap
 
+
+def _call_llm(program_text: str) -> Dict[str, str]:
+    """Query the tiny LLM and return standardized fields."""
+    return _normalize_output(*_model_output(program_text))
+
+
+def _parse_output(text: str, program_text: str) -> Tuple[str, str, int]:
+    """(program, university, fallback) from the model's reply text.
+
+    fallback is 1 when the reply was not valid JSON and the rules-based
+    split of `program_text` was used instead.
+    """
+    try:
+        match = None if GRAMMAR_DECODING else JSON_OBJ_RE.search(text)
+        obj = json.loads(match.group(0) if match else text)
+        return (
+            str(obj.get("standardized_program", "")).strip(),
+            str(obj.get("standardized_university", "")).strip(),
+            0,
+        )
+    except Exception:
+        # Only reachable with grammar decoding if MAX_TOKENS cut the object.
+        std_prog, std_uni = split_fallback(program_text)
+        return std_prog, std_uni, 1
+
+
+def _model_output(program_text: str) -> Tuple[str, str]:
+    """Query the tiny LLM; return its (program, university) before normalization."""
+    llm = _load_llm()
+    messages = _build_messages(program_text)
+
+    started = time.perf_counter()
     out = llm.create_chat_completion(
         messages=messages,
         temperature=0.0,
-        max_tokens=128,
+        max_tokens=MAX_TOKENS,
         top_p=1.0,
+        grammar=_output_grammar(),
     )
+    INFERENCE_SECONDS.observe(time.perf_counter() - started)
 
     text = (out["choices"][0]["message"]["content"] or "").strip()
-    try:
-        match = JSON_OBJ_RE.search(text)
-        obj = json.loads(match.group(0) if match else text)
-        std_prog = str(obj.get("standardized_program", "")).strip()
-        std_uni = str(obj.get("standardized_university", "")).strip()
-    except Exception:
-        std_prog, std_uni = _split_fallback(program_text)
-
-    std_prog = _post_normalize_program(std_prog)
-    std_uni = _post_normalize_university(std_uni)
-    return {
-        "standardized_program": std_prog,
-        "standardized_university": std_uni,
-    }
+    std_prog, std_uni, fallback = _parse_output(text, program_text)
 
+    usage = out.get("usage") or {}
+    _record_decode(
+        {
+            "model_calls": 1,
+            "completion_tokens": int(usage.get("completion_tokens") or 0),
+            "fallbacks": fallback,
+        }
+    )
 
-def _normalize_input(payload: Any) -> List[Dict[str, Any]]:
-    """Accept either a list of rows or {'rows': [...]}."""
-    if isinstance(payload, list):
-        return payload
-    if isinstance(payload, dict) and isinstance(payload.get("rows"), list):
-        return payload["rows"]
-    return []
+    return std_prog, std_uni
 
 
 @app.get("/")
@@ -266,65 +654,511 @@ def health() -> Any:
     return jsonify({"ok": True})
 
 
+@app.get("/ready")
+def ready() -> Any:
+    """Readiness check: 200 once the model can serve, 503 until then.
+
+    The server starts loading the model in the background at startup, so
+    this turns 200 without any request having to trigger the load.
+    """
+    body = {"ready": _READY.is_set(), **READY_INFO}
+    return jsonify(body), (200 if body["ready"] else 503)
+
+
+# ---------------- HTTP micro-batching ----------------
+def _run_model_batch(texts: List[str]) -> List[Dict[str, str]]:
+    """Scheduler callback: run the model over one batch of program strings.
+
+    llama-cpp-python's chat API decodes one sequence at a time, so a batch
+    runs back-to-back on the scheduler thread; the gain is cross-request
+    fairness, de-duplication and keeping the model single-threaded.
+    """
+    return [_call_llm_cached(text) for text in texts]
+
+
+SCHEDULER = MicroBatchScheduler(
+    _run_model_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+)
+
+
+def _rules_only(program_text: str) -> Dict[str, str]:
+    """Model-free answer: the rules-based split, then canonical mapping."""
+    return _normalize_output(*split_fallback(program_text))
+
+
+def _remaining(deadline: float | None) -> float | None:
+    """Seconds left until `deadline` (monotonic clock), or None for no deadline."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def _should_shed(deadline: float | None) -> bool:
+    """True if a new model row would overflow the queue or miss its deadline."""
+    depth = SCHEDULER.queue_depth()
+    if MAX_QUEUE_ROWS and depth >= MAX_QUEUE_ROWS:
+        return True
+    if deadline is None:
+        return False
+    return time.monotonic() + (depth + 1) * SCHEDULER.row_seconds() > deadline
+
+
+def _submit(
+    program_text: str,
+    request_id: Hashable,
+    deadline: float | None = None,
+) -> Future:
+    """Resolve fast-path, cached and shed rows now; queue the rest for the model."""
+    result = rules_resolve(program_text)
+    path = "fast_path"
+    if result is None:
+        result = _cached_result(program_text)
+        path = "cache"
+    if result is None and _should_shed(deadline):
+        result = _rules_only(program_text)
+        path = "shed"
+    _record_path(path if result is not None else "model_path")
+    if result is None:
+        return SCHEDULER.submit(program_text, request_id)
+    done: Future = Future()
+    done.set_result(result)
+    return done
+
+
+def _finish(
+    row: Dict[str, Any],
+    future: Future,
+    deadline: float | None,
+    request_id: Hashable,
+) -> Dict[str, Any]:
+    """Wait for a row until the deadline; past it, answer with rules only.
+
+    The first late row drops the rest of the request's queued rows, so no
+    model time is spent on answers nobody will use.
+    """
+    try:
+        result = future.result(timeout=_remaining(deadline))
+    except (CancelledError, TimeoutError):
+        SCHEDULER.drop(request_id)
+        _record_path("deadline_fallback")
+        result = _rules_only((row or {}).get("program") or "")
+    return _apply_result(row, result)
+
+
+@app.get("/stats")
+def stats() -> Any:
+    """Report row paths, scheduler queue metrics and model decoding counters."""
+    with _PATH_LOCK:
+        paths = dict(PATH_COUNTS)
+    return jsonify(
+        {
+            "paths": paths,
+            "result_cache_size": len(RESULT_CACHE),
+            "canon_version": canonicalize.CANON.version,
+            "scheduler": SCHEDULER.stats(),
+            "decode": _decode_summary(),
+        }
+    )
+
+
+@app.post("/admin/reload-canon")
+def admin_reload_canon() -> Any:
+    """Rebuild the canonical list indexes now and swap them in."""
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        return jsonify({"error": "forbidden"}), 403
+    try:
+        return jsonify(reload_canon(force=True))
+    except ValueError as exc:
+        return jsonify({"reloaded": False, "error": str(exc)}), 409
+
+
+@app.get("/metrics")
+def metrics() -> Any:
+    """Counters and latency histograms in Prometheus text format."""
+    return Response(METRICS.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+def _apply_result(row: Dict[str, Any], result: Dict[str, str]) -> Dict[str, Any]:
+    """Copy standardized fields onto the row under the llm-generated keys."""
+    row["llm-generated-program"] = result["standardized_program"]
+    row["llm-generated-university"] = result["standardized_university"]
+    return row
+
+
+def _wants_ndjson() -> bool:
+    """True when the client opted into a streamed NDJSON response."""
+    if request.args.get("stream", "").lower() in ("1", "true", "yes", "ndjson"):
+        return True
+    return "application/x-ndjson" in request.headers.get("Accept", "")
+
+
+def _ndjson_line(obj: Dict[str, Any]) -> str:
+    return json.dumps(obj, ensure_ascii=False) + "\n"
+
+
+def _drain(
+    pending: Deque[Tuple[Dict[str, Any], Future]],
+    ordered: bool,
+    block: bool,
+    deadline: float | None,
+    request_id: Hashable,
+) -> Iterator[str]:
+    """Emit finished rows: the done prefix (ordered) or every done row."""
+    if ordered:
+        while pending and (block or pending[0][1].done()):
+            row, future = pending.popleft()
+            yield _ndjson_line(_finish(row, future, deadline, request_id))
+        return
+
+    if block:
+        rows_by_future = {future: row for row, future in pending}
+        pending.clear()
+        try:
+            for future in as_completed(rows_by_future, timeout=_remaining(deadline)):
+                row = rows_by_future.pop(future)
+                yield _ndjson_line(_finish(row, future, deadline, request_id))
+        except TimeoutError:
+            for future, row in rows_by_future.items():
+                yield _ndjson_line(_finish(row, future, deadline, request_id))
+        return
+
+    for _ in range(len(pending)):
+        row, future = pending.popleft()
+        if future.done():
+            yield _ndjson_line(_finish(row, future, deadline, request_id))
+        else:
+            pending.append((row, future))
+
+
+def _stream_standardized(
+    rows: Iterator[Dict[str, Any]],
+    request_id: Hashable,
+    ordered: bool,
+    deadline: float | None,
+) -> Iterator[str]:
+    """Submit rows as they are parsed and yield each one as NDJSON when ready."""
+    started = time.perf_counter()
+    pending: Deque[Tuple[Dict[str, Any], Future]] = deque()
+    try:
+        try:
+            for row in rows:
+                text = (row or {}).get("program") or ""
+                pending.append((row, _submit(text, request_id, deadline)))
+                yield from _drain(pending, ordered, False, deadline, request_id)
+        except ValueError:
+            # Headers are already sent; finish the rows we have, then report.
+            yield from _drain(pending, ordered, True, deadline, request_id)
+            yield _ndjson_line({"error": "invalid JSON body"})
+            return
+        yield from _drain(pending, ordered, True, deadline, request_id)
+    finally:
+        # Also runs when the client disconnects: stop its queued rows.
+        SCHEDULER.drop(request_id)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, mode="stream")
+
+
+def _request_deadline() -> float | None:
+    """Monotonic deadline from ?timeout_ms= or REQUEST_TIMEOUT_MS (0 = none)."""
+    try:
+        timeout_ms = float(request.args.get("timeout_ms", REQUEST_TIMEOUT_MS))
+    except ValueError:
+        timeout_ms = REQUEST_TIMEOUT_MS
+    if timeout_ms <= 0:
+        return None
+    return time.monotonic() + timeout_ms / 1000.0
+
+
+def _busy_response() -> Any:
+    """503 with a Retry-After sized from the current queue."""
+    REJECTED_REQUESTS.inc()
+    backlog = SCHEDULER.queue_depth() * SCHEDULER.row_seconds()
+    retry_after = max(RETRY_AFTER_SECONDS, math.ceil(backlog))
+    body = jsonify({"rows": [], "error": "server busy, retry later"})
+    return body, 503, {"Retry-After": str(retry_after)}
+
+
 @app.post("/standardize")
 def standardize() -> Any:
-    """Standardize rows from an HTTP request and return JSON."""
-    payload = request.get_json(force=True, silent=True)
-    rows = _normalize_input(payload)
+    """Standardize rows from an HTTP request and return JSON.
 
-    out: List[Dict[str, Any]] = []
-    for row in rows:
-        program_text = (row or {}).get("program") or ""
-        result = _call_llm(program_text)
-        row["llm-generated-program"] = result["standardized_program"]
-        row["llm-generated-university"] = result["standardized_university"]
-        out.append(row)
+    The body (JSON array, {"rows": [...]} or NDJSON) is parsed incrementally
+    and each row is queued as soon as it is read. With ``?stream=1`` (or
+    ``Accept: application/x-ndjson``) rows are written back as NDJSON as
+    they finish: in input order by default, or as soon as each one is done
+    with ``&order=completion``.
+
+    When the model queue is full the request is refused with 503 and
+    Retry-After. Rows still unfinished at the deadline (``?timeout_ms=``,
+    default REQUEST_TIMEOUT_MS) get the rules-only result.
+    """
+    if MAX_QUEUE_ROWS and SCHEDULER.queue_depth() >= MAX_QUEUE_ROWS:
+        return _busy_response()
 
+    request_id = object()
+    started = time.perf_counter()
+    deadline = _request_deadline()
+    rows = iter_rows(request.stream)
+
+    if _wants_ndjson():
+        ordered = request.args.get("order", "input").lower() != "completion"
+        return Response(
+            stream_with_context(
+                _stream_standardized(rows, request_id, ordered, deadline)
+            ),
+            mimetype="application/x-ndjson",
+        )
+
+    try:
+        pending = [
+            (row, _submit((row or {}).get("program") or "", request_id, deadline))
+            for row in rows
+        ]
+    except ValueError:
+        SCHEDULER.drop(request_id)
+        return jsonify({"rows": [], "error": "invalid JSON body"}), 400
+
+    out: List[Dict[str, Any]] = [
+        _finish(row, future, deadline, request_id) for row, future in pending
+    ]
+    REQUEST_SECONDS.observe(time.perf_counter() - started, mode="json")
     return jsonify({"rows": out})
 
 
+def _standardize_row(row: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Add the llm-generated fields to one row; also return the path used."""
+    program_text = (row or {}).get("program") or ""
+    result, path = _resolve(program_text)
+    return _apply_result(row, result), path
+
+
+def _pool_standardize_row(
+    row: Dict[str, Any],
+) -> Tuple[Dict[str, Any], str, Dict[str, int]]:
+    """Pool worker task: standardize a row and report its decoding counters."""
+    before = dict(DECODE_COUNTS)
+    row, path = _standardize_row(row)
+    delta = {key: DECODE_COUNTS[key] - before.get(key, 0) for key in DECODE_COUNTS}
+    return row, path, delta
+
+
+def _auto_pool_size(cpus: int | None = None) -> Tuple[int, int]:
+    """Pick (workers, threads per worker) for this host.
+
+    A few threads per decode scale well; beyond that, separate model
+    workers use the cores better than a wider single decode.
+    """
+    cpus = cpus or os.cpu_count() or 2
+    threads = max(1, min(4, cpus // 4))
+    return max(1, cpus // threads), threads
+
+
+def _pool_init(model_path: str, n_threads: int) -> None:
+    """Pool worker setup: reuse the resolved GGUF path and own thread budget."""
+    global _MODEL_PATH, N_THREADS
+    _MODEL_PATH = model_path
+    N_THREADS = n_threads
+
+
+def _iter_standardized(
+    rows: Iterable[Dict[str, Any]],
+    workers: int = 1,
+    threads_per_worker: int | None = None,
+) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Standardize rows in input order, optionally across K model processes."""
+    if workers <= 1:
+        for row in rows:
+            yield _standardize_row(row)
+        return
+
+    threads = threads_per_worker or max(1, (os.cpu_count() or 2) // workers)
+    # Resolve once up front so workers don't race on the hub download.
+    model_path = _MODEL_PATH or _resolve_model_path()
+    with multiprocessing.Pool(
+        processes=workers,
+        initializer=_pool_init,
+        initargs=(model_path, threads),
+    ) as pool:
+        for row, path, decode in pool.imap(
+            _pool_standardize_row, rows, chunksize=POOL_CHUNKSIZE
+        ):
+            _record_decode(decode)
+            yield row, path
+
+
+def _iter_clustered(
+    rows: Iterable[Dict[str, Any]],
+    workers: int = 1,
+    threads_per_worker: int | None = None,
+    threshold: float = 1.0,
+) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Standardize one representative per cluster of near-identical programs.
+
+    Reads all rows first, clusters their program strings, runs each
+    representative through the normal path once and copies its result to
+    every member. Member rows after the first report the path "clustered".
+    """
+    rows = list(rows)
+    texts = [(row or {}).get("program") or "" for row in rows]
+    representative_of, stats = cluster_strings(texts, threshold)
+    print(
+        "clusters: " + ", ".join(f"{k}={v}" for k, v in stats.items()),
+        file=sys.stderr,
+    )
+
+    reps = list(dict.fromkeys(representative_of[t] for t in texts))
+    probes = ({"program": rep} for rep in reps)
+    results: Dict[str, Tuple[Dict[str, str], str]] = {}
+    for rep, (probe, path) in zip(
+        reps, _iter_standardized(probes, workers, threads_per_worker)
+    ):
+        results[rep] = (
+            {
+                "standardized_program": probe["llm-generated-program"],
+                "standardized_university": probe["llm-generated-university"],
+            },
+            path,
+        )
+
+    reported = set()
+    for row, text in zip(rows, texts):
+        rep = representative_of[text]
+        result, path = results[rep]
+        if rep in reported:
+            path = "clustered"
+        reported.add(rep)
+        yield _apply_result(row, result), path
+
+
+_LLM_FIELDS = ("llm-generated-program", "llm-generated-university")
+
+
+def _row_key(row: Dict[str, Any]) -> str:
+    """Identity of an input row: its URL, or a hash of its non-LLM fields."""
+    url = (row or {}).get("url")
+    if url:
+        return f"url:{url}"
+    fields = {k: v for k, v in (row or {}).items() if k not in _LLM_FIELDS}
+    blob = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return "sha1:" + hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _load_processed_keys(out_path: str) -> Counter:
+    """Count row keys already written to a JSONL output file.
+
+    A final line without a newline is a write torn by a crash; it is cut off
+    so appended rows start on a clean line (that row is simply redone).
+    """
+    done: Counter = Counter()
+    if not os.path.exists(out_path):
+        return done
+
+    good_end = 0
+    torn = False
+    with open(out_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                torn = True
+                break
+            good_end += len(line)
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(row, dict) and all(k in row for k in _LLM_FIELDS):
+                done[_row_key(row)] += 1
+
+    if torn:
+        with open(out_path, "r+b") as f:
+            f.truncate(good_end)
+    return done
+
+
+def _skip_processed(
+    rows: Iterable[Dict[str, Any]],
+    done: Counter,
+) -> Iterator[Dict[str, Any]]:
+    """Drop rows whose key is already in the output (duplicates counted)."""
+    for row in rows:
+        key = _row_key(row)
+        if done[key] > 0:
+            done[key] -= 1
+            _record_path("skipped")
+            continue
+        yield row
+
+
 def _cli_process_file(
     in_path: str,
     out_path: str | None,
     append: bool,
     to_stdout: bool,
+    workers: int = 1,
+    threads_per_worker: int | None = None,
+    resume: bool = False,
+    cluster_threshold: float | None = None,
 ) -> None:
-    """Process a JSON file and write JSONL incrementally."""
-    with open(in_path, "r", encoding="utf-8") as f:
-        rows = _normalize_input(json.load(f))
+    """Stream rows from a JSON/NDJSON file and write JSONL incrementally.
 
+    With `resume`, rows already present in the output file are skipped and
+    new rows are appended, so a crashed run picks up where it stopped.
+    With `cluster_threshold`, near-identical program strings are clustered
+    over the whole file first and the model runs once per cluster (output
+    starts only after the input has been read).
+    """
     sink = sys.stdout if to_stdout else None
+    done: Counter | None = None
     if not to_stdout:
         out_path = out_path or (in_path + ".jsonl")
-        mode = "a" if append else "w"
+        mode = "a" if append or resume else "w"
+        if resume:
+            done = _load_processed_keys(out_path)
         sink = open(out_path, mode, encoding="utf-8")
 
     assert sink is not None  # for type-checkers
 
     try:
-        for row in rows:
-            program_text = (row or {}).get("program") or ""
-            result = _call_llm(program_text)
-            row["llm-generated-program"] = result["standardized_program"]
-            row["llm-generated-university"] = result["standardized_university"]
-
-            json.dump(row, sink, ensure_ascii=False)
-            sink.write("\n")
-            sink.flush()
+        with open(in_path, "rb") as f:
+            rows: Iterable[Dict[str, Any]] = iter_rows(f)
+            if done is not None:
+                rows = _skip_processed(rows, done)
+            if cluster_threshold is None:
+                results = _iter_standardized(rows, workers, threads_per_worker)
+            else:
+                results = _iter_clustered(
+                    rows, workers, threads_per_worker, cluster_threshold
+                )
+            for row, path in results:
+                _record_path(path)
+                json.dump(row, sink, ensure_ascii=False)
+                sink.write("\n")
+                sink.flush()
     finally:
         if sink is not sys.stdout:
             sink.close()
 
+    print(
+        ", ".join(f"{path}: {count} rows" for path, count in PATH_COUNTS.items()),
+        file=sys.stderr,
+    )
+    decode = _decode_summary()
+    print(
+        f"model calls: {decode['model_calls']}, "
+        f"avg completion tokens: {decode['avg_completion_tokens']:.1f}, "
+        f"fallback rate: {decode['fallback_rate']:.1%}",
+        file=sys.stderr,
+    )
 
-if __name__ == "__main__":
-    import argparse
 
+def _parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options, rejecting combinations that cannot work."""
     parser = argparse.ArgumentParser(
         description="Standardize program/university with a tiny local LLM.",
     )
     parser.add_argument(
         "--file",
-        help="Path to JSON input (list of rows or {'rows': [...]})",
+        help="Path to input rows: JSON list, {'rows': [...]} or NDJSON",
         default=None,
     )
     parser.add_argument(
@@ -343,20 +1177,82 @@ if __name__ == "__main__":
         action="store_true",
         help="Append to the output file instead of overwriting.",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip rows already in the output file (matched by url, or a row "
+        "hash when url is missing) and append the rest.",
+    )
     parser.add_argument(
         "--stdout",
         action="store_true",
         help="Write JSON Lines to stdout instead of a file.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--cluster",
+        nargs="?",
+        type=float,
+        const=1.0,
+        default=None,
+        metavar="THRESHOLD",
+        help="CLI only: cluster near-identical program strings across the file "
+        "and standardize each cluster once. By default only exact normalized "
+        "matches are clustered; a THRESHOLD below 1.0 (e.g. 0.8) also merges "
+        "one-typo variants with that trigram Jaccard similarity when both "
+        "resolve to the same canonical program and university.",
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store_true",
+        help="Server only: also run one warm-up inference after the model "
+        "loads at startup (also WARMUP=1); GET /ready turns 200 when done.",
+    )
+    parser.add_argument(
+        "--workers",
+        default="1",
+        help="CLI only: number of model worker processes, or 'auto' to size "
+        "workers x threads from the CPU count.",
+    )
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="CLI only: llama.cpp threads per worker "
+        "(default: CPU count / workers).",
+    )
+    args = parser.parse_args(argv)
+    if args.resume and args.stdout:
+        # resume reads the processed keys back from the output file
+        parser.error("--resume reads the output file; it cannot be used with --stdout")
+    return args
+
+
+if __name__ == "__main__":
+    args = _parse_args()
 
     if args.serve or args.file is None:
         port = int(os.getenv("PORT", "8000"))
+        logging.basicConfig(
+            level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+        )
+        _load_in_background(warm=args.warmup or WARMUP)
+        if CANON_WATCH_SECONDS > 0:
+            watch_canon(CANON_WATCH_SECONDS)
         app.run(host="0.0.0.0", port=port, debug=False)
     else:
+        threads_per_worker = args.threads_per_worker
+        if args.workers == "auto":
+            workers, auto_threads = _auto_pool_size()
+            threads_per_worker = threads_per_worker or auto_threads
+        else:
+            workers = int(args.workers)
         _cli_process_file(
             in_path=args.file,
             out_path=args.out,
             append=bool(args.append),
             to_stdout=bool(args.stdout),
+            workers=workers,
+            threads_per_worker=threads_per_worker,
+            resume=bool(args.resume),
+            cluster_threshold=args.cluster,
         )
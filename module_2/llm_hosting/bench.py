@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""Throughput benchmark for the standardizer, with a pluggable model backend.
+
+Runs rows through the same path as the CLI (fast path -> result cache ->
+model) and reports rows/sec, a per-stage latency breakdown, path/cache hit
+rates and model fallback counts.
+
+    python bench.py                                   # stub model, 100k rows
+    python bench.py --rows 20000 --latency-ms 5       # slower stub
+    python bench.py --backend llama --rows 500        # real TinyLlama
+    python bench.py --json > bench.json
+    python bench.py --startup                         # import/startup times
+
+The stub is deterministic: it answers from a rules-based split of the input,
+sleeps `--latency-ms` per call, and turns `--stub-bad-json` of its answers
+into unparseable chatter (chosen by a hash of the input) so the fallback
+path is exercised too; like the real model, it cannot do that while
+grammar decoding is on (run with GRAMMAR_DECODING=0 to compare).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+import app
+import canonicalize
+
+STAGES = (
+    "fast_path",
+    "cache_lookup",
+    "prompt",
+    "inference",
+    "parse",
+    "post_normalize",
+    "model_call",
+)
+
+
+class StubLlama:
+    """Deterministic stand-in for `llama_cpp.Llama` with fixed latency."""
+
+    def __init__(self, latency_ms: float = 2.0, bad_json: float = 0.0) -> None:
+        self.latency = max(0.0, latency_ms) / 1000.0
+        self.bad_json = bad_json
+
+    def create_chat_completion(
+        self, messages: List[Dict[str, str]], grammar: Any = None, **_: Any
+    ) -> Dict[str, Any]:
+        program = json.loads(messages[-1]["content"]).get("program", "")
+        prog, uni = canonicalize.split_fallback(program)
+        content = json.dumps(
+            {"standardized_program": prog, "standardized_university": uni}
+        )
+        digest = hashlib.sha1(program.encode("utf-8")).digest()
+        if grammar is None and digest[0] / 256.0 < self.bad_json:
+            content = f"Sure! The program is {prog} at {uni}."
+        if self.latency:
+            time.sleep(self.latency)
+        return {
+            "choices": [{"message": {"content": content}}],
+            "usage": {"completion_tokens": max(1, len(content) // 4)},
+        }
+
+
+def _llama_backend(args: argparse.Namespace) -> Any:
+    """The real model, resolved and loaded exactly as the service does."""
+    return app._load_llm(warm=True)
+
+
+def _stub_backend(args: argparse.Namespace) -> Any:
+    return StubLlama(latency_ms=args.latency_ms, bad_json=args.stub_bad_json)
+
+
+BACKENDS: Dict[str, Callable[[argparse.Namespace], Any]] = {
+    "stub": _stub_backend,
+    "llama": _llama_backend,
+}
+
+
+def _vary(text: str, rng: random.Random) -> str:
+    """Small typo-style edit: drop, duplicate or swap one character."""
+    if len(text) < 4:
+        return text + "x"
+    i = rng.randrange(1, len(text) - 2)
+    op = rng.randrange(3)
+    if op == 0:
+        return text[:i] + text[i + 1:]
+    if op == 1:
+        return text[:i] + text[i] + text[i:]
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def scaled_rows(
+    path: str, n: int, vary: float = 0.1, seed: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """Cycle the rows in `path` up to `n`, editing `vary` of the program texts.
+
+    Edited rows defeat the result cache and push work onto fuzzy matching
+    and the model, like real scraped data does.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    base = data["rows"] if isinstance(data, dict) else data
+    rng = random.Random(seed)
+    for i in range(n):
+        row = dict(base[i % len(base)])
+        if rng.random() < vary:
+            row["program"] = _vary(row.get("program") or "", rng)
+        yield row
+
+
+class StageTimer:
+    """Accumulates wall time per stage, keeping every sample for percentiles."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap(self, stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        samples = self.samples[stage]
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - t0)
+
+        return timed
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for stage in STAGES:
+            samples = sorted(self.samples.get(stage, ()))
+            if not samples:
+                continue
+            total = sum(samples)
+            out[stage] = {
+                "calls": len(samples),
+                "total_s": round(total, 4),
+                "mean_ms": round(1000 * total / len(samples), 4),
+                "p50_ms": round(1000 * samples[len(samples) // 2], 4),
+                "p95_ms": round(1000 * samples[int(len(samples) * 0.95)], 4),
+            }
+        return out
+
+
+@contextmanager
+def instrumented(timer: StageTimer, llm: Any) -> Iterator[None]:
+    """Time the standardizer's stages by wrapping its module-level functions."""
+    patches = {
+        "rules_resolve": "fast_path",
+        "_build_messages": "prompt",
+        "_parse_output": "parse",
+        "_post_normalize_program": "post_normalize",
+        "_post_normalize_university": "post_normalize",
+        "_model_output": "model_call",
+    }
+    saved = {name: getattr(app, name) for name in patches}
+    cache_get = app.RESULT_CACHE.get
+    chat = llm.create_chat_completion
+    try:
+        for name, stage in patches.items():
+            setattr(app, name, timer.wrap(stage, saved[name]))
+        app.RESULT_CACHE.get = timer.wrap("cache_lookup", cache_get)
+        llm.create_chat_completion = timer.wrap("inference", chat)
+        yield
+    finally:
+        for name, fn in saved.items():
+            setattr(app, name, fn)
+        del app.RESULT_CACHE.get
+        del llm.create_chat_completion
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark `args.rows` rows and return the report."""
+    llm = BACKENDS[args.backend](args)
+    app.set_model(llm)
+    timer = StageTimer()
+    rows = scaled_rows(args.data, args.rows, vary=args.vary, seed=args.seed)
+
+    with instrumented(timer, llm):
+        t0 = time.perf_counter()
+        for row in rows:
+            _, path = app._standardize_row(row)
+            app._record_path(path)
+        elapsed = time.perf_counter() - t0
+
+    stages = timer.summary()
+
+    paths = dict(app.PATH_COUNTS)
+    lookups = paths.get("cache", 0) + paths.get("model_path", 0)
+    return {
+        "backend": args.backend,
+        "rows": args.rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(args.rows / elapsed, 1) if elapsed else 0.0,
+        "paths": paths,
+        "fast_path_rate": round(paths.get("fast_path", 0) / args.rows, 4) if args.rows else 0.0,
+        "cache_hit_rate": round(paths.get("cache", 0) / lookups, 4) if lookups else 0.0,
+        "decode": app._decode_summary(),
+        "stages": stages,
+    }
+
+
+# Startup probes, each run in a fresh interpreter. "eager" is what every
+# start cost when app.py imported the model stack at module level.
+STARTUP_PROBES = {
+    "import canonicalize": "import canonicalize",
+    "import app": "import app",
+    "import app (eager model stack)": "import app, llama_cpp, huggingface_hub",
+    "app.py --help": None,
+}
+
+
+def _time_command(argv: List[str], repeats: int) -> float:
+    """Median wall time in ms of running `argv` in a fresh process."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        subprocess.run(
+            argv,
+            cwd=here,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        samples.append(time.perf_counter() - t0)
+    return round(1000 * statistics.median(samples), 1)
+
+
+def startup(repeats: int = 5) -> Dict[str, float]:
+    """Median startup time (ms) of each probe; interpreter baseline included."""
+    report = {"python -c pass": _time_command([sys.executable, "-c", "pass"], repeats)}
+    for name, code in STARTUP_PROBES.items():
+        if code is None:
+            argv = [sys.executable, "app.py", "--help"]
+        else:
+            argv = [sys.executable, "-c", code]
+        try:
+            report[name] = _time_command(argv, repeats)
+        except subprocess.CalledProcessError:
+            report[name] = float("nan")  # e.g. model stack not installed
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['rows']} rows in {report['seconds']:.2f}s "
+        f"= {report['rows_per_sec']:.0f} rows/sec ({report['backend']} backend)"
+    )
+    paths = report["paths"]
+    print(
+        "paths: "
+        + ", ".join(f"{k} {v}" for k, v in paths.items())
+        + f" | fast path {report['fast_path_rate']:.1%}"
+        + f", cache hit {report['cache_hit_rate']:.1%} of non-fast rows"
+    )
+    decode = report["decode"]
+    print(
+        f"model calls {decode['model_calls']}, "
+        f"fallbacks {decode['fallbacks']} ({decode['fallback_rate']:.1%}), "
+        f"avg completion tokens {decode['avg_completion_tokens']:.1f}"
+    )
+    print(f"{'stage':<16}{'calls':>9}{'total s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for stage, s in report["stages"].items():
+        print(
+            f"{stage:<16}{s['calls']:>9}{s['total_s']:>10.3f}{s['mean_ms']:>10.4f}"
+            f"{s.get('p50_ms', float('nan')):>10.4f}{s.get('p95_ms', float('nan')):>10.4f}"
+        )
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="stub")
+    parser.add_argument("--data", default="sample_data.json", help="Rows to cycle through.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument(
+        "--vary",
+        type=float,
+        default=0.1,
+        help="Fraction of rows whose program text gets a one-character edit.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Stub latency per model call.")
+    parser.add_argument(
+        "--stub-bad-json",
+        type=float,
+        default=0.0,
+        help="Fraction of stub answers that are not JSON (exercises the fallback).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="Measure import/startup time in fresh processes instead.",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per startup probe.")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        times = startup(args.repeats)
+        if args.json:
+            json.dump(times, sys.stdout, indent=2)
+            print()
+        else:
+            for name, ms in times.items():
+                print(f"{name:<34}{ms:>9.1f} ms")
+        return
+
+    report = run(args)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
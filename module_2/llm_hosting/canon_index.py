@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Prebuilt lookup structures for canonical university/program names.
+
+`CanonIndex.best_match` returns exactly what
+``difflib.get_close_matches(name, names, n=1, cutoff=cutoff)`` would, but most
+candidates are rejected without running `SequenceMatcher`:
+
+- names are bucketed by length, so buckets where the cutoff is unreachable
+  are skipped (the ``SequenceMatcher.real_quick_ratio`` bound);
+- each name stores its character bigrams as a set of numbered bigrams
+  ("ab0", "ab1", ...), so the multiset overlap with the query is one C-level set
+  intersection. A ratio >= cutoff needs at least M matched characters and
+  every unmatched character can break at most two bigrams, which gives a
+  lower bound on shared bigrams;
+- the same trick on single characters computes ``quick_ratio`` exactly.
+
+Only survivors get ``SequenceMatcher.ratio``, with difflib's tie-breaking, so
+results are identical at the same cutoff.
+"""
+
+from __future__ import annotations
+
+import difflib
+import math
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+NGRAM = 2
+MEMO_SIZE = 50_000
+
+_INLINE_FLAGS_RE = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+_Entry = Tuple[str, FrozenSet[str], FrozenSet[str]]
+
+
+def _numbered(items: Sequence[str]) -> FrozenSet[str]:
+    """Multiset of equal-length strings as a set; |A & B| is the multiset overlap.
+
+    Each item is suffixed with its occurrence number ("ab0", "ab1", ...).
+    Plain strings cache their hash, which keeps set intersections cheap.
+    """
+    seen: Dict[str, int] = {}
+    out = []
+    for item in items:
+        k = seen.get(item, 0)
+        seen[item] = k + 1
+        out.append(f"{item}{k}")
+    return frozenset(out)
+
+
+def _ngrams(text: str, n: int = NGRAM) -> List[str]:
+    """Character n-grams of `text`, in order."""
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def _min_shared_ngrams(len_a: int, len_b: int, cutoff: float, n: int = NGRAM) -> int:
+    """Lower bound on shared n-grams for any pair whose ratio can reach `cutoff`."""
+    # Smallest matched-character count that could give 2*M/(la+lb) >= cutoff,
+    # rounded down by one extra step to stay safe against float rounding.
+    matched = max(0, math.floor(cutoff * (len_a + len_b) / 2.0) - 1)
+    return (len_a - n + 1) - n * (len_a - matched) - (n - 1) * (len_b - matched)
+
+
+class CanonIndex:
+    """Exact hash lookup plus n-gram filtering for fuzzy canonical matching."""
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names: List[str] = list(names)
+        self._exact = frozenset(self.names)
+        self._by_len: Dict[int, List[_Entry]] = defaultdict(list)
+        for name in self.names:
+            self._by_len[len(name)].append(
+                (name, _numbered(name), _numbered(_ngrams(name)))
+            )
+        self._memo: Dict[Tuple[str, float], Tuple[Optional[str], float]] = {}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._exact
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def best_match(self, name: str, cutoff: float = 0.86) -> str | None:
+        """Best fuzzy match at or above `cutoff`, or None (difflib semantics)."""
+        return self.best_match_scored(name, cutoff)[0]
+
+    def best_match_scored(self, name: str, cutoff: float = 0.86) -> Tuple[str | None, float]:
+        """Best fuzzy match and its similarity ratio, or (None, 0.0)."""
+        if not name or not self.names:
+            return None, 0.0
+        key = (name, cutoff)
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        result = self._search(name, cutoff)
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[key] = result
+        return result
+
+    def _search(self, name: str, cutoff: float) -> Tuple[Optional[str], float]:
+        """Filter candidates, then score survivors like difflib.get_close_matches(n=1)."""
+        len_a = len(name)
+        q_chars = _numbered(name)
+        q_grams = _numbered(_ngrams(name))
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(name)
+        best: Optional[Tuple[float, str]] = None
+
+        for len_b, entries in self._by_len.items():
+            total = len_a + len_b
+            if 2.0 * min(len_a, len_b) / total < cutoff:
+                continue
+            need = _min_shared_ngrams(len_a, len_b, cutoff)
+            for candidate, chars, grams in entries:
+                if need > 0 and len(q_grams & grams) < need:
+                    continue
+                if 2.0 * len(q_chars & chars) / total < cutoff:
+                    continue
+                matcher.set_seq1(candidate)
+                score = matcher.ratio()
+                if score >= cutoff and (best is None or (score, candidate) > best):
+                    best = (score, candidate)
+
+        if best is None:
+            return None, 0.0
+        return best[1], best[0]
+
+
+class AbbrevMatcher:
+    """Abbreviation patterns compiled into one alternation; first listed pattern wins."""
+
+    def __init__(self, patterns: Dict[str, str]) -> None:
+        branches: List[str] = []
+        self._targets: Dict[str, str] = {}
+        for i, (pattern, full) in enumerate(patterns.items()):
+            flags = ""
+            body = pattern
+            m = _INLINE_FLAGS_RE.match(body)
+            if m:
+                flags, body = m.group(1), body[m.end():]
+            if body.startswith("^"):
+                body = body[1:]
+            if body.endswith("$") and not body.endswith("\\$"):
+                body = body[:-1]
+            if flags:
+                body = f"(?{flags}:{body})"
+            group = f"a{i}"
+            self._targets[group] = full
+            branches.append(f"(?P<{group}>{body})")
+        self._regex = re.compile("|".join(branches)) if branches else None
+
+    def expand(self, text: str) -> str | None:
+        """Full name for an abbreviation that matches all of `text`, else None."""
+        if self._regex is None:
+            return None
+        m = self._regex.fullmatch(text)
+        if m is None or m.lastgroup is None:
+            return None
+        return self._targets[m.lastgroup]
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""Canonical university/program lists and the rules that map raw text onto them.
+
+Import-light on purpose (stdlib plus canon_index): the CLI, the fast path,
+the benchmark and other tools can normalize names without pulling in the
+model stack or Flask.
+
+The lists live in one immutable `CanonState` held in the module global
+`CANON`; `reload_canon()` rebuilds it and swaps the global in one step, so
+always read it as ``canonicalize.CANON`` rather than importing the name.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from canon_index import AbbrevMatcher, CanonIndex
+
+log = logging.getLogger("llm_hosting")
+
+CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", "canon_universities.txt")
+CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", "canon_programs.txt")
+
+# Rows whose program and university both resolve at or above this confidence
+# skip the model entirely (set above 1.0 to always call the LLM).
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.92"))
+
+
+# ---------------- Canonical lists + abbrev maps ----------------
+def _read_lines(path: str) -> List[str]:
+    """Read non-empty, stripped lines from a file (UTF-8)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [ln.strip() for ln in f if ln.strip()]
+    except FileNotFoundError:
+        return []
+
+
+ABBREV_UNI: Dict[str, str] = {
+    r"(?i)^mcg(\.|ill)?$": "McGill University",
+    r"(?i)^(ubc|u\.?b\.?c\.?)$": "University of British Columbia",
+    r"(?i)^uoft$": "University of Toronto",
+}
+
+# Single compiled abbreviation regex (see canon_index.py).
+ABBREV_MATCHER = AbbrevMatcher(ABBREV_UNI)
+
+COMMON_UNI_FIXES: Dict[str, str] = {
+    "McGiill University": "McGill University",
+    "Mcgill University": "McGill University",
+    # Normalize 'Of' → 'of'
+    "University Of British Columbia": "University of British Columbia",
+}
+
+COMMON_PROG_FIXES: Dict[str, str] = {
+    "Mathematic": "Mathematics",
+    "Info Studies": "Information Studies",
+}
+
+# ---------------- Canonical lists (hot-reloadable) ----------------
+@dataclass(frozen=True)
+class CanonState:
+    """One immutable generation of the canonical lists and their indexes.
+
+    Readers take `CANON` once and use that snapshot; a reload builds a new
+    state off the request path and swaps the module global in one step.
+    """
+
+    version: int
+    universities: List[str]
+    programs: List[str]
+    uni_index: CanonIndex
+    prog_index: CanonIndex
+    mtimes: Tuple[float | None, float | None]
+
+
+def _mtime(path: str) -> float | None:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _build_canon(version: int) -> CanonState:
+    """Read both list files and build their lookup indexes."""
+    mtimes = (_mtime(CANON_UNIS_PATH), _mtime(CANON_PROGS_PATH))
+    universities = _read_lines(CANON_UNIS_PATH)
+    programs = _read_lines(CANON_PROGS_PATH)
+    return CanonState(
+        version=version,
+        universities=universities,
+        programs=programs,
+        uni_index=CanonIndex(universities),
+        prog_index=CanonIndex(programs),
+        mtimes=mtimes,
+    )
+
+
+CANON = _build_canon(version=1)
+_CANON_RELOAD_LOCK = threading.Lock()
+
+
+def reload_canon(force: bool = False) -> Dict[str, Any]:
+    """Rebuild the canonical indexes if the files changed (or `force`) and swap.
+
+    A file that reads back empty while the live list is not (e.g. caught
+    mid-write) is treated as an error and the current state is kept.
+    """
+    global CANON
+    with _CANON_RELOAD_LOCK:
+        current = CANON
+        mtimes = (_mtime(CANON_UNIS_PATH), _mtime(CANON_PROGS_PATH))
+        if not force and mtimes == current.mtimes:
+            return {"reloaded": False, "version": current.version}
+
+        started = time.perf_counter()
+        state = _build_canon(current.version + 1)
+        if (current.universities and not state.universities) or (
+            current.programs and not state.programs
+        ):
+            raise ValueError("canonical list file is empty; keeping current lists")
+        CANON = state  # atomic swap: readers see the old or the new state
+
+    seconds = time.perf_counter() - started
+    log.info(
+        "canonical lists v%d loaded: %d universities, %d programs in %.2fs",
+        state.version,
+        len(state.universities),
+        len(state.programs),
+        seconds,
+    )
+    return {
+        "reloaded": True,
+        "version": state.version,
+        "universities": len(state.universities),
+        "programs": len(state.programs),
+        "seconds": round(seconds, 3),
+    }
+
+
+def watch_canon(interval: float) -> threading.Thread:
+    """Poll the list files every `interval` seconds and reload on change."""
+
+    def run() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                reload_canon()
+            except Exception:  # keep serving the previous lists
+                log.exception("canonical list reload failed")
+
+    thread = threading.Thread(target=run, name="canon-watcher", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------- Matching ----------------
+def split_fallback(text: str) -> Tuple[str, str]:
+    """Simple, rules-first parser if the model returns non-JSON."""
+    s = re.sub(r"\s+", " ", (text or "")).strip().strip(",")
+    parts = [p.strip() for p in re.split(r",| at | @ ", s) if p.strip()]
+    prog = parts[0] if parts else ""
+    uni = parts[1] if len(parts) > 1 else ""
+
+    # High-signal expansions
+    if re.fullmatch(r"(?i)mcg(ill)?(\.)?", uni or ""):
+        uni = "McGill University"
+    if re.fullmatch(
+        r"(?i)(ubc|u\.?b\.?c\.?|university of british columbia)",
+        uni or "",
+    ):
+        uni = "University of British Columbia"
+
+    # Title-case program; normalize 'Of' → 'of' for universities
+    prog = prog.title()
+    if uni:
+        uni = re.sub(r"\bOf\b", "of", uni.title())
+    else:
+        uni = "Unknown"
+    return prog, uni
+
+
+def match_program(prog: str) -> Tuple[str, float]:
+    """Map a program to its canonical form and report match confidence."""
+    p = (prog or "").strip()
+    p = COMMON_PROG_FIXES.get(p, p)
+    p = p.title()
+    index = CANON.prog_index
+    if p in index:
+        return p, 1.0
+    match, score = index.best_match_scored(p, cutoff=0.84)
+    if match:
+        return match, score
+    return p, 0.0
+
+
+def match_university(uni: str) -> Tuple[str, float]:
+    """Map a university to its canonical form and report match confidence."""
+    u = (uni or "").strip()
+
+    # Abbreviations
+    u = ABBREV_MATCHER.expand(u) or u
+
+    # Common spelling fixes
+    u = COMMON_UNI_FIXES.get(u, u)
+
+    # Normalize 'Of' → 'of'
+    if u:
+        u = re.sub(r"\bOf\b", "of", u.title())
+
+    # Canonical or fuzzy map
+    index = CANON.uni_index
+    if u in index:
+        return u, 1.0
+    match, score = index.best_match_scored(u, cutoff=0.86)
+    if match:
+        return match, score
+    return u or "Unknown", 0.0
+
+
+# ---------------- Rules-first fast path ----------------
+_FAST_SPLIT_RE = re.compile(r",| at | @ ")
+
+
+def rules_resolve(
+    program_text: str,
+    min_confidence: float = FAST_PATH_MIN_CONFIDENCE,
+) -> Dict[str, str] | None:
+    """Resolve "<program>, <university>" without the model, or return None.
+
+    Both halves must map onto the canonical lists (exactly, via an
+    abbreviation, or fuzzily) with at least `min_confidence`.
+    """
+    s = re.sub(r"\s+", " ", (program_text or "")).strip().strip(",")
+    parts = _FAST_SPLIT_RE.split(s, maxsplit=1)
+    if len(parts) != 2:
+        return None
+
+    prog, prog_conf = match_program(parts[0])
+    if prog_conf < min_confidence:
+        return None
+    uni, uni_conf = match_university(parts[1].strip().strip(","))
+    if uni_conf < min_confidence:
+        return None
+    return {
+        "standardized_program": prog,
+        "standardized_university": uni,
+    }
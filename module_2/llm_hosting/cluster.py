@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Group near-identical raw program strings so each group is standardized once.
+
+Two passes over the distinct strings of a whole input file:
+
+1. exact grouping on a normalized key (case, whitespace, punctuation and
+   stray commas removed), which catches "Information, McG  " vs
+   "information , McG";
+2. optional fuzzy merging (off by default) of keys a single typo apart (a
+   dropped, extra, wrong or swapped letter) whose character-trigram sets
+   also have a Jaccard similarity >= `threshold`. Candidates come from a
+   single-deletion index, so the cost grows with total key length rather
+   than with the number of pairs; the trigram check keeps shorter keys
+   apart, since one edit changes a larger share of their trigrams. One edit
+   can also turn one institution into another ("UCSD" vs "UCSB"), so a pair
+   is only merged when both strings resolve to the same canonical program
+   and university.
+
+Groups are merged with union-find. Each cluster's representative is its most
+frequent raw string (first seen wins ties).
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from canonicalize import match_program, match_university, split_fallback
+
+NGRAM = 3
+MIN_FUZZY_LEN = 6  # shorter keys only merge exactly
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_key(text: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive form of a raw string."""
+    return _NON_WORD_RE.sub(" ", (text or "").casefold()).strip()
+
+
+def _trigrams(key: str) -> FrozenSet[str]:
+    padded = f" {key} "
+    return frozenset(padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1))
+
+
+class _UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        self.parent[max(ra, rb)] = min(ra, rb)
+        return True
+
+
+def _one_edit_candidates(keys: List[str]) -> Iterator[Tuple[int, int]]:
+    """Index pairs of keys that may be a single typo apart.
+
+    Keys are processed by length; each key's single-deletion variants are
+    hashed, so equal-length keys sharing a variant, and keys equal to a
+    variant of a one-longer key, become candidates. Only two length buckets
+    are held in memory at a time.
+    """
+    by_len: Dict[int, List[int]] = defaultdict(list)
+    for i, key in enumerate(keys):
+        if len(key) >= MIN_FUZZY_LEN:
+            by_len[len(key)].append(i)
+
+    shorter: Dict[str, int] = {}
+    for length in sorted(by_len):
+        variants: Dict[str, List[int]] = defaultdict(list)
+        for i in by_len[length]:
+            key = keys[i]
+            for v in {key[:p] + key[p + 1:] for p in range(length)}:
+                variants[v].append(i)
+        for v, ids in variants.items():
+            j = shorter.get(v)
+            if j is not None:
+                for i in ids:
+                    yield j, i
+            for a in range(len(ids)):
+                for b in range(a + 1, len(ids)):
+                    yield ids[a], ids[b]
+        shorter = {keys[i]: i for i in by_len[length]} if length + 1 in by_len else {}
+
+
+def _similar_pairs(keys: List[str], threshold: float) -> Iterator[Tuple[int, int]]:
+    """Candidate pairs whose trigram Jaccard similarity is >= threshold."""
+    grams: Dict[int, FrozenSet[str]] = {}
+    seen = set()
+    for a, b in _one_edit_candidates(keys):
+        if (a, b) in seen:
+            continue
+        seen.add((a, b))
+        ga = grams.get(a) or grams.setdefault(a, _trigrams(keys[a]))
+        gb = grams.get(b) or grams.setdefault(b, _trigrams(keys[b]))
+        shared = len(ga & gb)
+        if shared >= threshold * (len(ga) + len(gb) - shared):
+            yield a, b
+
+
+def canonical_pair(text: str) -> Optional[Tuple[str, str]]:
+    """(program, university) `text` resolves to in the canonical lists, or None."""
+    prog, uni = split_fallback(text)
+    prog, prog_score = match_program(prog)
+    uni, uni_score = match_university(uni)
+    if prog_score > 0 and uni_score > 0:
+        return prog, uni
+    return None
+
+
+def cluster_strings(
+    texts: Iterable[str],
+    threshold: float = 1.0,
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """Map every distinct raw string to its cluster representative.
+
+    By default only normalized-key matches are clustered. A `threshold`
+    below 1.0 also merges one-typo variants with that trigram similarity,
+    provided both resolve to the same canonical (program, university).
+    Returns (representative_of, stats).
+    """
+    counts = Counter(texts)
+    by_key: Dict[str, List[str]] = defaultdict(list)
+    for raw in counts:
+        by_key[normalize_key(raw)].append(raw)
+    keys = list(by_key)
+
+    uf = _UnionFind(len(keys))
+    fuzzy_merges = fuzzy_rejected = 0
+    if threshold < 1.0:
+        canon: Dict[int, Optional[Tuple[str, str]]] = {}
+        for a, b in _similar_pairs(keys, threshold):
+            for i in (a, b):
+                if i not in canon:
+                    canon[i] = canonical_pair(by_key[keys[i]][0])
+            if canon[a] is None or canon[a] != canon[b]:
+                fuzzy_rejected += 1
+                continue
+            fuzzy_merges += uf.union(a, b)
+
+    members: Dict[int, List[str]] = defaultdict(list)
+    for i, key in enumerate(keys):
+        members[uf.find(i)].extend(by_key[key])
+
+    order = {raw: n for n, raw in enumerate(counts)}
+    representative_of: Dict[str, str] = {}
+    sizes: List[int] = []
+    for raws in members.values():
+        rep = max(raws, key=lambda r: (counts[r], -order[r]))
+        for raw in raws:
+            representative_of[raw] = rep
+        sizes.append(sum(counts[r] for r in raws))
+
+    stats: Dict[str, float] = {
+        "rows": sum(counts.values()),
+        "distinct_strings": len(counts),
+        "normalized_keys": len(keys),
+        "fuzzy_merges": fuzzy_merges,
+        "fuzzy_rejected": fuzzy_rejected,
+        "clusters": len(members),
+        "largest_cluster_rows": max(sizes, default=0),
+        "model_inputs_saved": len(counts) - len(members),
+    }
+    return representative_of, stats
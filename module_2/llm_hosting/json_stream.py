@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Incremental reader for row input: JSON arrays, {"rows": [...]} or NDJSON.
+
+Rows are yielded as soon as they are parsed, so callers can start work on
+the first row while the rest of the file or request body is still being
+read. Only the current chunk and the row being parsed are held in memory.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import IO, Any, Generator, Iterator, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+_WS = " \t\r\n"
+_DELIMS = _WS + ",:]}"
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffered cursor over a text or binary stream."""
+
+    def __init__(self, stream: IO, chunk_size: int = CHUNK_SIZE) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._started = False
+
+    def _fill(self) -> bool:
+        """Read one more chunk into the buffer; False once the stream is done."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if isinstance(chunk, bytes):
+            text = self._utf8.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if not chunk:
+            self._eof = True
+        if not self._started and text:
+            text = text.lstrip("\ufeff")
+            self._started = True
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return bool(chunk) or bool(text)
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at EOF)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WS:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume `char` (after whitespace) or raise a decode error."""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self._buf, self._pos)
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode one complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut by the chunk edge ("15" of "1500.0", or "1500"
+            # before ".0") decodes fine; only trust it once a delimiter follows.
+            if (
+                isinstance(obj, (int, float))
+                and not isinstance(obj, bool)
+                and (end == len(self._buf) or self._buf[end] not in _DELIMS)
+                and self._fill()
+            ):
+                continue
+            self._pos = end
+            return obj
+
+    def array(self) -> Iterator[Any]:
+        """Yield the elements of the array at the cursor one by one."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def first_object(self) -> Generator[Any, None, Tuple[bool, dict]]:
+        """Parse a top-level object, streaming its "rows" array if it has one.
+
+        Returns (is_wrapper, fields) once the object is closed.
+        """
+        self.expect("{")
+        fields: dict = {}
+        wrapper = False
+        if self.peek() == "}":
+            self._pos += 1
+            return wrapper, fields
+        while True:
+            key = self.value()
+            self.expect(":")
+            if key == "rows":
+                wrapper = True
+                if self.peek() == "[":
+                    yield from self.array()
+                else:
+                    self.value()
+            else:
+                fields[key] = self.value()
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return wrapper, fields
+
+
+def iter_rows(stream: IO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield rows from a JSON array, a {"rows": [...]} object, or NDJSON.
+
+    Accepts text or binary (UTF-8) streams. A lone top-level object without
+    a "rows" key is not a row list and yields nothing (so a one-line NDJSON
+    stream does too); objects are NDJSON rows once a second value follows.
+    Raises json.JSONDecodeError on malformed input, after yielding every row
+    parsed before the error.
+    """
+    reader = _Reader(stream, chunk_size)
+    first = reader.peek()
+    if first == "[":
+        yield from reader.array()
+        return
+    if first != "{":
+        if first:
+            reader.value()  # surfaces a decode error for junk input
+        return
+
+    wrapper, fields = yield from reader.first_object()
+    if wrapper or not reader.peek():
+        return
+
+    # Not a wrapper and more values follow: the first object was the first
+    # NDJSON row.
+    yield fields
+    while reader.peek():
+        yield reader.value()
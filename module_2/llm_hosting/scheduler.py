@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""Micro-batching scheduler that sits between HTTP requests and the model."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, List
+
+
+@dataclass
+class _Item:
+    """One pending row: model input, its future and when it was queued."""
+
+    text: str
+    future: Future
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class MicroBatchScheduler:
+    """Collect pending rows from all in-flight requests and run them in batches.
+
+    A single background thread owns the model. It waits for the first row,
+    keeps collecting for up to `max_wait_ms` (or until `max_batch_size` rows
+    are queued), then hands the batch to `run_batch`. Rows are taken
+    round-robin across requests, so one large request cannot starve small
+    ones, and identical texts within a batch are computed once. Rows of a
+    request that gave up can be dropped before they run.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[str]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[Hashable, Deque[_Item]]" = OrderedDict()
+        self._depth = 0
+        self._thread: threading.Thread | None = None
+        self._stats: Dict[str, float] = {
+            "submitted": 0,
+            "batches": 0,
+            "rows_run": 0,
+            "deduplicated": 0,
+            "max_queue_depth": 0,
+            "queue_wait_seconds": 0.0,
+            "run_seconds": 0.0,
+            "cancelled": 0,
+        }
+
+    def submit(self, text: str, request_id: Hashable) -> Future:
+        """Queue one row for `request_id`; the future resolves to its result."""
+        item = _Item(text=text, future=Future())
+        with self._cond:
+            self._ensure_worker()
+            self._pending.setdefault(request_id, deque()).append(item)
+            self._depth += 1
+            self._stats["submitted"] += 1
+            self._stats["max_queue_depth"] = max(
+                self._stats["max_queue_depth"], self._depth
+            )
+            self._cond.notify()
+        return item.future
+
+    def drop(self, request_id: Hashable) -> int:
+        """Cancel every row of `request_id` that has not started; return how many."""
+        with self._cond:
+            items = self._pending.pop(request_id, None) or deque()
+            self._depth -= len(items)
+            cancelled = sum(1 for item in items if item.future.cancel())
+            self._stats["cancelled"] += cancelled
+        return cancelled
+
+    def queue_depth(self) -> int:
+        """Rows waiting for a batch slot."""
+        with self._cond:
+            return self._depth
+
+    def row_seconds(self) -> float:
+        """Average model time per row so far (0.0 before the first batch)."""
+        with self._cond:
+            rows = self._stats["rows_run"] - self._stats["deduplicated"]
+            return self._stats["run_seconds"] / rows if rows else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of queue and batching counters."""
+        with self._cond:
+            snap = dict(self._stats)
+            snap["queue_depth"] = self._depth
+        batches = snap["batches"]
+        snap["avg_batch_size"] = snap["rows_run"] / batches if batches else 0.0
+        return snap
+
+    def _ensure_worker(self) -> None:
+        """Start the batching thread on first use (caller holds the lock)."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name="micro-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def _take(self, limit: int) -> List[_Item]:
+        """Pop up to `limit` rows, one per request in turn (caller holds the lock)."""
+        batch: List[_Item] = []
+        while len(batch) < limit and self._pending:
+            request_id, items = next(iter(self._pending.items()))
+            batch.append(items.popleft())
+            del self._pending[request_id]
+            if items:
+                self._pending[request_id] = items
+        self._depth -= len(batch)
+        return batch
+
+    def _next_batch(self) -> List[_Item]:
+        """Block until a batch is ready: full, or the wait window has passed."""
+        with self._cond:
+            while self._depth == 0:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while self._depth < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return self._take(self.max_batch_size)
+
+    def _loop(self) -> None:
+        """Batching thread: run batches forever."""
+        while True:
+            self._run(self._next_batch())
+
+    def _run(self, batch: List[_Item]) -> None:
+        """Run one batch and resolve every future in it."""
+        now = time.monotonic()
+        live = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if len(live) < len(batch):
+            with self._cond:
+                self._stats["cancelled"] += len(batch) - len(live)
+        if not live:
+            return
+
+        texts = list(dict.fromkeys(item.text for item in live))
+        started = time.monotonic()
+        try:
+            results = dict(zip(texts, self._run_batch(texts)))
+        except Exception as exc:  # surface model errors to every caller
+            for item in live:
+                item.future.set_exception(exc)
+            return
+        finally:
+            with self._cond:
+                self._stats["batches"] += 1
+                self._stats["rows_run"] += len(live)
+                self._stats["deduplicated"] += len(live) - len(texts)
+                self._stats["queue_wait_seconds"] += sum(
+                    now - item.queued_at for item in live
+                )
+                self._stats["run_seconds"] += time.monotonic() - started
+
+        for item in live:
+            item.future.set_result(results[item.text])
@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HERE))
+
+# canonicalize reads its lists at import time, relative to the cwd by default.
+os.environ.setdefault("CANON_UNIS_PATH", str(HERE / "canon_universities.txt"))
+os.environ.setdefault("CANON_PROGS_PATH", str(HERE / "canon_programs.txt"))
@@ -0,0 +1,124 @@
+import difflib
+import random
+from pathlib import Path
+
+import pytest
+
+import canon_index
+from canon_index import AbbrevMatcher, CanonIndex
+
+HERE = Path(__file__).resolve().parents[1]
+
+
+def _names(filename):
+    lines = (HERE / filename).read_text(encoding="utf-8").splitlines()
+    return [ln.strip() for ln in lines if ln.strip()]
+
+
+def _variants(names, count, seed=0):
+    """Typo'd, truncated and case-changed copies of random canon names."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(count):
+        name = rng.choice(names)
+        i = rng.randrange(len(name))
+        op = rng.randrange(5)
+        if op == 0:
+            name = name[:i] + name[i + 1:]
+        elif op == 1:
+            name = name[:i] + rng.choice("aeiost") + name[i:]
+        elif op == 2 and i + 1 < len(name):
+            name = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+        elif op == 3:
+            name = name[: max(1, len(name) * 3 // 4)]
+        else:
+            name = name.lower()
+        out.append(name)
+    return out
+
+
+def _difflib_best(query, names, cutoff):
+    hits = difflib.get_close_matches(query, names, n=1, cutoff=cutoff)
+    return hits[0] if hits else None
+
+
+@pytest.mark.parametrize("filename", ["canon_universities.txt", "canon_programs.txt"])
+@pytest.mark.parametrize("cutoff", [0.75, 0.84, 0.86])
+def test_best_match_equals_difflib_on_canon_lists(filename, cutoff):
+    names = _names(filename)
+    index = CanonIndex(names)
+    queries = _variants(names, 60, seed=len(filename)) + ["Universty", "x", "Computr Sciense"]
+    for query in queries:
+        expected = _difflib_best(query, names, cutoff)
+        match, score = index.best_match_scored(query, cutoff)
+        assert match == expected, query
+        if expected is None:
+            assert score == 0.0
+        else:
+            assert score == difflib.SequenceMatcher(None, query, expected).ratio()
+            assert score >= cutoff
+
+
+def test_ties_break_like_difflib():
+    names = ["abcd", "abce", "abcx"]
+    index = CanonIndex(names)
+    # all three score 0.75 against "abcf"; difflib keeps the largest string
+    assert index.best_match("abcf", cutoff=0.7) == _difflib_best("abcf", names, 0.7) == "abcx"
+    assert index.best_match("abcf", cutoff=0.8) is None
+
+
+def test_empty_query_and_empty_index():
+    assert CanonIndex(["Stanford University"]).best_match_scored("", 0.5) == (None, 0.0)
+    empty = CanonIndex([])
+    assert len(empty) == 0
+    assert empty.best_match_scored("Stanford", 0.5) == (None, 0.0)
+
+
+def test_exact_membership():
+    index = CanonIndex(["McGill University"])
+    assert "McGill University" in index
+    assert "Mcgill University" not in index
+    assert len(index) == 1
+
+
+def test_memo_reuses_and_bounds_results(monkeypatch):
+    monkeypatch.setattr(canon_index, "MEMO_SIZE", 2)
+    index = CanonIndex(["Stanford University", "Stanford College"])
+    calls = []
+    search = index._search
+    monkeypatch.setattr(index, "_search", lambda name, cutoff: calls.append(name) or search(name, cutoff))
+
+    first = index.best_match_scored("Stanfrod University", 0.8)
+    assert index.best_match_scored("Stanfrod University", 0.8) == first
+    assert calls == ["Stanfrod University"]
+
+    # the cutoff is part of the key
+    index.best_match_scored("Stanfrod University", 0.9)
+    assert len(calls) == 2
+
+    # a full memo is cleared rather than grown
+    index.best_match_scored("Stanford Colege", 0.8)
+    assert len(index._memo) == 1
+
+
+def test_abbrev_matcher_first_pattern_wins_and_keeps_flags():
+    matcher = AbbrevMatcher({
+        r"(?i)^mcg(\.|ill)?$": "McGill University",
+        r"^MIT$": "Massachusetts Institute of Technology",
+        r"UCSD": "University of California, San Diego",  # no anchors
+        r"(?i)^m.*$": "Catch-all M",
+    })
+    assert matcher.expand("McG.") == "McGill University"
+    assert matcher.expand("mcgill") == "McGill University"
+    assert matcher.expand("MIT") == "Massachusetts Institute of Technology"
+    assert matcher.expand("mit") == "Catch-all M"  # second pattern is case-sensitive
+    assert matcher.expand("UMIT") is None  # whole string must match
+    assert matcher.expand("UCSD") == "University of California, San Diego"
+    assert matcher.expand("UCSD2") is None
+    assert AbbrevMatcher({}).expand("MIT") is None
+
+
+def test_abbrev_matcher_keeps_escaped_dollar():
+    matcher = AbbrevMatcher({r"^US\$$": "Dollar U"})
+    assert matcher.expand("US$") == "Dollar U"
+    assert matcher.expand("US") is None
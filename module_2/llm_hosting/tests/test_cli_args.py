@@ -0,0 +1,16 @@
+import pytest
+
+import app
+
+
+def test_resume_with_stdout_is_rejected(capsys):
+    with pytest.raises(SystemExit) as exc:
+        app._parse_args(["--file", "rows.json", "--resume", "--stdout"])
+    assert exc.value.code == 2
+    assert "--resume" in capsys.readouterr().err
+
+
+def test_resume_with_output_file_is_accepted():
+    args = app._parse_args(["--file", "rows.json", "--resume", "--out", "rows.jsonl"])
+    assert args.resume and not args.stdout
+    assert app._parse_args(["--file", "rows.json", "--stdout"]).stdout
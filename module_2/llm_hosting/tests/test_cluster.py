@@ -0,0 +1,36 @@
+from cluster import cluster_strings
+
+
+def test_default_clusters_only_normalized_keys():
+    texts = ["Computer Science, Stanford University", "computer science , stanford university  "]
+    texts += ["Computer Science, Stanfrod University"]
+    rep, stats = cluster_strings(texts)
+    assert rep[texts[1]] == texts[0]
+    assert rep[texts[2]] == texts[2]
+    assert stats["fuzzy_merges"] == 0
+
+
+def test_one_letter_apart_institutions_stay_apart():
+    texts = [
+        "Computer Science, UCSD",
+        "Computer Science, UCSB",
+        "Computer Science, UCSB",
+        "Computer Science, UCLA",
+        "Computer Science, UCSA",
+    ]
+    for threshold in (1.0, 0.8, 0.5):
+        rep, _ = cluster_strings(texts, threshold)
+        assert rep["Computer Science, UCSD"] == "Computer Science, UCSD"
+        assert rep["Computer Science, UCLA"] == "Computer Science, UCLA"
+        assert rep["Computer Science, UCSA"] == "Computer Science, UCSA"
+
+
+def test_fuzzy_merge_needs_same_canonical_names():
+    texts = [
+        "Computer Science, Stanford University",
+        "Computer Science, Stanford University",
+        "Computer Science, Stanfrod University",
+    ]
+    rep, stats = cluster_strings(texts, 0.5)
+    assert rep[texts[2]] == texts[0]
+    assert stats["fuzzy_merges"] == 1
@@ -0,0 +1,80 @@
+import io
+import json
+
+import pytest
+
+from json_stream import iter_rows
+
+ROWS = [
+    {"url": "a", "program": "CS, [JHU]", "gpa": 3.9},
+    {"url": "b", "comments": "commas, brackets ] and \"quotes\"", "nested": {"x": [1, 2]}},
+    {"url": "c", "gre": 330, "ok": True, "note": None},
+]
+
+# small reads force many refills, so values straddle buffer boundaries
+CHUNK = 7
+
+
+def rows_of(data, chunk_size=CHUNK):
+    stream = io.BytesIO(data) if isinstance(data, bytes) else io.StringIO(data)
+    return list(iter_rows(stream, chunk_size))
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_json_array_across_chunks(indent):
+    text = "\n  " + json.dumps(ROWS, indent=indent) + "\n"
+    assert rows_of(text) == ROWS
+    assert rows_of(text.encode("utf-8")) == ROWS
+    # numbers cut by a chunk edge are only trusted once a delimiter follows
+    assert rows_of("[1, 22, 333,4444, 1500.25]") == [1, 22, 333, 4444, 1500.25]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, CHUNK])
+def test_multibyte_utf8_split_across_reads(chunk_size):
+    rows = [{"program": "Génie – 数据科学", "university": "Universität Zürich 🎓"}]
+    data = "\ufeff".encode("utf-8") + json.dumps(rows, ensure_ascii=False).encode("utf-8")
+    assert rows_of(data, chunk_size) == rows
+
+
+def test_ndjson_rows():
+    text = "\n".join(json.dumps(r) for r in ROWS) + "\n\n"
+    assert rows_of(text) == ROWS
+    assert rows_of(text.encode("utf-8")) == ROWS
+
+
+def test_rows_wrapper_streams_rows_and_ignores_other_fields():
+    text = json.dumps({"meta": {"n": 3}, "rows": ROWS, "tail": [1, 2]})
+    assert rows_of(text) == ROWS
+    assert rows_of('{"rows": []}') == []
+    assert rows_of('{"rows": "not a list", "x": 1}') == []
+
+
+@pytest.mark.parametrize("text", ["", "   \n", "[]", " [ ]\n", "{}", '{"url": "a"}\n'])
+def test_empty_input_and_lone_object_yield_nothing(text):
+    assert rows_of(text) == []
+
+
+def test_truncated_input_raises_after_parsed_rows():
+    rows = iter_rows(io.StringIO(json.dumps(ROWS)[:-10]), CHUNK)
+    assert next(rows) == ROWS[0]
+    assert next(rows) == ROWS[1]
+    with pytest.raises(json.JSONDecodeError):
+        next(rows)
+
+    text = "\n".join(json.dumps(r) for r in ROWS)[:-5]
+    rows = iter_rows(io.StringIO(text), CHUNK)
+    assert [next(rows), next(rows)] == ROWS[:2]
+    with pytest.raises(json.JSONDecodeError):
+        next(rows)
+
+    with pytest.raises(json.JSONDecodeError):
+        rows_of('{"rows": [1, 2')
+    with pytest.raises(json.JSONDecodeError):
+        rows_of('{"url" "a"}')
+
+
+def test_junk_input_raises():
+    with pytest.raises(json.JSONDecodeError):
+        rows_of("not json")
+    with pytest.raises(json.JSONDecodeError):
+        rows_of("[1 2]")
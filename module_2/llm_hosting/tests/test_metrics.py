@@ -0,0 +1,81 @@
+import pytest
+
+from metrics import Registry
+
+
+def test_counter_renders_sorted_escaped_labels():
+    reg = Registry()
+    hits = reg.counter("hits_total", "Rows by path.", ["path"])
+    hits.inc(path="rules")
+    hits.inc(2, path="rules")
+    hits.inc(0.5, path='say "hi"\\\n')
+    plain = reg.counter("calls_total", "Model calls.")
+    plain.inc()
+
+    assert reg.render() == (
+        "# HELP hits_total Rows by path.\n"
+        "# TYPE hits_total counter\n"
+        'hits_total{path="rules"} 3\n'
+        'hits_total{path="say \\"hi\\"\\\\\\n"} 0.5\n'
+        "# HELP calls_total Model calls.\n"
+        "# TYPE calls_total counter\n"
+        "calls_total 1\n"
+    )
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    reg = Registry()
+    latency = reg.histogram("latency_seconds", "Latency.", ["path"], buckets=[1.0, 0.1])
+    for value in (0.05, 0.1, 0.5, 7.0):
+        latency.observe(value, path="llm")
+
+    assert reg.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{path="llm",le="0.1"} 2',
+        'latency_seconds_bucket{path="llm",le="1"} 3',
+        'latency_seconds_bucket{path="llm",le="+Inf"} 4',
+        'latency_seconds_sum{path="llm"} 7.65',
+        'latency_seconds_count{path="llm"} 4',
+    ]
+
+
+def test_unlabelled_histogram_has_only_le_label():
+    reg = Registry()
+    reg.histogram("wait_seconds", "Wait.", buckets=[1]).observe(3)
+
+    assert reg.render().splitlines()[2:] == [
+        'wait_seconds_bucket{le="1"} 0',
+        'wait_seconds_bucket{le="+Inf"} 1',
+        "wait_seconds_sum 3",
+        "wait_seconds_count 1",
+    ]
+
+
+def test_collected_callbacks_are_read_at_scrape_time():
+    state = {"depth": 2, "by_path": {("rules",): 4, ("llm",): 1.5}}
+    reg = Registry()
+    reg.collect("queue_depth", "Rows waiting.", lambda: state["depth"])
+    reg.collect(
+        "rows_total", "Rows.", lambda: state["by_path"], kind="counter", labelnames=["path"]
+    )
+
+    first = reg.render()
+    state["depth"] = 5
+    assert first == (
+        "# HELP queue_depth Rows waiting.\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 2\n"
+        "# HELP rows_total Rows.\n"
+        "# TYPE rows_total counter\n"
+        'rows_total{path="llm"} 1.5\n'
+        'rows_total{path="rules"} 4\n'
+    )
+    assert "queue_depth 5\n" in reg.render()
+
+
+def test_duplicate_metric_names_are_rejected():
+    reg = Registry()
+    reg.counter("x_total", "X.")
+    with pytest.raises(ValueError, match="duplicate metric"):
+        reg.collect("x_total", "X again.", lambda: 0)
@@ -0,0 +1,128 @@
+from concurrent.futures import CancelledError
+
+import pytest
+
+from scheduler import MicroBatchScheduler
+
+
+class FakeModel:
+    """Batch callback that records each call and upper-cases its inputs."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.error:
+            raise self.error
+        return [t.upper() for t in texts]
+
+
+def _manual(model, **kwargs):
+    """Scheduler whose batching thread never starts; tests drive it by hand."""
+    sched = MicroBatchScheduler(model, **kwargs)
+    sched._ensure_worker = lambda: None
+    return sched
+
+
+def _texts(batch):
+    return [item.text for item in batch]
+
+
+def test_take_is_round_robin_across_requests():
+    sched = _manual(FakeModel())
+    for request_id, texts in (("A", "a1 a2 a3"), ("B", "b1"), ("C", "c1 c2")):
+        for text in texts.split():
+            sched.submit(text, request_id)
+
+    assert _texts(sched._take(4)) == ["a1", "b1", "c1", "a2"]
+    assert sched.queue_depth() == 2
+    assert _texts(sched._take(4)) == ["c2", "a3"]
+    assert sched.queue_depth() == 0
+
+
+def test_identical_texts_across_requests_run_once():
+    model = FakeModel()
+    sched = _manual(model)
+    futures = [sched.submit("x", "r1"), sched.submit("x", "r2"), sched.submit("y", "r1")]
+
+    sched._run(sched._take(8))
+
+    assert model.calls == [["x", "y"]]
+    assert [f.result(timeout=0) for f in futures] == ["X", "X", "Y"]
+    stats = sched.stats()
+    assert (stats["batches"], stats["rows_run"], stats["deduplicated"]) == (1, 3, 1)
+    assert stats["avg_batch_size"] == 3
+    assert sched.row_seconds() >= 0.0
+
+
+def test_drop_cancels_pending_rows_of_one_request():
+    model = FakeModel()
+    sched = _manual(model)
+    gone = [sched.submit("a", "r1"), sched.submit("b", "r1")]
+    kept = sched.submit("c", "r2")
+
+    assert sched.drop("r1") == 2
+    assert sched.drop("r1") == 0
+    assert all(f.cancelled() for f in gone)
+    assert sched.queue_depth() == 1
+
+    sched._run(sched._take(8))
+    assert model.calls == [["c"]]
+    assert kept.result(timeout=0) == "C"
+    assert sched.stats()["cancelled"] == 2
+
+
+def test_rows_cancelled_after_take_are_skipped():
+    model = FakeModel()
+    sched = _manual(model)
+    first = sched.submit("a", "r1")
+    second = sched.submit("b", "r2")
+    batch = sched._take(8)
+    first.cancel()
+
+    sched._run(batch)
+    assert model.calls == [["b"]]
+    assert second.result(timeout=0) == "B"
+    assert sched.stats()["cancelled"] == 1
+
+    # a batch whose rows were all cancelled never reaches the model
+    third = sched.submit("c", "r3")
+    batch = sched._take(8)
+    third.cancel()
+    sched._run(batch)
+    assert model.calls == [["b"]]
+    with pytest.raises(CancelledError):
+        third.result(timeout=0)
+
+
+def test_callback_error_reaches_every_caller():
+    sched = _manual(FakeModel(error=RuntimeError("model down")))
+    futures = [sched.submit("a", "r1"), sched.submit("b", "r2")]
+
+    sched._run(sched._take(8))
+
+    for f in futures:
+        with pytest.raises(RuntimeError, match="model down"):
+            f.result(timeout=0)
+    assert sched.stats()["batches"] == 1
+
+
+def test_background_thread_runs_full_batches():
+    model = FakeModel()
+    sched = MicroBatchScheduler(model, max_batch_size=2, max_wait_ms=10_000)
+    futures = [sched.submit("a", "r1"), sched.submit("b", "r2")]
+
+    # a full batch does not wait out max_wait_ms
+    assert [f.result(timeout=5) for f in futures] == ["A", "B"]
+    assert model.calls == [["a", "b"]]
+    assert sched.stats()["max_queue_depth"] >= 1
+
+
+def test_background_thread_flushes_partial_batch_after_wait():
+    model = FakeModel()
+    sched = MicroBatchScheduler(model, max_batch_size=8, max_wait_ms=20)
+
+    assert sched.submit("a", "r1").result(timeout=5) == "A"
+    assert model.calls == [["a"]]
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""Sweep llama.cpp threads, batch size and context size on this host.
+
+Loads the model once per configuration, runs a sample of real program texts
+through the same model call the service uses, and records throughput and
+per-row latency for each. The best configuration is written to
+TUNING_FILE (default `llm_tuning.json`), which `_load_llm` reads at startup
+for any of N_THREADS / N_BATCH / N_CTX not set in the environment.
+
+    python tune.py                                # default sweep, 24 rows
+    python tune.py --threads 1,2,4 --batch 256,512 --ctx 1024,2048
+    python tune.py --objective p95 --sample 48
+    python tune.py --out /tmp/tuning.json --json
+
+Oversubscribed threads (more than the physical cores free for inference)
+usually make every row slower, so the default sweep stops at the CPU count.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, List
+
+import app
+
+OBJECTIVES = ("throughput", "p95")
+
+
+def _int_list(value: str) -> List[int]:
+    try:
+        items = sorted({int(v) for v in value.split(",") if v.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers: {value!r}")
+    if not items or items[0] <= 0:
+        raise argparse.ArgumentTypeError(f"expected positive integers: {value!r}")
+    return items
+
+
+def default_threads(cpus: int | None = None) -> List[int]:
+    """Powers of two up to the CPU count, plus the CPU count itself."""
+    cpus = cpus or os.cpu_count() or 2
+    counts = {cpus}
+    n = 1
+    while n < cpus:
+        counts.add(n)
+        n *= 2
+    return sorted(counts)
+
+
+def sample_programs(path: str, n: int) -> List[str]:
+    """The first `n` distinct, non-empty program texts in `path`."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    rows = data["rows"] if isinstance(data, dict) else data
+    texts = dict.fromkeys((row or {}).get("program") or "" for row in rows)
+    return [t for t in texts if t.strip()][:n]
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def measure(model_path: str, params: Dict[str, int], texts: List[str]) -> Dict[str, Any]:
+    """Load with `params`, warm up, then time one model call per text."""
+    result: Dict[str, Any] = dict(params)
+    llm = None
+    try:
+        t0 = time.perf_counter()
+        llm = app._new_llm(model_path, params)
+        result["load_seconds"] = round(time.perf_counter() - t0, 3)
+        app.set_model(llm)
+        app._warm(llm)
+
+        before = dict(app.DECODE_COUNTS)
+        latencies = []
+        started = time.perf_counter()
+        for text in texts:
+            t = time.perf_counter()
+            app._model_output(text)
+            latencies.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - started
+        tokens = app.DECODE_COUNTS["completion_tokens"] - before["completion_tokens"]
+    except Exception as exc:  # e.g. a context too small for the prompt
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        return result
+    finally:
+        close = getattr(llm, "close", None)
+        if close is not None:
+            close()
+        llm = None
+        gc.collect()
+
+    result.update(
+        {
+            "rows": len(texts),
+            "rows_per_sec": round(len(texts) / elapsed, 3) if elapsed else 0.0,
+            "tokens_per_sec": round(tokens / elapsed, 1) if elapsed else 0.0,
+            "mean_ms": round(1000 * elapsed / len(texts), 2),
+            "p50_ms": round(1000 * _percentile(latencies, 0.5), 2),
+            "p95_ms": round(1000 * _percentile(latencies, 0.95), 2),
+        }
+    )
+    return result
+
+
+def pick_best(results: List[Dict[str, Any]], objective: str) -> Dict[str, Any] | None:
+    """Highest rows/sec (or lowest p95); ties go to fewer threads, then less memory."""
+    ok = [r for r in results if "error" not in r]
+    if not ok:
+        return None
+    if objective == "p95":
+        rank = lambda r: (r["p95_ms"], -r["rows_per_sec"])  # noqa: E731
+    else:
+        rank = lambda r: (-r["rows_per_sec"], r["p95_ms"])  # noqa: E731
+    return min(ok, key=lambda r: (rank(r), r["n_threads"], r["n_ctx"], r["n_batch"]))
+
+
+def write_tuning(path: str, report: Dict[str, Any]) -> None:
+    """Write the report atomically, so a starting service never reads half a file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def tune(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the sweep and return the report (best settings plus every result)."""
+    texts = sample_programs(args.data, args.sample)
+    if not texts:
+        raise SystemExit(f"no program texts in {args.data}")
+    model_path = app._resolve_model_path()
+
+    results = []
+    grid = list(itertools.product(args.threads, args.batch, args.ctx))
+    for i, (threads, batch, ctx) in enumerate(grid, 1):
+        params = {"n_threads": threads, "n_batch": batch, "n_ctx": ctx}
+        result = measure(model_path, params, texts)
+        results.append(result)
+        if "error" in result:
+            status = result["error"]
+        else:
+            status = (
+                f"{result['rows_per_sec']:.2f} rows/sec, "
+                f"p50 {result['p50_ms']:.0f} ms, p95 {result['p95_ms']:.0f} ms"
+            )
+        print(
+            f"[{i}/{len(grid)}] threads={threads} batch={batch} ctx={ctx}: {status}",
+            file=sys.stderr,
+        )
+
+    best = pick_best(results, args.objective)
+    return {
+        "best": (
+            {key: best[key] for key in app.DEFAULT_LLM_PARAMS} if best else None
+        ),
+        "objective": args.objective,
+        "host": {"cpu_count": os.cpu_count(), "machine": platform.machine()},
+        "model_file": os.path.basename(model_path),
+        "grammar_decoding": app.GRAMMAR_DECODING,
+        "sample_rows": len(texts),
+        "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--threads",
+        type=_int_list,
+        default=default_threads(),
+        help="Comma-separated thread counts (default: powers of two up to the CPU count).",
+    )
+    parser.add_argument("--batch", type=_int_list, default=[128, 256, 512])
+    parser.add_argument("--ctx", type=_int_list, default=[1024, 2048])
+    parser.add_argument("--data", default="sample_data.json", help="Rows to sample program texts from.")
+    parser.add_argument("--sample", type=int, default=24, help="Distinct program texts per configuration.")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="throughput")
+    parser.add_argument(
+        "--out",
+        default=app.TUNING_FILE or "llm_tuning.json",
+        help="Where to write the best settings (default: TUNING_FILE).",
+    )
+    parser.add_argument("--no-write", action="store_true", help="Only print the results.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = tune(args)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'threads':>8}{'batch':>7}{'ctx':>6}{'rows/s':>10}{'tok/s':>10}{'p50 ms':>9}{'p95 ms':>9}")
+        for r in report["results"]:
+            if "error" in r:
+                print(f"{r['n_threads']:>8}{r['n_batch']:>7}{r['n_ctx']:>6}  {r['error']}")
+                continue
+            print(
+                f"{r['n_threads']:>8}{r['n_batch']:>7}{r['n_ctx']:>6}{r['rows_per_sec']:>10.2f}"
+                f"{r['tokens_per_sec']:>10.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+            )
+        print(f"best ({report['objective']}): {report['best']}")
+
+    if report["best"] is None:
+        raise SystemExit("every configuration failed; nothing written")
+    if not args.no_write:
+        write_tuning(args.out, report)
+        print(f"wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
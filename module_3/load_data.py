@@ -1,8 +1,14 @@
+import argparse
 import json
 import re
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 import psycopg
 from datetime import datetime
 
+from tagger import default_tagger
+
 DB_CONFIG = {
     "dbname": "gradcafe",
     "user": "postgres",
@@ -114,76 +120,453 @@ def normalize_gpa(v):
     return None
 
 
+# ---------- Canonical tagging ----------
+
+# Lookup tables + indexed id columns, so analytics filter on integers
+# instead of ILIKE '%...%' scans over the raw program text.
+TAG_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS universities (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS programs (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    ALTER TABLE applicants
+        ADD COLUMN IF NOT EXISTS university_id INTEGER REFERENCES universities(id),
+        ADD COLUMN IF NOT EXISTS program_id INTEGER REFERENCES programs(id);
+    CREATE INDEX IF NOT EXISTS ix_applicants_university_program
+        ON applicants(university_id, program_id);
+    CREATE INDEX IF NOT EXISTS ix_applicants_program
+        ON applicants(program_id);
+"""
+
+# Season and year split out of term ("Fall 2026" -> 'Fall', 2026) as stored
+# generated columns, so term filters hit an index instead of TRIM(term) on
+# every row. Terms not shaped like "<Season> <YYYY>" leave both NULL.
+TERM_SCHEMA = """
+    ALTER TABLE applicants
+        ADD COLUMN IF NOT EXISTS term_season TEXT GENERATED ALWAYS AS (
+            CASE WHEN btrim(term) ~ '^[A-Za-z]+ [0-9]{4}$'
+                 THEN split_part(btrim(term), ' ', 1) END
+        ) STORED,
+        ADD COLUMN IF NOT EXISTS term_year INTEGER GENERATED ALWAYS AS (
+            CASE WHEN btrim(term) ~ '^[A-Za-z]+ [0-9]{4}$'
+                 THEN split_part(btrim(term), ' ', 2)::integer END
+        ) STORED;
+    CREATE INDEX IF NOT EXISTS ix_applicants_term
+        ON applicants(term_year, term_season, status);
+"""
+
+def has_columns(cur, names):
+    """True if applicants already has every column in `names`."""
+    cur.execute("""
+        SELECT count(*) FROM pg_attribute
+        WHERE attrelid = 'applicants'::regclass
+          AND attname = ANY(%s)
+          AND NOT attisdropped
+    """, (list(names),))
+    return cur.fetchone()[0] == len(names)
+
+def ensure_tag_schema(cur):
+    """
+    Apply TAG_SCHEMA and TERM_SCHEMA unless their columns already exist.
+    Even a no-op ALTER TABLE takes an exclusive lock that queues every
+    reader behind it.
+    """
+    if not has_columns(cur, ("university_id", "program_id")):
+        cur.execute(TAG_SCHEMA)
+    if not has_columns(cur, ("term_season", "term_year")):
+        cur.execute(TERM_SCHEMA)
+
+def sync_canon_ids(cur, tagger):
+    """Upsert canonical names; return ({university: id}, {program: id})."""
+    ids = []
+    for table, names in (("universities", tagger.universities), ("programs", tagger.programs)):
+        cur.execute(
+            f"INSERT INTO {table} (name) SELECT unnest(%s::text[]) ON CONFLICT (name) DO NOTHING",
+            (names,),
+        )
+        cur.execute(f"SELECT name, id FROM {table}")
+        ids.append(dict(cur.fetchall()))
+    return ids[0], ids[1]
+
+
+# ---------- Row normalization ----------
+
+# Column order shared by the INSERT and COPY paths.
+COLUMNS = (
+    "program",
+    "comments",
+    "date_added",
+    "url",
+    "status",
+    "term",
+    "us_or_international",
+    "gpa",
+    "gre",
+    "gre_v",
+    "gre_aw",
+    "degree",
+    "llm_generated_program",
+    "llm_generated_university",
+    "university_id",
+    "program_id",
+)
+
+BATCH_SIZE = 5000
+
+def normalize_row(r, ids_for, date_for):
+    """Map one instructor row to a tuple in COLUMNS order."""
+    program = clean_text(r.get("program"))
+    university_id, program_id = ids_for(program)
+    return (
+        program,
+        clean_text(r.get("comments")),
+        date_for(r.get("date_added")),
+        clean_text(r.get("url")),
+        normalize_status(r.get("applicant_status")),
+        clean_text(r.get("semester_year_start")),  # e.g. "Fall 2026"
+        normalize_citizenship(r.get("citizenship")),
+        normalize_gpa(r.get("gpa")),
+        safe_float(r.get("gre")),
+        safe_float(r.get("gre_v")),
+        safe_float(r.get("gre_aw")),
+        normalize_degree(r.get("masters_or_phd")),
+        clean_text(r.get("llm-generated-program")),
+        clean_text(r.get("llm-generated-university")),
+        university_id,
+        program_id,
+    )
+
+def normalized_batches(rows, tagger, uni_ids, prog_ids, batch_size=BATCH_SIZE):
+    """
+    Yield lists of up to batch_size normalized rows.
+
+    Program strings and dates repeat heavily across an archive, so each
+    distinct value is tagged / parsed once per load.
+    """
+    tag_cache = {}
+    date_cache = {}
+
+    def ids_for(program):
+        ids = tag_cache.get(program)
+        if ids is None:
+            tag = tagger.tag(program)  # one Aho-Corasick pass per distinct string
+            ids = tag_cache[program] = (uni_ids.get(tag.university), prog_ids.get(tag.program))
+        return ids
+
+    def date_for(value):
+        if value not in date_cache:
+            date_cache[value] = parse_date(value)
+        return date_cache[value]
+
+    batch = []
+    for r in rows:
+        batch.append(normalize_row(r, ids_for, date_for))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------- Writers ----------
+
+# Binary COPY sends Python values in these exact Postgres encodings, so it
+# is only used when the table matches; anything else falls back to text COPY,
+# where the server parses values the same way it does for INSERT.
+BINARY_TYPES = {
+    "text": ("text", "character varying"),
+    "date": ("date",),
+    "float": ("double precision",),
+    "int": ("integer",),
+}
+COLUMN_KINDS = (
+    "text", "text", "date", "text", "text", "text", "text",
+    "float", "float", "float", "float",
+    "text", "text", "text", "int", "int",
+)
+
+def binary_copy_types(cur, table="applicants"):
+    """Catalog type names of COLUMNS if binary COPY is safe, else None."""
+    cur.execute("""
+        SELECT attname, atttypid::regtype::text
+        FROM pg_attribute
+        WHERE attrelid = %s::regclass
+          AND attnum > 0
+          AND NOT attisdropped
+    """, (table,))
+    types = dict(cur.fetchall())
+    names = [types.get(c) for c in COLUMNS]
+    for name, kind in zip(names, COLUMN_KINDS):
+        if name not in BINARY_TYPES[kind]:
+            return None
+    return names
+
+def insert_batches(cur, batches, table="applicants"):
+    """One INSERT round-trip per row (the original path; kept for comparison)."""
+    stmt = (
+        f"INSERT INTO {table} ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(COLUMNS))})"
+    )
+    count = 0
+    for batch in batches:
+        for row in batch:
+            cur.execute(stmt, row)
+        count += len(batch)
+    return count
+
+def copy_batches(cur, batches, binary=True, table="applicants"):
+    """
+    Stream rows with COPY ... FROM STDIN: no per-row round-trips.
+    Returns (rows written, "binary" or "text").
+    """
+    types = binary_copy_types(cur, table) if binary else None
+    stmt = f"COPY {table} ({', '.join(COLUMNS)}) FROM STDIN"
+    if types:
+        stmt += " (FORMAT BINARY)"
+
+    count = 0
+    with cur.copy(stmt) as copy:
+        if types:
+            copy.set_types(types)
+        for batch in batches:
+            for row in batch:
+                copy.write_row(row)
+            count += len(batch)
+    return count, "binary" if types else "text"
+
+def write_rows(cur, batches, mode="copy", binary=True, table="applicants"):
+    """Send batches with the chosen writer; return (rows written, description)."""
+    if mode == "insert":
+        return insert_batches(cur, batches, table), "INSERT"
+    count, fmt = copy_batches(cur, batches, binary=binary, table=table)
+    return count, f"COPY {fmt}"
+
+
+# ---------- Parallel loading ----------
+
+def partition_rows(rows, partitions):
+    """
+    Split rows into `partitions` lists by a stable hash of the cleaned URL,
+    so every copy of a URL goes through the same loader.
+    """
+    parts = [[] for _ in range(max(1, partitions))]
+    for r in rows:
+        key = (clean_text(r.get("url")) or "").encode("utf-8")
+        parts[zlib.crc32(key) % len(parts)].append(r)
+    return parts
+
+def load_partition(job):
+    """Worker-process body: normalize one partition and write it on its own connection."""
+    index, rows, uni_ids, prog_ids, mode, batch_size, binary, table = job
+    started = time.perf_counter()
+    tagger = default_tagger()
+    with psycopg.connect(**DB_CONFIG) as conn:
+        with conn.cursor() as cur:
+            batches = normalized_batches(rows, tagger, uni_ids, prog_ids, batch_size)
+            count, how = write_rows(cur, batches, mode, binary, table)
+        conn.commit()
+    return index, count, time.perf_counter() - started, how
+
+def parallel_load(rows, uni_ids, prog_ids, workers, mode="copy", batch_size=BATCH_SIZE,
+                  binary=True, table="applicants"):
+    """
+    Load URL-hash partitions concurrently, one process and connection each.
+    Prints rows/sec per partition; returns (rows written, description).
+    """
+    jobs = [
+        (i, part, uni_ids, prog_ids, mode, batch_size, binary, table)
+        for i, part in enumerate(partition_rows(rows, workers))
+        if part
+    ]
+    total, how = 0, mode
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        for index, count, elapsed, how in pool.map(load_partition, jobs):
+            rate = count / elapsed if elapsed else 0.0
+            print(f"  partition {index}: {count} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+            total += count
+    return total, f"{how} x{len(jobs)} partitions"
+
+
+# ---------- Shadow-table swap ----------
+
+SHADOW_TABLE = "applicants_shadow"
+SWAP_LOCK_TIMEOUT = "2s"  # how long readers may queue behind the swap
+SWAP_ATTEMPTS = 5
+
+def serial_columns(cur, table="applicants"):
+    """[(column, sequence)] for columns whose default draws from an owned sequence."""
+    cur.execute("""
+        SELECT attname, pg_get_serial_sequence(%s, attname)
+        FROM pg_attribute
+        WHERE attrelid = %s::regclass
+          AND attnum > 0
+          AND NOT attisdropped
+    """, (table, table))
+    return [(col, seq) for col, seq in cur.fetchall() if seq]
+
+def create_shadow(cur, table="applicants", shadow=SHADOW_TABLE):
+    """
+    Empty copy of `table` (columns, defaults, generated columns, NOT NULL/CHECK)
+    with no indexes, so the load does not maintain them row by row.
+    """
+    cur.execute(f"DROP TABLE IF EXISTS {shadow}")  # left over from a failed reload
+    cur.execute(
+        f"CREATE TABLE {shadow} "
+        f"(LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS)"
+    )
+    # The copied defaults share the live table's sequences; restart them the
+    # way TRUNCATE ... RESTART IDENTITY did (load_data is the only writer).
+    for _, seq in serial_columns(cur, table):
+        cur.execute("SELECT setval(%s, 1, false)", (seq,))
+
+def build_shadow_indexes(cur, table="applicants", shadow=SHADOW_TABLE):
+    """
+    Recreate `table`'s indexes, primary/unique keys and foreign keys on the
+    loaded shadow under `_shadow` names. Returns the renames that give them
+    their real names once the shadow is swapped in.
+    """
+    renames = []
+    cur.execute("""
+        SELECT i.relname, pg_get_indexdef(i.oid), c.conname, c.contype
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid AND c.conrelid = x.indrelid
+        WHERE x.indrelid = %s::regclass
+    """, (table,))
+    for index, indexdef, conname, contype in cur.fetchall():
+        temp = f"{index}_shadow"
+        ddl = re.sub(r"INDEX \S+ ON (ONLY )?\S+", f"INDEX {temp} ON {shadow}", indexdef, count=1)
+        cur.execute(ddl)
+        if contype in ("p", "u"):
+            kind = "PRIMARY KEY" if contype == "p" else "UNIQUE"
+            cur.execute(
+                f"ALTER TABLE {shadow} ADD CONSTRAINT {conname}_shadow {kind} USING INDEX {temp}"
+            )
+            renames.append(f"ALTER TABLE {table} RENAME CONSTRAINT {conname}_shadow TO {conname}")
+        else:
+            renames.append(f"ALTER INDEX {temp} RENAME TO {index}")
+
+    cur.execute("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f'
+    """, (table,))
+    for conname, definition in cur.fetchall():
+        cur.execute(f"ALTER TABLE {shadow} ADD CONSTRAINT {conname}_shadow {definition}")
+        renames.append(f"ALTER TABLE {table} RENAME CONSTRAINT {conname}_shadow TO {conname}")
+
+    cur.execute(f"ANALYZE {shadow}")  # planner stats are ready the moment it goes live
+    return renames
+
+def swap_in_shadow(conn, renames, table="applicants", shadow=SHADOW_TABLE):
+    """
+    Replace `table` with the loaded shadow in one transaction: readers see
+    either the old rows or the new ones, never a partial table.
+
+    DROP TABLE waits for in-flight readers, and new readers queue behind it,
+    so the swap gives up after SWAP_LOCK_TIMEOUT and retries rather than
+    stall the site behind a long query.
+    """
+    for attempt in range(1, SWAP_ATTEMPTS + 1):
+        try:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    cur.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+                    # Sequences owned by the old table would be dropped with it.
+                    for col, seq in serial_columns(cur, table):
+                        cur.execute(f"ALTER SEQUENCE {seq} OWNED BY {shadow}.{col}")
+                    cur.execute(f"DROP TABLE {table}")
+                    cur.execute(f"ALTER TABLE {shadow} RENAME TO {table}")
+                    for ddl in renames:
+                        cur.execute(ddl)
+            return
+        except psycopg.errors.LockNotAvailable:
+            if attempt == SWAP_ATTEMPTS:
+                raise
+            print(f"  swap blocked by readers; retrying ({attempt}/{SWAP_ATTEMPTS - 1})")
+            time.sleep(attempt)
+
+
 # ---------- Main loader ----------
 
-def load_data():
+def load_data(mode="copy", batch_size=BATCH_SIZE, binary=True, workers=1, in_place=False):
+    """
+    Reload applicants from DATA_PATH.
+
+    By default rows go into a fresh shadow table; its indexes and keys are
+    built after the load and it is swapped in with a rename, so the app keeps
+    reading the previous data until the new table is complete. in_place=True
+    is the old TRUNCATE-and-reload path.
+
+    mode="copy" streams normalized batches through COPY (binary when the
+    table's column types allow it); mode="insert" is the old row-by-row path.
+    workers > 1 splits the rows by URL hash and loads the partitions in
+    parallel processes over separate connections. In place, the truncate
+    then commits first, so a failed partition leaves a partial table; rerun
+    to reload.
+    Prints and returns rows/sec.
+    """
+    started = time.perf_counter()
     rows = load_json_or_jsonl(DATA_PATH)
     if not rows:
         raise RuntimeError(f"No rows found in {DATA_PATH}")
 
+    tagger = default_tagger()
+    target = "applicants" if in_place else SHADOW_TABLE
+
     with psycopg.connect(**DB_CONFIG) as conn:
         with conn.cursor() as cur:
-            # Wipe previous bad loads
-            cur.execute("TRUNCATE TABLE applicants RESTART IDENTITY;")
-
-            for r in rows:
-                program = clean_text(r.get("program"))
-                comments = clean_text(r.get("comments"))
-                date_added = parse_date(r.get("date_added"))
-                url = clean_text(r.get("url"))
-
-                status = normalize_status(r.get("applicant_status"))
-                term = clean_text(r.get("semester_year_start"))  # e.g. "Fall 2026"
-
-                us_or_international = normalize_citizenship(r.get("citizenship"))
-
-                gpa = normalize_gpa(r.get("gpa"))
-                gre = safe_float(r.get("gre"))
-                gre_v = safe_float(r.get("gre_v"))
-                gre_aw = safe_float(r.get("gre_aw"))
-
-                degree = normalize_degree(r.get("masters_or_phd"))
-
-                llm_generated_program = clean_text(r.get("llm-generated-program"))
-                llm_generated_university = clean_text(r.get("llm-generated-university"))
-
-                cur.execute("""
-                    INSERT INTO applicants (
-                        program,
-                        comments,
-                        date_added,
-                        url,
-                        status,
-                        term,
-                        us_or_international,
-                        gpa,
-                        gre,
-                        gre_v,
-                        gre_aw,
-                        degree,
-                        llm_generated_program,
-                        llm_generated_university
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    program,
-                    comments,
-                    date_added,
-                    url,
-                    status,
-                    term,
-                    us_or_international,
-                    gpa,
-                    gre,
-                    gre_v,
-                    gre_aw,
-                    degree,
-                    llm_generated_program,
-                    llm_generated_university
-                ))
+            ensure_tag_schema(cur)
+            uni_ids, prog_ids = sync_canon_ids(cur, tagger)
+        conn.commit()
+
+        with conn.cursor() as cur:
+            if in_place:
+                # Wipe previous bad loads
+                cur.execute("TRUNCATE TABLE applicants RESTART IDENTITY;")
+            else:
+                create_shadow(cur)
+
+            if workers <= 1:
+                batches = normalized_batches(rows, tagger, uni_ids, prog_ids, batch_size)
+                count, how = write_rows(cur, batches, mode, binary, target)
 
         conn.commit()
 
+        if workers > 1:
+            count, how = parallel_load(rows, uni_ids, prog_ids, workers, mode, batch_size,
+                                       binary, target)
+
+        if not in_place:
+            with conn.cursor() as cur:
+                renames = build_shadow_indexes(cur)
+            conn.commit()
+            swap_in_shadow(conn, renames)
+            how += ", shadow swap"
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Loaded {count} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec) via {how}")
+    return rate
+
 
 if __name__ == "__main__":
-    load_data()
+    parser = argparse.ArgumentParser(description="Reload the applicants table.")
+    parser.add_argument("--mode", choices=("copy", "insert"), default="copy",
+                        help="copy: bulk COPY FROM STDIN (default); insert: one INSERT per row")
+    parser.add_argument("--text", action="store_true", help="Use text COPY even if binary is possible.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--data", default=DATA_PATH, help="JSON or JSONL input file.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Load URL-hash partitions in this many processes (default 1).")
+    parser.add_argument("--in-place", action="store_true",
+                        help="TRUNCATE and reload applicants directly instead of swapping in a "
+                             "shadow table (readers see an empty/partial table meanwhile).")
+    args = parser.parse_args()
+    DATA_PATH = args.data
+    load_data(mode=args.mode, batch_size=args.batch_size, binary=not args.text,
+              workers=args.workers, in_place=args.in_place)
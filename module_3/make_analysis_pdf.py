@@ -47,9 +47,9 @@ def build_items():
         """
         SELECT COUNT(*)
         FROM applicants
-        WHERE TRIM(term) = 'Fall 2026';
+        WHERE term_season = 'Fall' AND term_year = 2026;
         """,
-        "Counts all rows where term equals 'Fall 2026' (TRIM avoids trailing-space mismatches)."
+        "Counts all rows whose term is Fall 2026, using the indexed term_season/term_year columns."
     )
 
     add(
@@ -90,7 +90,7 @@ def build_items():
         """
         SELECT ROUND(AVG(gpa)::numeric, 2)
         FROM applicants
-        WHERE TRIM(term) = 'Fall 2026'
+        WHERE term_season = 'Fall' AND term_year = 2026
           AND us_or_international = 'American'
           AND gpa IS NOT NULL;
         """,
@@ -102,17 +102,17 @@ def build_items():
         """
         SELECT
           CASE
-            WHEN (SELECT COUNT(*) FROM applicants WHERE TRIM(term) = 'Fall 2026') = 0
+            WHEN (SELECT COUNT(*) FROM applicants WHERE term_season = 'Fall' AND term_year = 2026) = 0
             THEN 0
             ELSE ROUND(
               (100.0 * COUNT(*) /
-               (SELECT COUNT(*) FROM applicants WHERE TRIM(term) = 'Fall 2026')
+               (SELECT COUNT(*) FROM applicants WHERE term_season = 'Fall' AND term_year = 2026)
               )::numeric,
               2
             )
           END
         FROM applicants
-        WHERE TRIM(term) = 'Fall 2026'
+        WHERE term_season = 'Fall' AND term_year = 2026
           AND status = 'Accepted';
         """,
         "Accepted count divided by total Fall 2026 count times 100; CASE prevents division by zero."
@@ -123,7 +123,7 @@ def build_items():
         """
         SELECT ROUND(AVG(gpa)::numeric, 2)
         FROM applicants
-        WHERE TRIM(term) = 'Fall 2026'
+        WHERE term_season = 'Fall' AND term_year = 2026
           AND status = 'Accepted'
           AND gpa IS NOT NULL;
         """,
@@ -135,11 +135,11 @@ def build_items():
         """
         SELECT COUNT(*)
         FROM applicants
-        WHERE program ILIKE '%Johns Hopkins%'
-          AND program ILIKE '%Computer Science%'
+        WHERE university_id = (SELECT id FROM universities WHERE name = 'Johns Hopkins University')
+          AND program_id = (SELECT id FROM programs WHERE name = 'Computer Science')
           AND degree = 'Masters';
         """,
-        "Case-insensitive matching with ILIKE on program text and restricts degree to Masters."
+        "Filters on the university/program ids tagged from the program text at load time and restricts degree to Masters."
     )
 
     add(
@@ -147,18 +147,21 @@ def build_items():
         """
         SELECT COUNT(*)
         FROM applicants
-        WHERE TRIM(term) = 'Fall 2026'
+        WHERE term_season = 'Fall' AND term_year = 2026
           AND degree = 'PhD'
           AND status = 'Accepted'
-          AND program ILIKE '%Computer Science%'
-          AND (
-            program ILIKE '%Georgetown%' OR
-            program ILIKE '%MIT%' OR
-            program ILIKE '%Stanford%' OR
-            program ILIKE '%Carnegie Mellon%'
+          AND program_id = (SELECT id FROM programs WHERE name = 'Computer Science')
+          AND university_id IN (
+            SELECT id FROM universities
+            WHERE name IN (
+              'Georgetown University',
+              'Massachusetts Institute of Technology',
+              'Stanford University',
+              'Carnegie Mellon University'
+            )
           );
         """,
-        "Filters by term/degree/status and matches university keywords inside the original program text."
+        "Filters by term/degree/status and on the university/program ids tagged from the original program text at load time."
     )
 
     add(
@@ -166,7 +169,7 @@ def build_items():
         """
         SELECT COUNT(*)
         FROM applicants
-        WHERE TRIM(term) = 'Fall 2026'
+        WHERE term_season = 'Fall' AND term_year = 2026
           AND degree = 'PhD'
           AND status = 'Accepted'
           AND llm_generated_program ILIKE '%Computer Science%'
@@ -20,7 +20,7 @@ def get_results():
         "Fall 2026 Applicants": run_query("""
             SELECT COUNT(*)
             FROM applicants
-            WHERE TRIM(term) = 'Fall 2026';
+            WHERE term_season = 'Fall' AND term_year = 2026;
         """)[0],
 
         # 2) % international (not American or Other) to 2 decimals
@@ -54,7 +54,7 @@ def get_results():
         "Avg GPA (American, Fall 2026)": run_query("""
             SELECT ROUND(AVG(gpa)::numeric, 2)
             FROM applicants
-            WHERE TRIM(term) = 'Fall 2026'
+            WHERE term_season = 'Fall' AND term_year = 2026
               AND us_or_international = 'American'
               AND gpa IS NOT NULL;
         """)[0],
@@ -63,17 +63,17 @@ def get_results():
         "Acceptance Rate (Fall 2026)": run_query("""
             SELECT
               CASE
-                WHEN (SELECT COUNT(*) FROM applicants WHERE TRIM(term) = 'Fall 2026') = 0
+                WHEN (SELECT COUNT(*) FROM applicants WHERE term_season = 'Fall' AND term_year = 2026) = 0
                 THEN 0
                 ELSE ROUND(
                   (100.0 * COUNT(*) /
-                   (SELECT COUNT(*) FROM applicants WHERE TRIM(term) = 'Fall 2026')
+                   (SELECT COUNT(*) FROM applicants WHERE term_season = 'Fall' AND term_year = 2026)
                   )::numeric,
                   2
                 )
               END
             FROM applicants
-            WHERE TRIM(term) = 'Fall 2026'
+            WHERE term_season = 'Fall' AND term_year = 2026
               AND status = 'Accepted';
         """)[0],
 
@@ -81,7 +81,7 @@ def get_results():
         "Avg GPA (Accepted, Fall 2026)": run_query("""
             SELECT ROUND(AVG(gpa)::numeric, 2)
             FROM applicants
-            WHERE TRIM(term) = 'Fall 2026'
+            WHERE term_season = 'Fall' AND term_year = 2026
               AND status = 'Accepted'
               AND gpa IS NOT NULL;
         """)[0],
@@ -90,8 +90,8 @@ def get_results():
         "JHU Masters CS Applicants": run_query("""
             SELECT COUNT(*)
             FROM applicants
-            WHERE program ILIKE '%Johns Hopkins%'
-              AND program ILIKE '%Computer Science%'
+            WHERE university_id = (SELECT id FROM universities WHERE name = 'Johns Hopkins University')
+              AND program_id = (SELECT id FROM programs WHERE name = 'Computer Science')
               AND degree = 'Masters';
         """)[0],
 
@@ -99,15 +99,18 @@ def get_results():
         "Fall 2026 Accepted PhD CS at Georgetown/MIT/Stanford/CMU (program text)": run_query("""
             SELECT COUNT(*)
             FROM applicants
-            WHERE TRIM(term) = 'Fall 2026'
+            WHERE term_season = 'Fall' AND term_year = 2026
               AND status = 'Accepted'
               AND degree = 'PhD'
-              AND program ILIKE '%Computer Science%'
-              AND (
-                program ILIKE '%Georgetown%' OR
-                program ILIKE '%MIT%' OR
-                program ILIKE '%Stanford%' OR
-                program ILIKE '%Carnegie Mellon%'
+              AND program_id = (SELECT id FROM programs WHERE name = 'Computer Science')
+              AND university_id IN (
+                SELECT id FROM universities
+                WHERE name IN (
+                  'Georgetown University',
+                  'Massachusetts Institute of Technology',
+                  'Stanford University',
+                  'Carnegie Mellon University'
+                )
               );
         """)[0],
 
@@ -115,7 +118,7 @@ def get_results():
         "Fall 2026 Accepted PhD CS at Georgetown/MIT/Stanford/CMU (LLM fields)": run_query("""
             SELECT COUNT(*)
             FROM applicants
-            WHERE TRIM(term) = 'Fall 2026'
+            WHERE term_season = 'Fall' AND term_year = 2026
               AND status = 'Accepted'
               AND degree = 'PhD'
               AND llm_generated_program ILIKE '%Computer Science%'
@@ -11,7 +11,23 @@ def connect(db: DB):
     return psycopg.connect(db.url)
 
 def ensure_schema(db: DB) -> None:
-    """Create applicants table if it doesn't exist + enforce idempotency on url."""
+    """Create applicants table if it doesn't exist + enforce idempotency on url.
+
+    Also creates the universities/programs lookup tables and the indexed
+    university_id/program_id columns filled by the load-time tagger, and the
+    indexed term_season/term_year columns generated from term.
+    """
+    lookups = """
+    CREATE TABLE IF NOT EXISTS universities (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS programs (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    """
+
     ddl = """
     CREATE TABLE IF NOT EXISTS applicants (
         p_id SERIAL PRIMARY KEY,
@@ -39,10 +55,40 @@ def ensure_schema(db: DB) -> None:
     ON applicants(url)
     """
 
+    # Analytics filter on these instead of ILIKE '%...%' over program text.
+    tags = """
+    ALTER TABLE applicants
+        ADD COLUMN IF NOT EXISTS university_id INTEGER REFERENCES universities(id),
+        ADD COLUMN IF NOT EXISTS program_id INTEGER REFERENCES programs(id);
+    CREATE INDEX IF NOT EXISTS ix_applicants_university_program
+    ON applicants(university_id, program_id);
+    CREATE INDEX IF NOT EXISTS ix_applicants_program
+    ON applicants(program_id);
+    """
+
+    # "Fall 2026" -> ('Fall', 2026), kept in sync by Postgres, so term filters
+    # use an index instead of TRIM(term) on every row. NULL for other shapes.
+    terms = """
+    ALTER TABLE applicants
+        ADD COLUMN IF NOT EXISTS term_season TEXT GENERATED ALWAYS AS (
+            CASE WHEN btrim(term) ~ '^[A-Za-z]+ [0-9]{4}$'
+                 THEN split_part(btrim(term), ' ', 1) END
+        ) STORED,
+        ADD COLUMN IF NOT EXISTS term_year INTEGER GENERATED ALWAYS AS (
+            CASE WHEN btrim(term) ~ '^[A-Za-z]+ [0-9]{4}$'
+                 THEN split_part(btrim(term), ' ', 2)::integer END
+        ) STORED;
+    CREATE INDEX IF NOT EXISTS ix_applicants_term
+    ON applicants(term_year, term_season, status);
+    """
+
     with connect(db) as conn:
         with conn.cursor() as cur:
+            cur.execute(lookups)
             cur.execute(ddl)
             cur.execute(uniq)
+            cur.execute(tags)
+            cur.execute(terms)
         conn.commit()
 
 def truncate_all(db: DB) -> None:
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import json
 import re
+from itertools import islice
 from pathlib import Path
-from typing import Callable, List, Dict
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, TextIO, Tuple
 
 from .db import connect, DB
+from .tagger import Tagger, default_tagger
 
 
 # -------------------------------------------------
@@ -24,43 +26,114 @@ def safe_float(v):
     match = re.search(r"\d+(\.\d+)?", str(v))
     return float(match.group()) if match else None
 
-def file_scraper(path: str = "data/llm_extend_applicant_data.json") -> List[Dict]:
+DEFAULT_DATA_PATH = "data/llm_extend_applicant_data.json"
+READ_CHUNK = 1 << 16  # characters per refill while decoding a JSON array
+_ARRAY_GAP = " \t\r\n,"
+
+def _iter_json_array(handle: TextIO) -> Iterator[Dict]:
+    """Decode a JSON array one element at a time, refilling a small buffer."""
+    decoder = json.JSONDecoder()
+    buf = handle.read(READ_CHUNK)
+    pos, eof = buf.index("[") + 1, False
+    while True:
+        while pos < len(buf) and buf[pos] in _ARRAY_GAP:
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            row, end = decoder.raw_decode(buf, pos)
+            # A value that runs to the end of the buffer may be cut short (e.g. 12|3).
+            complete = end < len(buf) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield row
+            pos = end
+            continue
+        chunk = handle.read(READ_CHUNK)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+def _iter_file(path: Path) -> Iterator[Dict]:
+    with path.open("r", encoding="utf-8") as handle:
+        first = handle.read(READ_CHUNK).lstrip()[:1]
+        handle.seek(0)
+
+        # JSON array
+        if first == "[":
+            yield from _iter_json_array(handle)
+            return
+
+        # JSONL
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_rows(path: str = DEFAULT_DATA_PATH) -> Iterator[Dict]:
     """
     Default scraper used in production mode.
-    Reads from a local JSON or JSONL file.
+    Streams rows from a local JSON or JSONL file without reading it whole.
     """
     p = Path(path)
 
     if not p.exists():
         raise FileNotFoundError(f"Missing data file: {p.resolve()}")
 
-    text = p.read_text(encoding="utf-8").strip()
+    return _iter_file(p)
 
-    if not text:
-        return []
+def iter_batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Group any row iterable into lists of at most `size` rows."""
+    it = iter(rows)
+    while batch := list(islice(it, max(1, size))):
+        yield batch
 
-    # JSON array
-    if text.startswith("["):
-        return json.loads(text)
-
-    # JSONL
-    return [json.loads(line) for line in text.splitlines() if line.strip()]
+def file_scraper(path: str = DEFAULT_DATA_PATH) -> List[Dict]:
+    """
+    Reads every row from a local JSON or JSONL file into a list.
+    """
+    return list(iter_rows(path))
 
 
 # -------------------------------------------------
 # Insert Logic
 # -------------------------------------------------
 
-def insert_applicants(db: DB, rows: List[Dict]) -> int:
+def sync_canon_ids(cur, tagger: Tagger) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Upsert the tagger's canonical names into the lookup tables.
+    Returns (university ids, program ids) keyed by name.
+    """
+    cur.execute(
+        "INSERT INTO universities (name) SELECT unnest(%s::text[]) ON CONFLICT (name) DO NOTHING",
+        (tagger.universities,),
+    )
+    cur.execute("SELECT name, id FROM universities")
+    uni_ids = dict(cur.fetchall())
+    cur.execute(
+        "INSERT INTO programs (name) SELECT unnest(%s::text[]) ON CONFLICT (name) DO NOTHING",
+        (tagger.programs,),
+    )
+    cur.execute("SELECT name, id FROM programs")
+    prog_ids = dict(cur.fetchall())
+    return uni_ids, prog_ids
+
+
+def insert_applicants(db: DB, rows: List[Dict], tagger: Optional[Tagger] = None) -> int:
     """
     Insert applicant rows.
     Uses ON CONFLICT (url) to enforce idempotency.
+    Each program string is tagged once with its canonical university/program ids.
     """
+    tagger = tagger or default_tagger()
     inserted = 0
 
     with connect(db) as conn:
         with conn.cursor() as cur:
+            uni_ids, prog_ids = sync_canon_ids(cur, tagger)
             for r in rows:
+                program = clean_text(r.get("program"))
+                tag = tagger.tag(program)
                 cur.execute(
                     """
                     INSERT INTO applicants (
@@ -77,13 +150,15 @@ def insert_applicants(db: DB, rows: List[Dict]) -> int:
                         gre_aw,
                         degree,
                         llm_generated_program,
-                        llm_generated_university
+                        llm_generated_university,
+                        university_id,
+                        program_id
                     )
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
                     ON CONFLICT (url) DO NOTHING
                     """,
                     (
-                        clean_text(r.get("program")),
+                        program,
                         clean_text(r.get("comments")),
                         clean_text(r.get("date_added")),
                         clean_text(r.get("url")),
@@ -96,7 +171,9 @@ def insert_applicants(db: DB, rows: List[Dict]) -> int:
                         safe_float(r.get("gre_aw")),
                         clean_text(r.get("masters_or_phd") or r.get("degree")),
                         clean_text(r.get("llm-generated-program") or r.get("llm_generated_program")),
-                        clean_text(r.get("llm-generated-university") or r.get("llm_generated_university"))
+                        clean_text(r.get("llm-generated-university") or r.get("llm_generated_university")),
+                        uni_ids.get(tag.university),
+                        prog_ids.get(tag.program),
                     ),
                 )
                 inserted += cur.rowcount
@@ -106,16 +183,51 @@ def insert_applicants(db: DB, rows: List[Dict]) -> int:
     return inserted
 
 
+def retag_applicants(db: DB, tagger: Optional[Tagger] = None) -> int:
+    """
+    Re-tag every stored row (after editing the canonical lists, or for rows
+    loaded before tagging existed). Returns the number of rows changed.
+    """
+    tagger = tagger or default_tagger()
+
+    with connect(db) as conn:
+        with conn.cursor() as cur:
+            uni_ids, prog_ids = sync_canon_ids(cur, tagger)
+            cur.execute("SELECT p_id, program, university_id, program_id FROM applicants")
+            updates = []
+            for p_id, program, uni_id, prog_id in cur.fetchall():
+                tag = tagger.tag(program)
+                new_ids = (uni_ids.get(tag.university), prog_ids.get(tag.program))
+                if new_ids != (uni_id, prog_id):
+                    updates.append((*new_ids, p_id))
+            cur.executemany(
+                "UPDATE applicants SET university_id = %s, program_id = %s WHERE p_id = %s",
+                updates,
+            )
+        conn.commit()
+
+    return len(updates)
+
+
 # -------------------------------------------------
 # Pull & Load Orchestrator
 # -------------------------------------------------
 
-def pull_and_load(db: DB, scraper_fn: Callable[[], List[Dict]]) -> Dict:
+PULL_CHUNK_SIZE = 5000  # rows taken from the scraper per insert
+
+def pull_and_load(
+    db: DB,
+    scraper_fn: Callable[[], Iterable[Dict]],
+    chunk_size: int = PULL_CHUNK_SIZE,
+) -> Dict:
     """
-    Executes scraper + inserts rows.
+    Executes scraper + inserts rows, chunk_size at a time.
+    The scraper may return a list or a lazy iterator (iter_rows), so memory
+    stays bounded by one chunk. Each chunk commits on its own.
     """
-    rows = scraper_fn()
-    new_rows = insert_applicants(db, rows)
+    new_rows = 0
+    for chunk in iter_batches(scraper_fn(), chunk_size):
+        new_rows += insert_applicants(db, chunk)
 
     return {
         "ok": True,
@@ -4,7 +4,7 @@ import os
 from flask import Flask, jsonify, render_template, redirect, url_for
 
 from .db import DB, ensure_schema
-from .etl import pull_and_load, file_scraper
+from .etl import pull_and_load, iter_rows
 from .query_data import get_results
 
 
@@ -36,7 +36,7 @@ def create_app(
     # Default scraper wiring
     # ----------------------------------------
     if scraper_fn is None:
-        scraper_fn = file_scraper
+        scraper_fn = iter_rows
 
     if busy_flag is None:
         busy_flag = BusyFlag()
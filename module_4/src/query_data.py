@@ -33,7 +33,7 @@ def run_row(db: DB, sql: str):
 
 def get_results(db: DB) -> Dict[str, Any]:
     return {
-        "Fall 2026 Applicants": run_scalar(db, """SELECT COUNT(*) FROM applicants WHERE TRIM(term)='Fall 2026';"""),
+        "Fall 2026 Applicants": run_scalar(db, """SELECT COUNT(*) FROM applicants WHERE term_season='Fall' AND term_year=2026;"""),
         "International Percentage": run_scalar(db, """            SELECT ROUND((100.0 * COUNT(*) / NULLIF((SELECT COUNT(*) FROM applicants), 0))::numeric, 2)
             FROM applicants WHERE us_or_international='International';
         """),
@@ -47,42 +47,45 @@ def get_results(db: DB) -> Dict[str, Any]:
         """),
         "Avg GPA (American, Fall 2026)": run_scalar(db, """            SELECT ROUND(AVG(gpa)::numeric, 2)
             FROM applicants
-            WHERE TRIM(term)='Fall 2026' AND us_or_international='American' AND gpa IS NOT NULL;
+            WHERE term_season='Fall' AND term_year=2026 AND us_or_international='American' AND gpa IS NOT NULL;
         """),
         "Acceptance Rate (Fall 2026)": run_scalar(db, """            SELECT
               CASE
-                WHEN (SELECT COUNT(*) FROM applicants WHERE TRIM(term)='Fall 2026') = 0 THEN 0
-                ELSE ROUND((100.0 * COUNT(*) / (SELECT COUNT(*) FROM applicants WHERE TRIM(term)='Fall 2026'))::numeric, 2)
+                WHEN (SELECT COUNT(*) FROM applicants WHERE term_season='Fall' AND term_year=2026) = 0 THEN 0
+                ELSE ROUND((100.0 * COUNT(*) / (SELECT COUNT(*) FROM applicants WHERE term_season='Fall' AND term_year=2026))::numeric, 2)
               END
             FROM applicants
-            WHERE TRIM(term)='Fall 2026' AND status='Accepted';
+            WHERE term_season='Fall' AND term_year=2026 AND status='Accepted';
         """),
         "Avg GPA (Accepted, Fall 2026)": run_scalar(db, """            SELECT ROUND(AVG(gpa)::numeric, 2)
             FROM applicants
-            WHERE TRIM(term)='Fall 2026' AND status='Accepted' AND gpa IS NOT NULL;
+            WHERE term_season='Fall' AND term_year=2026 AND status='Accepted' AND gpa IS NOT NULL;
         """),
         "JHU Masters CS Applicants": run_scalar(db, """            SELECT COUNT(*)
             FROM applicants
-            WHERE program ILIKE '%Johns Hopkins%'
-              AND program ILIKE '%Computer Science%'
+            WHERE university_id = (SELECT id FROM universities WHERE name='Johns Hopkins University')
+              AND program_id = (SELECT id FROM programs WHERE name='Computer Science')
               AND degree='Masters';
         """),
         "Fall 2026 Accepted PhD CS at Georgetown/MIT/Stanford/CMU (program text)": run_scalar(db, """            SELECT COUNT(*)
             FROM applicants
-            WHERE TRIM(term)='Fall 2026'
+            WHERE term_season='Fall' AND term_year=2026
               AND status='Accepted'
               AND degree='PhD'
-              AND program ILIKE '%Computer Science%'
-              AND (
-                program ILIKE '%Georgetown%' OR
-                program ILIKE '%MIT%' OR
-                program ILIKE '%Stanford%' OR
-                program ILIKE '%Carnegie Mellon%'
+              AND program_id = (SELECT id FROM programs WHERE name='Computer Science')
+              AND university_id IN (
+                SELECT id FROM universities
+                WHERE name IN (
+                  'Georgetown University',
+                  'Massachusetts Institute of Technology',
+                  'Stanford University',
+                  'Carnegie Mellon University'
+                )
               );
         """),
         "Fall 2026 Accepted PhD CS at Georgetown/MIT/Stanford/CMU (LLM fields)": run_scalar(db, """            SELECT COUNT(*)
             FROM applicants
-            WHERE TRIM(term)='Fall 2026'
+            WHERE term_season='Fall' AND term_year=2026
               AND status='Accepted'
               AND degree='PhD'
               AND llm_generated_program ILIKE '%Computer Science%'
@@ -0,0 +1,204 @@
+"""Load-time university/program tagging with one Aho-Corasick automaton.
+
+Free-text ``program`` strings ("Computer Science, Johns Hopkins University",
+"MIT EECS") are scanned once against every canonical university and program
+name plus their aliases. Matches must start and end on word boundaries, so
+"MIT" never fires inside "Smith" or "Summit". Overlapping matches are
+resolved longest-first, then the longest remaining university and program
+win.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+UNIVERSITY = "university"
+PROGRAM = "program"
+
+_HERE = Path(__file__).resolve().parent
+CANON_UNIVERSITIES_PATH = _HERE / "canon_universities.txt"
+CANON_PROGRAMS_PATH = _HERE / "canon_programs.txt"
+
+# Short forms seen in scraped program strings -> canonical name.
+UNIVERSITY_ALIASES: Dict[str, str] = {
+    "MIT": "Massachusetts Institute of Technology",
+    "CMU": "Carnegie Mellon University",
+    "Carnegie Mellon": "Carnegie Mellon University",
+    "JHU": "Johns Hopkins University",
+    "Johns Hopkins": "Johns Hopkins University",
+    "Georgetown": "Georgetown University",
+    "Stanford": "Stanford University",
+    "Harvard": "Harvard University",
+    "Yale": "Yale University",
+    "Princeton": "Princeton University",
+    "Cornell": "Cornell University",
+    "Caltech": "California Institute of Technology",
+    "Georgia Tech": "Georgia Institute of Technology",
+    "UC Berkeley": "University of California, Berkeley",
+    "UCLA": "University of California, Los Angeles",
+    "USC": "University of Southern California",
+    "NYU": "New York University",
+    "UPenn": "University of Pennsylvania",
+    "UIUC": "University of Illinois Urbana-Champaign",
+    "UMich": "University of Michigan, Ann Arbor",
+    "UBC": "University of British Columbia",
+    "UofT": "University of Toronto",
+    "McGill": "McGill University",
+    "McG": "McGill University",
+}
+
+PROGRAM_ALIASES: Dict[str, str] = {
+    "CS": "Computer Science",
+    "Comp Sci": "Computer Science",
+    "ECE": "Electrical and Computer Engineering",
+    "EE": "Electrical Engineering",
+    "Info Studies": "Information Studies",
+    "Mathematic": "Mathematics",
+    "Math": "Mathematics",
+}
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+Payload = Tuple[str, str]  # (kind, canonical name)
+
+
+def normalize(text: str) -> str:
+    """Case-folded text with punctuation and whitespace runs collapsed to one space."""
+    return _NON_WORD_RE.sub(" ", text.casefold()).strip()
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every pattern occurrence."""
+
+    def __init__(self, patterns: Mapping[str, Payload]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Payload]]] = [[]]
+        for pattern, payload in patterns.items():
+            self._add(pattern, payload)
+        self._link()
+
+    def _add(self, pattern: str, payload: Payload) -> None:
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), payload))
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each node inherits its fallback's outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Payload]]:
+        """Yield (start, end, payload) for every occurrence, overlapping ones included."""
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, payload in self._out[node]:
+                yield i + 1 - length, i + 1, payload
+
+
+@dataclass(frozen=True)
+class Tag:
+    """Canonical names found in one program string (None when absent)."""
+
+    university: Optional[str] = None
+    program: Optional[str] = None
+
+
+def read_names(path: Path) -> List[str]:
+    """Non-empty, non-comment lines of a canonical list file."""
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+class Tagger:
+    """Resolve free-text program strings to canonical university/program names."""
+
+    def __init__(
+        self,
+        universities: Iterable[str],
+        programs: Iterable[str],
+        university_aliases: Optional[Mapping[str, str]] = None,
+        program_aliases: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        if university_aliases is None:
+            university_aliases = UNIVERSITY_ALIASES
+        if program_aliases is None:
+            program_aliases = PROGRAM_ALIASES
+        self.universities = list(dict.fromkeys(universities))
+        self.programs = list(dict.fromkeys(programs))
+
+        # Canonical names are added before aliases, so they win on collisions.
+        patterns: Dict[str, Payload] = {}
+        groups = (
+            (UNIVERSITY, self.universities, university_aliases),
+            (PROGRAM, self.programs, program_aliases),
+        )
+        for kind, names, _ in groups:
+            for name in names:
+                patterns.setdefault(f" {normalize(name)} ", (kind, name))
+        for kind, names, aliases in groups:
+            known = set(names)
+            for alias, target in aliases.items():
+                if target not in known:
+                    raise ValueError(f"{kind} alias {alias!r} points at unknown name {target!r}")
+                patterns.setdefault(f" {normalize(alias)} ", (kind, target))
+        self._automaton = AhoCorasick(patterns)
+
+    @classmethod
+    def from_files(
+        cls,
+        universities_path: Path = CANON_UNIVERSITIES_PATH,
+        programs_path: Path = CANON_PROGRAMS_PATH,
+    ) -> "Tagger":
+        """Build from the canonical list files (one name per line)."""
+        return cls(read_names(universities_path), read_names(programs_path))
+
+    def tag(self, text: Optional[str]) -> Tag:
+        """Scan `text` once and return its best university and program match."""
+        if not text:
+            return Tag()
+        # Patterns carry a leading/trailing space, so matches are word-bounded;
+        # neighbouring matches share that space, hence the inner spans below.
+        matches = sorted(
+            self._automaton.iter_matches(f" {normalize(text)} "),
+            key=lambda m: (m[0] - m[1], m[0]),
+        )
+        taken: List[Tuple[int, int]] = []
+        found: Dict[str, str] = {}
+        for start, end, (kind, name) in matches:
+            inner = (start + 1, end - 1)
+            if any(inner[0] < e and s < inner[1] for s, e in taken):
+                continue
+            taken.append(inner)
+            found.setdefault(kind, name)
+        return Tag(university=found.get(UNIVERSITY), program=found.get(PROGRAM))
+
+
+@lru_cache(maxsize=1)
+def default_tagger() -> Tagger:
+    """Tagger over the bundled canonical lists (built once per process)."""
+    return Tagger.from_files()
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import src.etl as etl
+from src.etl import file_scraper, iter_batches, iter_rows, pull_and_load
+
+ROWS = [
+    {"url": "a", "program": "CS, [JHU]", "gpa": 3.9},
+    {"url": "b", "comments": "commas, brackets ] and \"quotes\"", "nested": {"x": [1, 2]}},
+    {"url": "c", "gre": 330},
+]
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    # force many refills, so values straddle buffer boundaries
+    monkeypatch.setattr(etl, "READ_CHUNK", 7)
+
+
+@pytest.mark.db
+def test_iter_rows_json_array_and_jsonl(tmp_path, small_reads):
+    array = tmp_path / "rows.json"
+    array.write_text("\n " + json.dumps(ROWS, indent=2), encoding="utf-8")
+    assert list(iter_rows(str(array))) == ROWS
+
+    numbers = tmp_path / "numbers.json"
+    numbers.write_text("[1, 22, 333,4444]", encoding="utf-8")
+    assert list(iter_rows(str(numbers))) == [1, 22, 333, 4444]
+
+    lines = tmp_path / "rows.jsonl"
+    lines.write_text("\n".join(json.dumps(r) for r in ROWS) + "\n\n", encoding="utf-8")
+    assert file_scraper(str(lines)) == ROWS
+
+    lines.write_text(" [ ]\n", encoding="utf-8")
+    assert file_scraper(str(lines)) == []
+
+
+@pytest.mark.db
+def test_iter_rows_truncated_array_raises(tmp_path, small_reads):
+    f = tmp_path / "truncated.json"
+    f.write_text(json.dumps(ROWS)[:-10], encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_rows(str(f)))
+
+
+@pytest.mark.integration
+def test_pull_and_load_consumes_in_chunks(test_db):
+    def scraper():
+        for i in range(7):
+            yield {"url": f"s{i % 5}", "program": "CS, JHU"}
+
+    assert [len(b) for b in iter_batches(scraper(), 3)] == [3, 3, 1]
+    assert pull_and_load(test_db, scraper, chunk_size=3)["total_rows"] == 5
+    assert pull_and_load(test_db, scraper, chunk_size=3)["total_rows"] == 0
@@ -0,0 +1,97 @@
+import pytest
+
+from src.db import connect
+from src.etl import insert_applicants, retag_applicants
+from src.query_data import get_results
+from src.tagger import Tag, Tagger, default_tagger
+
+
+@pytest.fixture
+def tagger():
+    return Tagger(
+        universities=[
+            "Johns Hopkins University",
+            "Massachusetts Institute of Technology",
+            "University of California, Berkeley",
+        ],
+        programs=["Computer Science", "Computer Science and Engineering", "African American Studies"],
+        university_aliases={"MIT": "Massachusetts Institute of Technology"},
+        program_aliases={"CS": "Computer Science"},
+    )
+
+
+@pytest.mark.db
+def test_tag_canonical_names_and_aliases(tagger):
+    assert tagger.tag("Computer Science, Johns Hopkins University") == Tag(
+        "Johns Hopkins University", "Computer Science"
+    )
+    assert tagger.tag("mit  cs") == Tag("Massachusetts Institute of Technology", "Computer Science")
+    assert tagger.tag("CS, University Of California - Berkeley") == Tag(
+        "University of California, Berkeley", "Computer Science"
+    )
+
+
+@pytest.mark.db
+def test_tag_requires_word_boundaries(tagger):
+    assert tagger.tag("Smith College") == Tag()
+    assert tagger.tag("Summit Computer Sciences") == Tag()
+    assert tagger.tag(None) == Tag()
+
+
+@pytest.mark.db
+def test_tag_prefers_longest_match(tagger):
+    assert tagger.tag("Computer Science and Engineering, MIT").program == (
+        "Computer Science and Engineering"
+    )
+
+
+@pytest.mark.db
+def test_unknown_alias_target_raises():
+    with pytest.raises(ValueError):
+        Tagger(["Yale University"], [], university_aliases={"Yale": "Yale"}, program_aliases={})
+
+
+@pytest.mark.db
+def test_from_files_skips_blanks_and_comments(tmp_path):
+    bundled = default_tagger()
+    unis = tmp_path / "unis.txt"
+    unis.write_text(
+        "# canonical universities\n\n" + "\n".join(bundled.universities), encoding="utf-8"
+    )
+    progs = tmp_path / "progs.txt"
+    progs.write_text("\n".join(bundled.programs) + "\n", encoding="utf-8")
+    loaded = Tagger.from_files(unis, progs)
+    assert loaded.universities == bundled.universities
+    assert loaded.tag("JHU CS") == Tag("Johns Hopkins University", "Computer Science")
+
+
+@pytest.mark.integration
+def test_insert_tags_rows_for_analytics(test_db):
+    rows = [
+        {"url": "t1", "program": "Computer Science, Johns Hopkins University", "degree": "Masters"},
+        {"url": "t2", "program": "Computer Science, Smith College", "degree": "Masters"},
+        {
+            "url": "t3",
+            "program": "Computer Science, MIT",
+            "degree": "PhD",
+            "status": "Accepted",
+            "term": "Fall 2026",
+        },
+    ]
+    assert insert_applicants(test_db, rows) == 3
+
+    results = get_results(test_db)
+    assert results["JHU Masters CS Applicants"] == 1
+    assert results["Fall 2026 Accepted PhD CS at Georgetown/MIT/Stanford/CMU (program text)"] == 1
+
+
+@pytest.mark.integration
+def test_retag_applicants_updates_changed_rows(test_db, tagger):
+    insert_applicants(test_db, [{"url": "r1", "program": "CS, JHU"}], tagger=tagger)
+    with connect(test_db) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT university_id FROM applicants WHERE url = %s", ("r1",))
+            assert cur.fetchone() == (None,)
+
+    assert retag_applicants(test_db) == 1
+    assert retag_applicants(test_db) == 0
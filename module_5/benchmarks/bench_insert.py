@@ -0,0 +1,114 @@
+"""Benchmark insert_applicants: per-row loop vs. pipelined executemany batches.
+
+Usage (from module_5/, against a scratch database — the table is truncated):
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_insert.py
+    DATABASE_URL=postgresql://... python benchmarks/bench_insert.py --rows 50000 --batch-sizes 1,100,1000
+    DATABASE_URL=postgresql://... python benchmarks/bench_insert.py --batch-sizes 500 --workers 2,4
+
+Each batch size loads the same synthetic rows into an empty table, then loads
+them again to time the all-conflicts path, and checks both inserted counts.
+--workers repeats the load with parallel_insert_applicants (URL-hash
+partitions, one process and connection each) and prints per-partition rates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db import DB, ensure_schema, truncate_all  # noqa: E402
+from src.etl import insert_applicants, parallel_insert_applicants  # noqa: E402
+from src.tagger import default_tagger  # noqa: E402
+
+PROGRAMS = [
+    "Computer Science, Johns Hopkins University",
+    "Mathematics, MIT",
+    "Information Studies, McGill University",
+    "Physics, Stanford University",
+    "History, Smith College",
+]
+
+
+def synthetic_rows(n: int) -> list:
+    """Rows shaped like the scraped JSON, with unique urls."""
+    return [
+        {
+            "program": PROGRAMS[i % len(PROGRAMS)],
+            "comments": f"comment {i}",
+            "date_added": f"2026-01-{i % 28 + 1:02d}",
+            "url": f"https://www.thegradcafe.com/result/{i}",
+            "applicant_status": "Accepted" if i % 3 else "Rejected",
+            "semester_year_start": "Fall 2026",
+            "citizenship": "International" if i % 2 else "American",
+            "gpa": f"GPA 3.{i % 10}",
+            "gre": "GRE 325",
+            "gre_v": "160",
+            "gre_aw": "4.5",
+            "masters_or_phd": "PhD" if i % 4 else "Masters",
+        }
+        for i in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument(
+        "--batch-sizes",
+        default="1,50,500,2000",
+        help="Comma-separated batch sizes; 1 is the original per-row loop.",
+    )
+    parser.add_argument(
+        "--workers",
+        default="",
+        help="Comma-separated loader process counts for the parallel path (default: skip).",
+    )
+    args = parser.parse_args()
+
+    db = DB(url=os.environ["DATABASE_URL"])
+    ensure_schema(db)
+    rows = synthetic_rows(args.rows)
+    tagger = default_tagger()  # build once, outside the timings
+
+    print(f"{'batch':>7}{'insert s':>10}{'rows/s':>10}{'re-run s':>10}{'rows/s':>10}")
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        truncate_all(db)
+        t0 = time.perf_counter()
+        inserted = insert_applicants(db, rows, tagger=tagger, batch_size=batch_size)
+        first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        again = insert_applicants(db, rows, tagger=tagger, batch_size=batch_size)
+        second = time.perf_counter() - t0
+        if (inserted, again) != (len(rows), 0):
+            raise SystemExit(f"batch {batch_size}: inserted {inserted}, re-run {again}")
+        print(
+            f"{batch_size:>7}{first:>10.2f}{len(rows) / first:>10.0f}"
+            f"{second:>10.2f}{len(rows) / second:>10.0f}"
+        )
+
+    batch_size = int(args.batch_sizes.split(",")[-1])
+    for workers in (int(w) for w in args.workers.split(",") if w):
+        truncate_all(db)
+        t0 = time.perf_counter()
+        inserted, stats = parallel_insert_applicants(db, rows, workers, batch_size=batch_size)
+        elapsed = time.perf_counter() - t0
+        again, _ = parallel_insert_applicants(db, rows, workers, batch_size=batch_size)
+        if (inserted, again) != (len(rows), 0):
+            raise SystemExit(f"workers {workers}: inserted {inserted}, re-run {again}")
+        print(f"workers={workers}: {elapsed:.2f}s, {len(rows) / elapsed:.0f} rows/s")
+        for s in stats:
+            print(
+                f"  partition {s['partition']}: {s['rows']} rows in {s['seconds']:.2f}s "
+                f"({s['rows_per_sec']:.0f} rows/s)"
+            )
+    truncate_all(db)
+
+
+if __name__ == "__main__":
+    main()
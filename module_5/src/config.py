@@ -41,6 +41,15 @@ def get_database_url() -> str:
     return get_database_dsn()
 
 
+def get_load_workers() -> int:
+    """Loader processes for pull_and_load (LOAD_WORKERS, default 1 = single connection)."""
+    value = os.getenv("LOAD_WORKERS", "1")
+    try:
+        return max(1, int(value))
+    except ValueError as exc:
+        raise RuntimeError(f"LOAD_WORKERS must be an integer, got {value!r}") from exc
+
+
 @dataclass(frozen=True)
 class Config:
     """Flask configuration container."""
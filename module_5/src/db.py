@@ -10,6 +10,8 @@ from psycopg import sql
 
 
 APPLICANTS_TABLE: Final[str] = "applicants"
+UNIVERSITIES_TABLE: Final[str] = "universities"
+PROGRAMS_TABLE: Final[str] = "programs"
 
 
 @dataclass(frozen=True)
@@ -29,7 +31,25 @@ def connect(db: DB) -> psycopg.Connection:
 
 
 def ensure_schema(db: DB) -> None:
-    """Create applicants table and a unique index for url idempotency."""
+    """Create applicants + canonical lookup tables and their indexes.
+
+    ``university_id`` / ``program_id`` are filled by the load-time tagger
+    (see ``src.tagger``) so analytics filter on indexed integers instead of
+    ``ILIKE '%...%'`` scans of the raw program text. ``term_season`` /
+    ``term_year`` are generated from ``term`` for the same reason.
+    """
+    lookups = [
+        sql.SQL(
+            """
+            CREATE TABLE IF NOT EXISTS {table} (
+                id SERIAL PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+            """
+        ).format(table=sql.Identifier(name))
+        for name in (UNIVERSITIES_TABLE, PROGRAMS_TABLE)
+    ]
+
     ddl = sql.SQL(
         """
         CREATE TABLE IF NOT EXISTS {table} (
@@ -62,10 +82,57 @@ def ensure_schema(db: DB) -> None:
         table=sql.Identifier(APPLICANTS_TABLE),
     )
 
+    tag_columns = sql.SQL(
+        """
+        ALTER TABLE {table}
+            ADD COLUMN IF NOT EXISTS university_id INTEGER REFERENCES {unis}(id),
+            ADD COLUMN IF NOT EXISTS program_id INTEGER REFERENCES {progs}(id);
+        """
+    ).format(
+        table=sql.Identifier(APPLICANTS_TABLE),
+        unis=sql.Identifier(UNIVERSITIES_TABLE),
+        progs=sql.Identifier(PROGRAMS_TABLE),
+    )
+
+    # Generated from term ("Fall 2026" -> 'Fall', 2026; NULL for other shapes)
+    # so term filters use an index instead of TRIM(term) on every row.
+    term_columns = sql.SQL(
+        """
+        ALTER TABLE {table}
+            ADD COLUMN IF NOT EXISTS term_season TEXT GENERATED ALWAYS AS (
+                CASE WHEN btrim(term) ~ '^[A-Za-z]+ [0-9]{{4}}$'
+                     THEN split_part(btrim(term), ' ', 1) END
+            ) STORED,
+            ADD COLUMN IF NOT EXISTS term_year INTEGER GENERATED ALWAYS AS (
+                CASE WHEN btrim(term) ~ '^[A-Za-z]+ [0-9]{{4}}$'
+                     THEN split_part(btrim(term), ' ', 2)::integer END
+            ) STORED;
+        """
+    ).format(table=sql.Identifier(APPLICANTS_TABLE))
+
+    indexes = [
+        sql.SQL("CREATE INDEX IF NOT EXISTS {idx} ON {table}({cols});").format(
+            idx=sql.Identifier(idx),
+            table=sql.Identifier(APPLICANTS_TABLE),
+            cols=sql.SQL(", ").join(sql.Identifier(c) for c in cols),
+        )
+        for idx, cols in (
+            ("ix_applicants_university_program", ("university_id", "program_id")),
+            ("ix_applicants_program", ("program_id",)),
+            ("ix_applicants_term", ("term_year", "term_season", "status")),
+        )
+    ]
+
     with connect(db) as conn:
         with conn.cursor() as cur:
+            for stmt in lookups:
+                cur.execute(stmt)
             cur.execute(ddl)
             cur.execute(uniq)
+            cur.execute(tag_columns)
+            cur.execute(term_columns)
+            for stmt in indexes:
+                cur.execute(stmt)
         conn.commit()
 
 
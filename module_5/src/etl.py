@@ -4,18 +4,30 @@ from __future__ import annotations
 
 import json
 import re
+import time
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import date
+from itertools import islice
 from pathlib import Path
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
+import psycopg
 from psycopg import sql
 
-from .db import APPLICANTS_TABLE, DB, connect
+from .config import get_load_workers
+from .db import APPLICANTS_TABLE, DB, PROGRAMS_TABLE, UNIVERSITIES_TABLE, connect
+from .tagger import Tagger, default_tagger
 
 
 _FLOAT_RE = re.compile(r"\d+(\.\d+)?")
 _DATE_RE = re.compile(r"^\s*(\d{4})-(\d{2})-(\d{2})\s*$")
 
+DEFAULT_DATA_PATH = "data/llm_extend_applicant_data.json"
+# Characters read per refill while decoding a JSON array.
+READ_CHUNK = 1 << 16
+_ARRAY_GAP = " \t\r\n,"
+
 
 def clean_text(value: object) -> Optional[str]:
     """Normalize text values for storage."""
@@ -48,33 +60,171 @@ def safe_date(value: object) -> Optional[date]:
         return None
 
 
-def file_scraper(path: str = "data/llm_extend_applicant_data.json") -> List[Dict]:
+def _iter_json_array(handle: TextIO) -> Iterator[Dict]:
+    """Decode a JSON array one element at a time, refilling a small buffer."""
+    decoder = json.JSONDecoder()
+    buf = handle.read(READ_CHUNK)
+    pos, eof = buf.index("[") + 1, False
+    while True:
+        while pos < len(buf) and buf[pos] in _ARRAY_GAP:
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            row, end = decoder.raw_decode(buf, pos)
+            # A value that runs to the end of the buffer may be cut short (e.g. 12|3).
+            complete = end < len(buf) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield row
+            pos = end
+            continue
+        chunk = handle.read(READ_CHUNK)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+
+def _iter_file(path: Path) -> Iterator[Dict]:
+    """Yield rows from a JSON array (first non-blank char ``[``) or JSONL file."""
+    with path.open("r", encoding="utf-8") as handle:
+        first = handle.read(READ_CHUNK).lstrip()[:1]
+        handle.seek(0)
+        if first == "[":
+            yield from _iter_json_array(handle)
+            return
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_rows(path: str = DEFAULT_DATA_PATH) -> Iterator[Dict]:
     """
-    Default scraper used in production mode (NO INTERNET).
-    Reads from a local JSON array file or JSONL file.
+    Stream rows from a local JSON array file or JSONL file (NO INTERNET).
+
+    Rows are parsed straight from the file handle, so memory holds one read
+    chunk plus whatever the caller keeps, not the whole file.
     """
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"Missing data file: {p.resolve()}")
+    return _iter_file(p)
+
+
+def iter_batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Group any row iterable into lists of at most ``size`` rows."""
+    it = iter(rows)
+    while batch := list(islice(it, max(1, size))):
+        yield batch
+
+
+def file_scraper(path: str = DEFAULT_DATA_PATH) -> List[Dict]:
+    """
+    Read every row of a local JSON array or JSONL file into a list.
+    Prefer ``iter_rows`` for large files.
+    """
+    return list(iter_rows(path))
+
+
+def sync_canon_ids(
+    cur: psycopg.Cursor, tagger: Tagger
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Upsert the tagger's canonical names; return (university ids, program ids) by name."""
+    ids = []
+    for table, names in (
+        (UNIVERSITIES_TABLE, tagger.universities),
+        (PROGRAMS_TABLE, tagger.programs),
+    ):
+        cur.execute(
+            sql.SQL(
+                """
+                INSERT INTO {table} (name)
+                SELECT unnest(%s::text[])
+                ON CONFLICT (name) DO NOTHING;
+                """
+            ).format(table=sql.Identifier(table)),
+            (names,),
+        )
+        cur.execute(
+            sql.SQL("SELECT name, id FROM {table};").format(table=sql.Identifier(table))
+        )
+        ids.append(dict(cur.fetchall()))
+    return ids[0], ids[1]
 
-    text = p.read_text(encoding="utf-8").strip()
-    if not text:
-        return []
 
-    if text.startswith("["):
-        return json.loads(text)
+CanonIds = Tuple[Dict[str, int], Dict[str, int]]
 
-    return [json.loads(line) for line in text.splitlines() if line.strip()]
 
+def synced_canon_ids(db: DB, tagger: Optional[Tagger] = None) -> CanonIds:
+    """Run ``sync_canon_ids`` on its own committed connection; return the ids."""
+    with connect(db) as conn:
+        with conn.cursor() as cur:
+            ids = sync_canon_ids(cur, tagger or default_tagger())
+        conn.commit()
+    return ids
+
+
+# Rows per executemany() call; psycopg sends each batch in pipeline mode.
+DEFAULT_BATCH_SIZE = 500
+# Rows pull_and_load takes from the scraper per insert call.
+PULL_CHUNK_SIZE = 5000
+
+
+def applicant_params(
+    row: Dict, tagger: Tagger, uni_ids: Dict[str, int], prog_ids: Dict[str, int]
+) -> Tuple[object, ...]:
+    """Normalize one scraped row into INSERT parameters (column order of the statement)."""
+    program = clean_text(row.get("program"))
+    tag = tagger.tag(program)
+    return (
+        program,
+        clean_text(row.get("comments")),
+        safe_date(row.get("date_added")),
+        clean_text(row.get("url")),
+        clean_text(row.get("applicant_status") or row.get("status")),
+        clean_text(row.get("semester_year_start") or row.get("term")),
+        clean_text(row.get("citizenship") or row.get("us_or_international")),
+        safe_float(row.get("gpa")),
+        safe_float(row.get("gre")),
+        safe_float(row.get("gre_v")),
+        safe_float(row.get("gre_aw")),
+        clean_text(row.get("masters_or_phd") or row.get("degree")),
+        clean_text(row.get("llm-generated-program") or
+            row.get("llm_generated_program")),
+        clean_text(row.get("llm-generated-university") or
+            row.get("llm_generated_university")),
+        uni_ids.get(tag.university),
+        prog_ids.get(tag.program),
+    )
 
-def insert_applicants(db: DB, rows: List[Dict]) -> int:
+
+def insert_applicants(
+    db: DB,
+    rows: List[Dict],
+    tagger: Optional[Tagger] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    canon_ids: Optional[CanonIds] = None,
+) -> int:
     """
     Insert applicant rows using parameter binding and ON CONFLICT for idempotency.
 
+    Each row's program text is tagged once (see ``src.tagger``) and stored
+    with its canonical ``university_id`` / ``program_id``. Pass ``canon_ids``
+    from an earlier ``synced_canon_ids`` call to skip re-syncing the lookup
+    tables (repeated or parallel loads).
+
+    Rows go to the server ``batch_size`` at a time through ``executemany``,
+    which psycopg runs in pipeline mode: a batch's statements are sent
+    back-to-back and their replies read together, instead of one round-trip
+    per row. ``batch_size=1`` keeps the one-``execute``-per-row loop. Either
+    way the result is the exact number of rows inserted (conflicts skipped).
+
     Security:
     - SQL is composed safely (Identifier for table).
     - Values are NEVER interpolated into SQL text; they are bound as parameters.
     """
+    tagger = tagger or default_tagger()
     stmt = sql.SQL(
         """
         INSERT INTO {table} (
@@ -91,11 +241,14 @@ def insert_applicants(db: DB, rows: List[Dict]) -> int:
             gre_aw,
             degree,
             llm_generated_program,
-            llm_generated_university
+            llm_generated_university,
+            university_id,
+            program_id
         )
         VALUES (
             {program},{comments},{date_added},{url},{status},{term},{us_int},
-            {gpa},{gre},{gre_v},{gre_aw},{degree},{llm_prog},{llm_uni}
+            {gpa},{gre},{gre_v},{gre_aw},{degree},{llm_prog},{llm_uni},
+            {uni_id},{prog_id}
         )
         ON CONFLICT (url) DO NOTHING;
         """
@@ -115,39 +268,208 @@ def insert_applicants(db: DB, rows: List[Dict]) -> int:
         degree=sql.Placeholder(),
         llm_prog=sql.Placeholder(),
         llm_uni=sql.Placeholder(),
+        uni_id=sql.Placeholder(),
+        prog_id=sql.Placeholder(),
     )
 
     inserted = 0
     with connect(db) as conn:
         with conn.cursor() as cur:
-            for row in rows:
-                params = (
-                    clean_text(row.get("program")),
-                    clean_text(row.get("comments")),
-                    safe_date(row.get("date_added")),
-                    clean_text(row.get("url")),
-                    clean_text(row.get("applicant_status") or row.get("status")),
-                    clean_text(row.get("semester_year_start") or row.get("term")),
-                    clean_text(row.get("citizenship") or row.get("us_or_international")),
-                    safe_float(row.get("gpa")),
-                    safe_float(row.get("gre")),
-                    safe_float(row.get("gre_v")),
-                    safe_float(row.get("gre_aw")),
-                    clean_text(row.get("masters_or_phd") or row.get("degree")),
-                    clean_text(row.get("llm-generated-program") or
-                        row.get("llm_generated_program")),
-                    clean_text(row.get("llm-generated-university") or
-                        row.get("llm_generated_university")),
-                )
-                cur.execute(stmt, params)
-                inserted += cur.rowcount
+            uni_ids, prog_ids = canon_ids or sync_canon_ids(cur, tagger)
+            if batch_size <= 1:
+                for row in rows:
+                    cur.execute(stmt, applicant_params(row, tagger, uni_ids, prog_ids))
+                    inserted += cur.rowcount
+            else:
+                for start in range(0, len(rows), batch_size):
+                    cur.executemany(
+                        stmt,
+                        [
+                            applicant_params(row, tagger, uni_ids, prog_ids)
+                            for row in rows[start:start + batch_size]
+                        ],
+                    )
+                    # executemany() reports the total across the whole batch.
+                    inserted += cur.rowcount
         conn.commit()
 
     return inserted
 
 
-def pull_and_load(db: DB, scraper_fn: Callable[[], List[Dict]]) -> Dict[str, object]:
-    """Execute scraper + insert rows and return a simple status dict."""
-    rows = scraper_fn()
-    new_rows = insert_applicants(db, rows)
-    return {"ok": True, "total_rows": new_rows}
+def retag_applicants(db: DB, tagger: Optional[Tagger] = None) -> int:
+    """
+    Re-tag every stored row, e.g. after editing the canonical lists or
+    upgrading a table loaded before tagging existed. Returns rows changed.
+    """
+    tagger = tagger or default_tagger()
+    table = sql.Identifier(APPLICANTS_TABLE)
+    with connect(db) as conn:
+        with conn.cursor() as cur:
+            uni_ids, prog_ids = sync_canon_ids(cur, tagger)
+            cur.execute(
+                sql.SQL(
+                    "SELECT p_id, program, university_id, program_id FROM {t};"
+                ).format(t=table)
+            )
+            updates = []
+            for p_id, program, uni_id, prog_id in cur.fetchall():
+                tag = tagger.tag(program)
+                new_ids = (uni_ids.get(tag.university), prog_ids.get(tag.program))
+                if new_ids != (uni_id, prog_id):
+                    updates.append((*new_ids, p_id))
+            cur.executemany(
+                sql.SQL(
+                    "UPDATE {t} SET university_id = %s, program_id = %s WHERE p_id = %s;"
+                ).format(t=table),
+                updates,
+            )
+        conn.commit()
+    return len(updates)
+
+
+def partition_rows(rows: List[Dict], partitions: int) -> List[List[Dict]]:
+    """
+    Split rows into ``partitions`` lists by a stable hash of the cleaned URL.
+
+    Every row with a given URL lands in the same partition, so two loaders
+    never race on the same ``ON CONFLICT (url)`` key, and which copy of a
+    repeated URL wins stays the same as in a single-connection load.
+    """
+    parts: List[List[Dict]] = [[] for _ in range(max(1, partitions))]
+    for row in rows:
+        key = (clean_text(row.get("url")) or "").encode("utf-8")
+        parts[zlib.crc32(key) % len(parts)].append(row)
+    return parts
+
+
+# (db url, partition index, rows, batch size, tagger or None, canonical ids)
+_PartitionJob = Tuple[str, int, List[Dict], int, Optional[Tagger], CanonIds]
+
+
+def _load_partition(job: _PartitionJob) -> Dict[str, object]:
+    """Worker-process body: insert one partition over its own connection."""
+    url, index, rows, batch_size, tagger, canon_ids = job
+    started = time.perf_counter()
+    inserted = insert_applicants(
+        DB(url=url), rows, tagger, batch_size=batch_size, canon_ids=canon_ids
+    )
+    seconds = time.perf_counter() - started
+    return {
+        "partition": index,
+        "rows": len(rows),
+        "inserted": inserted,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(len(rows) / seconds, 1) if seconds else 0.0,
+    }
+
+
+def _partition_jobs(
+    db: DB,
+    rows: List[Dict],
+    workers: int,
+    batch_size: int,
+    *,
+    tagger: Optional[Tagger],
+    canon_ids: CanonIds,
+) -> List[_PartitionJob]:
+    """One ``_load_partition`` job per non-empty URL-hash partition."""
+    return [
+        (db.url, index, part, batch_size, tagger, canon_ids)
+        for index, part in enumerate(partition_rows(rows, workers))
+        if part
+    ]
+
+
+def _run_partitions(
+    pool: Executor, jobs: List[_PartitionJob]
+) -> Tuple[int, List[Dict[str, object]]]:
+    """Run partition jobs on ``pool``; return (total inserted, per-partition stats)."""
+    stats = list(pool.map(_load_partition, jobs))
+    return sum(int(s["inserted"]) for s in stats), stats
+
+
+def parallel_insert_applicants(
+    db: DB,
+    rows: List[Dict],
+    workers: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    tagger: Optional[Tagger] = None,
+) -> Tuple[int, List[Dict[str, object]]]:
+    """
+    Load rows with ``workers`` processes, one connection and URL-hash partition each.
+
+    Normalization and tagging are CPU-bound, so each partition runs in its own
+    process; each commits independently. Canonical ids are synced once here
+    and handed to every partition, so the workers never touch the lookup
+    tables. ``tagger`` is shipped to the workers only when given; otherwise
+    each uses its own ``default_tagger()``. Returns (total inserted,
+    per-partition stats with rows/sec).
+    """
+    jobs = _partition_jobs(
+        db, rows, workers, batch_size,
+        tagger=tagger, canon_ids=synced_canon_ids(db, tagger),
+    )
+    with ProcessPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        return _run_partitions(pool, jobs)
+
+
+def _add_partition_stats(
+    totals: Dict[int, Dict[str, object]], stats: List[Dict[str, object]]
+) -> None:
+    """Fold one chunk's per-partition stats into running totals."""
+    for stat in stats:
+        total = totals.setdefault(
+            int(stat["partition"]),
+            {"partition": stat["partition"], "rows": 0, "inserted": 0, "seconds": 0.0},
+        )
+        for key in ("rows", "inserted", "seconds"):
+            total[key] += stat[key]
+        total["seconds"] = round(total["seconds"], 3)
+        total["rows_per_sec"] = (
+            round(total["rows"] / total["seconds"], 1) if total["seconds"] else 0.0
+        )
+
+
+def pull_and_load(
+    db: DB,
+    scraper_fn: Callable[[], Iterable[Dict]],
+    workers: Optional[int] = None,
+    chunk_size: int = PULL_CHUNK_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, object]:
+    """
+    Execute scraper + insert rows and return a simple status dict.
+
+    The scraper may return a list or a lazy iterator (``iter_rows``); rows are
+    taken ``chunk_size`` at a time, so memory stays bounded by one chunk.
+    Each chunk commits on its own; a rerun skips rows already loaded.
+    Canonical ids are synced once for the whole run, and every chunk is
+    inserted ``batch_size`` rows per ``executemany``.
+
+    ``workers`` defaults to LOAD_WORKERS; above 1 one process pool is started
+    for the run, each chunk is split into URL-hash partitions on it (as in
+    ``parallel_insert_applicants``), and the status includes per-partition
+    stats.
+    """
+    workers = get_load_workers() if workers is None else workers
+    canon_ids = synced_canon_ids(db)
+    new_rows = 0
+    partitions: Dict[int, Dict[str, object]] = {}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in iter_batches(scraper_fn(), chunk_size):
+                jobs = _partition_jobs(
+                    db, chunk, workers, batch_size, tagger=None, canon_ids=canon_ids
+                )
+                inserted, stats = _run_partitions(pool, jobs)
+                _add_partition_stats(partitions, stats)
+                new_rows += inserted
+    else:
+        for chunk in iter_batches(scraper_fn(), chunk_size):
+            new_rows += insert_applicants(
+                db, chunk, batch_size=batch_size, canon_ids=canon_ids
+            )
+    status: Dict[str, object] = {"ok": True, "total_rows": new_rows}
+    if workers > 1:
+        status["partitions"] = [partitions[k] for k in sorted(partitions)]
+    return status
@@ -3,13 +3,13 @@
 from __future__ import annotations
 import os
 from dataclasses import dataclass
-from typing import Callable, Optional, Any, Final
+from typing import Callable, Iterable, Optional, Any, Final
 
 from flask import Flask, redirect, render_template, url_for
 
 from .config import get_database_dsn
 from .db import DB, ensure_schema
-from .etl import file_scraper, pull_and_load
+from .etl import iter_rows, pull_and_load
 from .query_data import format_for_display, get_results
 
 _MISSING: Final[Any] = object()
@@ -24,7 +24,7 @@ class BusyFlag:
 def create_app(
     database_url: str | None | Any = _MISSING,
     database_dsn: Optional[str] = None,
-    scraper_fn: Optional[Callable[[], list]] = None,
+    scraper_fn: Optional[Callable[[], Iterable[dict]]] = None,
     busy_flag: Optional[BusyFlag] = None,
 ) -> Flask:
     """Create and configure the Flask application."""
@@ -47,7 +47,7 @@ def create_app(
     ensure_schema(db)
 
     if scraper_fn is None:
-        scraper_fn = file_scraper
+        scraper_fn = iter_rows
 
     if busy_flag is None:
         busy_flag = BusyFlag()
@@ -8,7 +8,7 @@ from typing import Any, Dict, Optional, Sequence, Tuple, Union
 from psycopg import sql
 from psycopg.sql import Composable
 
-from .db import APPLICANTS_TABLE, DB, connect
+from .db import APPLICANTS_TABLE, DB, PROGRAMS_TABLE, UNIVERSITIES_TABLE, connect
 
 
 EXPECTED_KEYS = [
@@ -25,6 +25,9 @@ EXPECTED_KEYS = [
     "Acceptance Rate Overall (all terms)",
 ]
 
+# (term_season, term_year) parameters; both columns are generated from term.
+FALL_2026 = ("Fall", 2026)
+
 
 def clamp_limit(value: Optional[int], *, minimum: int = 1, maximum: int = 100) -> int:
     """Clamp LIMIT to a safe range (required by assignment)."""
@@ -57,13 +60,15 @@ def run_row(db: DB, stmt: Composable, params: Sequence[object] = ()) -> Row:
 def get_results(db: DB) -> Dict[str, Any]:
     """Compute analysis metrics from the applicants table."""
     tbl = sql.Identifier(APPLICANTS_TABLE)
+    unis = sql.Identifier(UNIVERSITIES_TABLE)
+    progs = sql.Identifier(PROGRAMS_TABLE)
 
     fall_2026_applicants = run_scalar(
         db,
         sql.SQL(
-            "SELECT COUNT(*) FROM {t} WHERE TRIM(term) = %s LIMIT 1;"
+            "SELECT COUNT(*) FROM {t} WHERE term_season = %s AND term_year = %s LIMIT 1;"
         ).format(t=tbl),
-        ("Fall 2026",),
+        FALL_2026,
     )
 
     international_pct = run_scalar(
@@ -104,13 +109,13 @@ def get_results(db: DB) -> Dict[str, Any]:
             """
             SELECT ROUND(AVG(gpa)::numeric, 2)
             FROM {t}
-            WHERE TRIM(term) = %s
+            WHERE term_season = %s AND term_year = %s
               AND us_or_international = %s
               AND gpa IS NOT NULL
             LIMIT 1;
             """
         ).format(t=tbl),
-        ("Fall 2026", "American"),
+        (*FALL_2026, "American"),
     )
 
     acceptance_rate_fall = run_scalar(
@@ -119,18 +124,20 @@ def get_results(db: DB) -> Dict[str, Any]:
             """
             SELECT
               CASE
-                WHEN (SELECT COUNT(*) FROM {t} WHERE TRIM(term) = %s) = 0 THEN 0
+                WHEN (SELECT COUNT(*) FROM {t} WHERE term_season = %s AND term_year = %s) = 0 THEN 0
                 ELSE ROUND(
-                  (100.0 * COUNT(*) / (SELECT COUNT(*) FROM {t} WHERE TRIM(term) = %s))::numeric,
+                  (100.0 * COUNT(*) / (
+                    SELECT COUNT(*) FROM {t} WHERE term_season = %s AND term_year = %s
+                  ))::numeric,
                   2
                 )
               END
             FROM {t}
-            WHERE TRIM(term) = %s AND status = %s
+            WHERE term_season = %s AND term_year = %s AND status = %s
             LIMIT 1;
             """
         ).format(t=tbl),
-        ("Fall 2026", "Fall 2026", "Fall 2026", "Accepted"),
+        (*FALL_2026, *FALL_2026, *FALL_2026, "Accepted"),
     )
 
     avg_gpa_accepted_fall = run_scalar(
@@ -139,11 +146,11 @@ def get_results(db: DB) -> Dict[str, Any]:
             """
             SELECT ROUND(AVG(gpa)::numeric, 2)
             FROM {t}
-            WHERE TRIM(term) = %s AND status = %s AND gpa IS NOT NULL
+            WHERE term_season = %s AND term_year = %s AND status = %s AND gpa IS NOT NULL
             LIMIT 1;
             """
         ).format(t=tbl),
-        ("Fall 2026", "Accepted"),
+        (*FALL_2026, "Accepted"),
     )
 
     jhu_masters_cs = run_scalar(
@@ -152,13 +159,13 @@ def get_results(db: DB) -> Dict[str, Any]:
             """
             SELECT COUNT(*)
             FROM {t}
-            WHERE program ILIKE %s
-              AND program ILIKE %s
+            WHERE university_id = (SELECT id FROM {u} WHERE name = %s)
+              AND program_id = (SELECT id FROM {p} WHERE name = %s)
               AND degree = %s
             LIMIT 1;
             """
-        ).format(t=tbl),
-        ("%Johns Hopkins%", "%Computer Science%", "Masters"),
+        ).format(t=tbl, u=unis, p=progs),
+        ("Johns Hopkins University", "Computer Science", "Masters"),
     )
 
     accepted_phd_program_text = run_scalar(
@@ -167,28 +174,25 @@ def get_results(db: DB) -> Dict[str, Any]:
             """
             SELECT COUNT(*)
             FROM {t}
-            WHERE TRIM(term) = %s
+            WHERE term_season = %s AND term_year = %s
               AND status = %s
               AND degree = %s
-              AND program ILIKE %s
-              AND (
-                program ILIKE %s OR
-                program ILIKE %s OR
-                program ILIKE %s OR
-                program ILIKE %s
+              AND program_id = (SELECT id FROM {p} WHERE name = %s)
+              AND university_id IN (
+                SELECT id FROM {u} WHERE name IN (%s, %s, %s, %s)
               )
             LIMIT 1;
             """
-        ).format(t=tbl),
+        ).format(t=tbl, u=unis, p=progs),
         (
-            "Fall 2026",
+            *FALL_2026,
             "Accepted",
             "PhD",
-            "%Computer Science%",
-            "%Georgetown%",
-            "%MIT%",
-            "%Stanford%",
-            "%Carnegie Mellon%",
+            "Computer Science",
+            "Georgetown University",
+            "Massachusetts Institute of Technology",
+            "Stanford University",
+            "Carnegie Mellon University",
         ),
     )
 
@@ -198,7 +202,7 @@ def get_results(db: DB) -> Dict[str, Any]:
             """
             SELECT COUNT(*)
             FROM {t}
-            WHERE TRIM(term) = %s
+            WHERE term_season = %s AND term_year = %s
               AND status = %s
               AND degree = %s
               AND llm_generated_program ILIKE %s
@@ -212,7 +216,7 @@ def get_results(db: DB) -> Dict[str, Any]:
             """
         ).format(t=tbl),
         (
-            "Fall 2026",
+            *FALL_2026,
             "Accepted",
             "PhD",
             "%Computer Science%",
@@ -3,7 +3,7 @@ import json
 import pytest
 
 from src.flask_app import create_app, BusyFlag
-from src.db import ensure_schema, truncate_all, DB
+from src.db import connect, ensure_schema, truncate_all, DB
 from src.etl import (
     clean_text,
     safe_float,
@@ -80,6 +80,39 @@ def test_insert_and_idempotency(test_db):
     assert insert_applicants(test_db, rows) == 0
 
 
+@pytest.mark.db
+def test_term_season_and_year_generated_from_term(test_db):
+    rows = [
+        {"url": "t1", "term": "Fall 2026"},
+        {"url": "t2", "term": "Spring 2026 "},
+        {"url": "t3", "term": "Fall2026"},
+        {"url": "t4"},
+    ]
+    insert_applicants(test_db, rows)
+
+    with connect(test_db) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT url, term_season, term_year FROM applicants ORDER BY url")
+            assert cur.fetchall() == [
+                ("t1", "Fall", 2026),
+                ("t2", "Spring", 2026),
+                ("t3", None, None),
+                ("t4", None, None),
+            ]
+
+    assert get_results(test_db)["Fall 2026 Applicants"] == 1
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("batch_size", [1, 2, 500])
+def test_insert_batches_count_exact_inserts(test_db, batch_size):
+    rows = [{"url": f"u{i % 3}", "program": "CS, JHU"} for i in range(5)]
+
+    # u0..u2 are new; the repeats (same batch or a later one) hit ON CONFLICT.
+    assert insert_applicants(test_db, rows, batch_size=batch_size) == 3
+    assert insert_applicants(test_db, rows, batch_size=batch_size) == 0
+
+
 @pytest.mark.integration
 def test_pull_and_load(test_db):
     def scraper():
@@ -239,6 +272,6 @@ def test_format_for_display_exception_branch():
 # -----------------------------
 
 @pytest.mark.db
-def test_config():
-    os.environ["DATABASE_URL"] = "test-url"
+def test_config(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "test-url")
     assert get_database_url() == "test-url"
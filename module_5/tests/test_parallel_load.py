@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import src.etl as etl
+from src.config import get_load_workers
+from src.db import connect
+from src.etl import insert_applicants, parallel_insert_applicants, partition_rows, pull_and_load
+from src.query_data import get_results
+from src.tagger import Tagger
+
+
+def _rows(n):
+    return [{"url": f"p{i % (n - 2)}", "program": "CS, JHU", "degree": "Masters"} for i in range(n)]
+
+
+@pytest.mark.db
+def test_partition_rows_keeps_urls_together():
+    rows = _rows(40) + [{"program": "no url"}]
+    parts = partition_rows(rows, 4)
+
+    assert len(parts) == 4
+    assert sum(len(p) for p in parts) == len(rows)
+    homes = {}
+    for index, part in enumerate(parts):
+        for row in part:
+            assert homes.setdefault(row.get("url"), index) == index
+    assert partition_rows(rows, 0) == [rows]
+
+
+@pytest.mark.integration
+def test_parallel_insert_matches_single_connection(test_db):
+    rows = _rows(30)
+    inserted, stats = parallel_insert_applicants(test_db, rows, workers=3, batch_size=4)
+
+    assert inserted == 28
+    assert sum(s["rows"] for s in stats) == 30
+    assert all(s["rows_per_sec"] >= 0 for s in stats)
+    assert get_results(test_db)["JHU Masters CS Applicants"] == 28
+    assert insert_applicants(test_db, rows) == 0
+
+
+@pytest.mark.integration
+def test_pull_and_load_uses_load_workers(test_db, monkeypatch):
+    # threads stand in for processes so coverage sees _load_partition
+    monkeypatch.setattr(etl, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setenv("LOAD_WORKERS", "2")
+
+    result = pull_and_load(test_db, lambda: _rows(10))
+    assert result["total_rows"] == 8
+    assert [s["partition"] for s in result["partitions"]] == [0, 1]
+
+    assert pull_and_load(test_db, lambda: _rows(10), workers=2)["total_rows"] == 0
+
+
+@pytest.mark.integration
+def test_parallel_insert_ships_custom_tagger_and_synced_ids(test_db, monkeypatch):
+    monkeypatch.setattr(etl, "ProcessPoolExecutor", ThreadPoolExecutor)
+    syncs = []
+    sync = etl.sync_canon_ids
+    monkeypatch.setattr(etl, "sync_canon_ids", lambda cur, t: syncs.append(t) or sync(cur, t))
+    tagger = Tagger(["Widget University"], ["Widgetry"], {}, {})
+    rows = [{"url": f"w{i}", "program": "Widgetry, Widget University"} for i in range(6)]
+
+    inserted, _ = parallel_insert_applicants(test_db, rows, workers=3, tagger=tagger)
+    assert inserted == 6
+    # one sync up front, with the caller's tagger; partitions reuse its ids
+    assert syncs == [tagger]
+    with connect(test_db) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT DISTINCT u.name, p.name FROM applicants a "
+                "JOIN universities u ON u.id = a.university_id "
+                "JOIN programs p ON p.id = a.program_id"
+            )
+            assert cur.fetchall() == [("Widget University", "Widgetry")]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pull_and_load_syncs_once_and_reuses_one_pool(test_db, monkeypatch, workers):
+    pools = []
+
+    def pool(**kwargs):
+        pools.append(kwargs)
+        return ThreadPoolExecutor(**kwargs)
+
+    monkeypatch.setattr(etl, "ProcessPoolExecutor", pool)
+    syncs = []
+    sync = etl.sync_canon_ids
+    monkeypatch.setattr(etl, "sync_canon_ids", lambda cur, t: syncs.append(t) or sync(cur, t))
+    batches = []
+    executemany = etl.psycopg.Cursor.executemany
+    monkeypatch.setattr(
+        etl.psycopg.Cursor,
+        "executemany",
+        lambda cur, stmt, params: batches.append(len(params)) or executemany(cur, stmt, params),
+    )
+
+    result = pull_and_load(test_db, lambda: _rows(12), workers=workers, chunk_size=4, batch_size=3)
+    assert result["total_rows"] == 10
+    assert len(syncs) == 1
+    assert pools == ([{"max_workers": 2}] if workers > 1 else [])
+    assert batches and max(batches) <= 3
+
+
+@pytest.mark.db
+def test_get_load_workers(monkeypatch):
+    monkeypatch.delenv("LOAD_WORKERS", raising=False)
+    assert get_load_workers() == 1
+    monkeypatch.setenv("LOAD_WORKERS", "0")
+    assert get_load_workers() == 1
+    monkeypatch.setenv("LOAD_WORKERS", "four")
+    with pytest.raises(RuntimeError):
+        get_load_workers()
@@ -0,0 +1,95 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import src.etl as etl
+from src.etl import file_scraper, iter_batches, iter_rows, pull_and_load
+
+ROWS = [
+    {"url": "a", "program": "CS, [JHU]", "gpa": 3.9},
+    {"url": "b", "comments": "commas, brackets ] and \"quotes\"", "nested": {"x": [1, 2]}},
+    {"url": "c", "gre": 330},
+]
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    # force many refills, so values straddle buffer boundaries
+    monkeypatch.setattr(etl, "READ_CHUNK", 7)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_rows_json_array_across_chunks(tmp_path, small_reads, indent):
+    f = tmp_path / "rows.json"
+    f.write_text("\n  " + json.dumps(ROWS, indent=indent) + "\n", encoding="utf-8")
+    assert list(iter_rows(str(f))) == ROWS
+
+    numbers = tmp_path / "numbers.json"
+    numbers.write_text("[1, 22, 333,4444]", encoding="utf-8")
+    assert list(iter_rows(str(numbers))) == [1, 22, 333, 4444]
+
+
+@pytest.mark.db
+def test_iter_rows_jsonl_and_empty(tmp_path, small_reads):
+    f = tmp_path / "rows.jsonl"
+    f.write_text("\n".join(json.dumps(r) for r in ROWS) + "\n\n", encoding="utf-8")
+    assert list(iter_rows(str(f))) == ROWS
+    assert file_scraper(str(f)) == ROWS
+
+    for text in ("", "   \n", "[]", " [ ]\n"):
+        f.write_text(text, encoding="utf-8")
+        assert not list(iter_rows(str(f)))
+
+
+@pytest.mark.db
+def test_iter_rows_errors(tmp_path, small_reads):
+    with pytest.raises(FileNotFoundError):
+        iter_rows(str(tmp_path / "missing.json"))
+
+    f = tmp_path / "truncated.json"
+    f.write_text(json.dumps(ROWS)[:-10], encoding="utf-8")
+    rows = iter_rows(str(f))
+    assert next(rows) == ROWS[0]
+    with pytest.raises(json.JSONDecodeError):
+        list(rows)
+
+
+@pytest.mark.db
+def test_iter_batches():
+    assert [len(b) for b in iter_batches(iter(range(7)), 3)] == [3, 3, 1]
+    assert not list(iter_batches([], 3))
+
+
+@pytest.mark.integration
+def test_pull_and_load_consumes_in_chunks(test_db, monkeypatch):
+    taken = []
+
+    def scraper():
+        for i in range(7):
+            taken.append(i)
+            yield {"url": f"s{i % 5}", "program": "CS, JHU"}
+
+    seen = []
+    insert = etl.insert_applicants
+    monkeypatch.setattr(
+        etl,
+        "insert_applicants",
+        lambda db, rows, **kw: seen.append(len(taken)) or insert(db, rows, **kw),
+    )
+    assert pull_and_load(test_db, scraper, workers=1, chunk_size=3)["total_rows"] == 5
+    # each chunk is inserted before the next one is read
+    assert seen == [3, 6, 7]
+
+
+@pytest.mark.integration
+def test_pull_and_load_parallel_sums_partition_stats(test_db, monkeypatch):
+    monkeypatch.setattr(etl, "ProcessPoolExecutor", ThreadPoolExecutor)
+    rows = [{"url": f"q{i}", "program": "CS, JHU"} for i in range(12)]
+
+    result = pull_and_load(test_db, lambda: iter(rows), workers=2, chunk_size=5)
+    assert result["total_rows"] == 12
+    assert sum(s["rows"] for s in result["partitions"]) == 12
+    assert sum(s["inserted"] for s in result["partitions"]) == 12
+    assert [s["partition"] for s in result["partitions"]] == [0, 1]
@@ -20,13 +20,32 @@ CREATE TABLE IF NOT EXISTS applicants (
 -- Unique constraint for idempotency
 CREATE UNIQUE INDEX IF NOT EXISTS uq_applicants_url ON applicants(url);
 
+-- "Fall 2026" -> ('Fall', 2026), generated from term (NULL for other shapes),
+-- so term filters use an index instead of TRIM(term) on every row
+ALTER TABLE applicants
+  ADD COLUMN IF NOT EXISTS term_season TEXT GENERATED ALWAYS AS (
+    CASE WHEN btrim(term) ~ '^[A-Za-z]+ [0-9]{4}$'
+         THEN split_part(btrim(term), ' ', 1) END
+  ) STORED,
+  ADD COLUMN IF NOT EXISTS term_year INTEGER GENERATED ALWAYS AS (
+    CASE WHEN btrim(term) ~ '^[A-Za-z]+ [0-9]{4}$'
+         THEN split_part(btrim(term), ' ', 2)::integer END
+  ) STORED;
+CREATE INDEX IF NOT EXISTS ix_applicants_term ON applicants(term_year, term_season, status);
+
 -- Watermarks for incremental ingestion (idempotent scraping)
 CREATE TABLE IF NOT EXISTS ingestion_watermarks (
   source TEXT PRIMARY KEY,
   last_seen TEXT,
+  byte_offset BIGINT,
+  fingerprint TEXT,
   updated_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Byte-offset watermark for tail-following the seed file (upgrades existing volumes)
+ALTER TABLE ingestion_watermarks ADD COLUMN IF NOT EXISTS byte_offset BIGINT;
+ALTER TABLE ingestion_watermarks ADD COLUMN IF NOT EXISTS fingerprint TEXT;
+
 -- Optional analytics cache that worker writes and web reads
 CREATE TABLE IF NOT EXISTS analytics_cache (
   key TEXT PRIMARY KEY,
@@ -10,6 +10,9 @@ from .db import DB, connect
 
 APPLICANTS_TABLE = "applicants"
 
+# (term_season, term_year) parameters; both columns are generated from term.
+FALL_2026 = ("Fall", 2026)
+
 EXPECTED_KEYS = [
     "Fall 2026 Applicants",
     "International Percentage",
@@ -74,8 +77,10 @@ def compute_live_metrics(db: DB) -> Dict[str, Any]:
 
     fall_2026_applicants = run_scalar(
         db,
-        sql.SQL("SELECT COUNT(*) FROM {t} WHERE TRIM(term) = %s LIMIT 1;").format(t=tbl),
-        ("Fall 2026",),
+        sql.SQL(
+            "SELECT COUNT(*) FROM {t} WHERE term_season = %s AND term_year = %s LIMIT 1;"
+        ).format(t=tbl),
+        FALL_2026,
     )
 
     international_pct = run_scalar(
@@ -116,13 +121,13 @@ def compute_live_metrics(db: DB) -> Dict[str, Any]:
             """
             SELECT ROUND(AVG(gpa)::numeric, 2)
             FROM {t}
-            WHERE TRIM(term) = %s
+            WHERE term_season = %s AND term_year = %s
               AND us_or_international = %s
               AND gpa IS NOT NULL
             LIMIT 1;
             """
         ).format(t=tbl),
-        ("Fall 2026", "American"),
+        (*FALL_2026, "American"),
     )
 
     acceptance_rate_fall = run_scalar(
@@ -131,18 +136,20 @@ def compute_live_metrics(db: DB) -> Dict[str, Any]:
             """
             SELECT
               CASE
-                WHEN (SELECT COUNT(*) FROM {t} WHERE TRIM(term) = %s) = 0 THEN 0
+                WHEN (SELECT COUNT(*) FROM {t} WHERE term_season = %s AND term_year = %s) = 0 THEN 0
                 ELSE ROUND(
-                  (100.0 * COUNT(*) / (SELECT COUNT(*) FROM {t} WHERE TRIM(term) = %s))::numeric,
+                  (100.0 * COUNT(*) / (
+                    SELECT COUNT(*) FROM {t} WHERE term_season = %s AND term_year = %s
+                  ))::numeric,
                   2
                 )
               END
             FROM {t}
-            WHERE TRIM(term) = %s AND status = %s
+            WHERE term_season = %s AND term_year = %s AND status = %s
             LIMIT 1;
             """
         ).format(t=tbl),
-        ("Fall 2026", "Fall 2026", "Fall 2026", "Accepted"),
+        (*FALL_2026, *FALL_2026, *FALL_2026, "Accepted"),
     )
 
     avg_gpa_accepted_fall = run_scalar(
@@ -151,11 +158,11 @@ def compute_live_metrics(db: DB) -> Dict[str, Any]:
             """
             SELECT ROUND(AVG(gpa)::numeric, 2)
             FROM {t}
-            WHERE TRIM(term) = %s AND status = %s AND gpa IS NOT NULL
+            WHERE term_season = %s AND term_year = %s AND status = %s AND gpa IS NOT NULL
             LIMIT 1;
             """
         ).format(t=tbl),
-        ("Fall 2026", "Accepted"),
+        (*FALL_2026, "Accepted"),
     )
 
     jhu_masters_cs = run_scalar(
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 from typing import Any, Callable, Dict, Tuple
 
@@ -9,15 +10,25 @@ import psycopg
 
 from src.worker.etl.db_ops import (
     insert_applicants,
+    parallel_insert_applicants,
+    read_file_position,
     read_watermark,
     upsert_analytics_cache,
+    write_file_position,
     write_watermark,
 )
-from src.worker.etl.incremental_scraper import incremental_from_watermark, load_all
+from src.worker.etl.incremental_scraper import (
+    incremental_from_watermark,
+    latest_date,
+    load_all,
+    read_appended,
+)
 from src.worker.etl.query_data import recompute_metrics
 
 from src.common.amqp import EXCHANGE, QUEUE, ROUTING_KEY
 
+logger = logging.getLogger(__name__)
+
 
 def _open_rmq_channel() -> Tuple[pika.BlockingConnection,
                                  pika.adapters.blocking_connection.BlockingChannel]:
@@ -41,24 +52,56 @@ def _open_db() -> psycopg.Connection:
     return psycopg.connect(dsn)
 
 
+def get_ingest_workers() -> int:
+    """Loader processes per ingest (INGEST_WORKERS, default 1 = the task's own connection)."""
+    value = os.environ.get("INGEST_WORKERS", "1")
+    try:
+        return max(1, int(value))
+    except ValueError as exc:
+        raise RuntimeError(f"INGEST_WORKERS must be an integer, got {value!r}") from exc
+
+
 def handle_scrape_new_data(conn: psycopg.Connection, payload: Dict[str, Any]) -> None:
-    """Incrementally ingest new rows from a local JSON file using a watermark."""
+    """
+    Ingest rows appended to the local seed file since the last run.
+
+    A byte-offset watermark lets the worker seek past data it already
+    loaded; if the file was rewritten, read_appended falls back to a full
+    scan. An explicit payload "since" date replays from that date instead.
+
+    On the byte-offset path every appended row is ingested, including rows
+    without a parseable date_added: the offset already moves past them, so
+    skipping them would lose them for good, and the url conflict key keeps
+    re-reads idempotent. Dates only advance the date watermark used by
+    "since" replays (which, unlike this path, skip dateless rows).
+    """
     seed_json = os.environ.get("SEED_JSON", "/data/applicant_data.json")
     source = os.environ.get("WATERMARK_SOURCE", "applicant_data")
 
     since = payload.get("since")
-    if since is None:
-        since = read_watermark(conn, source)
-
-    rows = load_all(seed_json)
-    new_rows, new_last_seen = incremental_from_watermark(rows, since)
+    if since is not None:
+        rows = load_all(seed_json)
+        new_rows, new_last_seen = incremental_from_watermark(rows, since)
+    else:
+        appended = read_appended(seed_json, read_file_position(conn, source))
+        logger.info(
+            "%s: %d rows up to byte %d%s", source, len(appended.rows), appended.offset,
+            " (full scan)" if appended.full_scan else "",
+        )
+        write_file_position(conn, source, appended.offset, appended.fingerprint)
+        new_rows = appended.rows
+        new_last_seen = latest_date(new_rows, read_watermark(conn, source))
 
     if not new_rows:
         return
 
-    _ = insert_applicants(conn, new_rows)
+    workers = get_ingest_workers()
+    if workers > 1:
+        _ = parallel_insert_applicants(os.environ["DATABASE_URL"], new_rows, workers)
+    else:
+        _ = insert_applicants(conn, new_rows)
 
-    if new_last_seen is not None: # pragma: no cover
+    if new_last_seen is not None:
         write_watermark(conn, source, new_last_seen)
 
     metrics = recompute_metrics(conn)
@@ -110,6 +153,9 @@ def _on_message(ch, method, properties, body: bytes) -> None:
 
 def main() -> int:
     """Worker process main loop: connect and consume."""
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    get_ingest_workers()  # fail at startup, not on every scrape task
     conn, ch = _open_rmq_channel()
     try:
         ch.basic_consume(queue=QUEUE, on_message_callback=_on_message, auto_ack=False)
@@ -1,13 +1,39 @@
 from __future__ import annotations
 
+import logging
 import re
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import psycopg
 from psycopg import sql
 
 APPLICANTS_TABLE = "applicants"
+STAGING_TABLE = "applicants_staging"
+DEFAULT_BATCH_SIZE = 5000
+
+# Insert column order; applicant_params builds tuples in this order.
+APPLICANT_COLUMNS = (
+    "program",
+    "comments",
+    "date_added",
+    "url",
+    "status",
+    "term",
+    "us_or_international",
+    "gpa",
+    "gre",
+    "gre_v",
+    "gre_aw",
+    "degree",
+    "llm_generated_program",
+    "llm_generated_university",
+)
+
+logger = logging.getLogger(__name__)
 
 _FLOAT_RE = re.compile(r"\d+(\.\d+)?")
 _DATE_RE = re.compile(r"^\s*(\d{4})-(\d{2})-(\d{2})\s*$")
@@ -72,79 +98,175 @@ def write_watermark(conn: psycopg.Connection, source: str, last_seen: str) -> No
         )
 
 
-def insert_applicants(conn: psycopg.Connection, rows: List[Dict]) -> int:
+def read_file_position(conn: psycopg.Connection, source: str) -> Optional[Tuple[int, str]]:
+    """Read the (byte offset, fingerprint) watermark for a file source, if any."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT byte_offset, fingerprint FROM ingestion_watermarks WHERE source = %s;",
+            (source,),
+        )
+        row = cur.fetchone()
+        if not row or row[0] is None or row[1] is None:
+            return None
+        return int(row[0]), row[1]
+
+
+def write_file_position(conn: psycopg.Connection, source: str,
+                        offset: int, fingerprint: str) -> None:
+    """Upsert the byte-offset watermark for a file source."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO ingestion_watermarks (source, byte_offset, fingerprint)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (source)
+            DO UPDATE SET byte_offset = EXCLUDED.byte_offset,
+                          fingerprint = EXCLUDED.fingerprint,
+                          updated_at = now();
+            """,
+            (source, offset, fingerprint),
+        )
+
+
+def applicant_params(row: Dict) -> Tuple:
+    """Normalize one scraped row into APPLICANT_COLUMNS order."""
+    return (
+        clean_text(row.get("program")),
+        clean_text(row.get("comments")),
+        safe_date(row.get("date_added")),
+        clean_text(row.get("url")),
+        clean_text(row.get("applicant_status") or row.get("status")),
+        clean_text(row.get("semester_year_start") or row.get("term")),
+        clean_text(row.get("citizenship") or row.get("us_or_international")),
+        safe_float(row.get("gpa")),
+        safe_float(row.get("gre")),
+        safe_float(row.get("gre_v")),
+        safe_float(row.get("gre_aw")),
+        clean_text(row.get("masters_or_phd") or row.get("degree")),
+        clean_text(row.get("llm-generated-program") or row.get("llm_generated_program")),
+        clean_text(row.get("llm-generated-university") or
+                   row.get("llm_generated_university")),
+    )
+
+
+def insert_applicants(conn: psycopg.Connection, rows: List[Dict],
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> int:
     """
-    Insert applicants using parameter binding and ON CONFLICT DO NOTHING (idempotent).
-    Returns count of inserted rows (sum of cursor.rowcount).
+    Insert applicants through a temp staging table (idempotent).
+
+    Each batch is COPYed into STAGING_TABLE, then merged with one
+    INSERT ... SELECT ... ON CONFLICT (url) DO NOTHING, so the task holds one
+    statement's worth of row locks per batch instead of one INSERT per row.
+    Temp tables are never WAL-logged and live only as long as the connection.
+    Returns count of inserted rows (sum of the merge rowcounts). Per-batch
+    timings are logged at INFO.
     """
-    stmt = sql.SQL(
+    if not rows:
+        return 0
+
+    columns = sql.SQL(", ").join(sql.Identifier(c) for c in APPLICANT_COLUMNS)
+    staging = sql.Identifier(STAGING_TABLE)
+    create = sql.SQL(
+        "CREATE TEMP TABLE IF NOT EXISTS {staging} AS "
+        "SELECT {columns} FROM {table} WITH NO DATA;"
+    ).format(staging=staging, columns=columns, table=sql.Identifier(APPLICANTS_TABLE))
+    copy = sql.SQL("COPY {staging} ({columns}) FROM STDIN").format(
+        staging=staging, columns=columns
+    )
+    merge = sql.SQL(
         """
-        INSERT INTO {table} (
-            program,
-            comments,
-            date_added,
-            url,
-            status,
-            term,
-            us_or_international,
-            gpa,
-            gre,
-            gre_v,
-            gre_aw,
-            degree,
-            llm_generated_program,
-            llm_generated_university
-        )
-        VALUES (
-            {program},{comments},{date_added},{url},{status},{term},{us_int},
-            {gpa},{gre},{gre_v},{gre_aw},{degree},{llm_prog},{llm_uni}
-        )
+        INSERT INTO {table} ({columns})
+        SELECT {columns} FROM {staging}
         ON CONFLICT (url) DO NOTHING;
         """
-    ).format(
-        table=sql.Identifier(APPLICANTS_TABLE),
-        program=sql.Placeholder(),
-        comments=sql.Placeholder(),
-        date_added=sql.Placeholder(),
-        url=sql.Placeholder(),
-        status=sql.Placeholder(),
-        term=sql.Placeholder(),
-        us_int=sql.Placeholder(),
-        gpa=sql.Placeholder(),
-        gre=sql.Placeholder(),
-        gre_v=sql.Placeholder(),
-        gre_aw=sql.Placeholder(),
-        degree=sql.Placeholder(),
-        llm_prog=sql.Placeholder(),
-        llm_uni=sql.Placeholder(),
-    )
+    ).format(table=sql.Identifier(APPLICANTS_TABLE), columns=columns, staging=staging)
+    truncate = sql.SQL("TRUNCATE {staging};").format(staging=staging)
 
+    batch_size = max(1, batch_size)
     inserted = 0
+    started = time.perf_counter()
     with conn.cursor() as cur:
-        for row in rows:
-            params = (
-                clean_text(row.get("program")),
-                clean_text(row.get("comments")),
-                safe_date(row.get("date_added")),
-                clean_text(row.get("url")),
-                clean_text(row.get("applicant_status") or row.get("status")),
-                clean_text(row.get("semester_year_start") or row.get("term")),
-                clean_text(row.get("citizenship") or row.get("us_or_international")),
-                safe_float(row.get("gpa")),
-                safe_float(row.get("gre")),
-                safe_float(row.get("gre_v")),
-                safe_float(row.get("gre_aw")),
-                clean_text(row.get("masters_or_phd") or row.get("degree")),
-                clean_text(row.get("llm-generated-program") or row.get("llm_generated_program")),
-                clean_text(row.get("llm-generated-university") or
-                           row.get("llm_generated_university")),
-            )
-            cur.execute(stmt, params)
+        cur.execute(create)
+        for number, start in enumerate(range(0, len(rows), batch_size), 1):
+            batch = rows[start:start + batch_size]
+            t0 = time.perf_counter()
+            cur.execute(truncate)  # also clears rows left by an earlier call
+            with cur.copy(copy) as writer:
+                for row in batch:
+                    writer.write_row(applicant_params(row))
+            t1 = time.perf_counter()
+            cur.execute(merge)
             inserted += cur.rowcount
+            t2 = time.perf_counter()
+            logger.info(
+                "ingest batch %d: %d rows, %d inserted, copy %.3fs, merge %.3fs",
+                number, len(batch), cur.rowcount, t1 - t0, t2 - t1,
+            )
 
+    logger.info(
+        "ingested %d rows (%d new) in %.3fs", len(rows), inserted, time.perf_counter() - started
+    )
     return inserted
 
 
+def partition_rows(rows: List[Dict], partitions: int) -> List[List[Dict]]:
+    """
+    Split rows into ``partitions`` lists by a stable hash of the cleaned URL.
+
+    Rows sharing a URL always land in the same partition, so concurrent
+    loaders never contend on the same ON CONFLICT (url) key.
+    """
+    parts: List[List[Dict]] = [[] for _ in range(max(1, partitions))]
+    for row in rows:
+        key = (clean_text(row.get("url")) or "").encode("utf-8")
+        parts[zlib.crc32(key) % len(parts)].append(row)
+    return parts
+
+
+def _load_partition(job: Tuple[str, int, List[Dict], int]) -> Dict[str, object]:
+    """Worker-process body: stage and merge one partition on its own connection."""
+    dsn, index, rows, batch_size = job
+    started = time.perf_counter()
+    with psycopg.connect(dsn) as conn:
+        inserted = insert_applicants(conn, rows, batch_size=batch_size)
+        conn.commit()
+    seconds = time.perf_counter() - started
+    return {
+        "partition": index,
+        "rows": len(rows),
+        "inserted": inserted,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(len(rows) / seconds, 1) if seconds else 0.0,
+    }
+
+
+def parallel_insert_applicants(dsn: str, rows: List[Dict], workers: int,
+                               batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Load URL-hash partitions of rows concurrently, one process and connection each.
+
+    Each partition commits on its own, outside the caller's transaction; the
+    inserts stay idempotent, so a task retried after a later failure skips
+    rows already loaded. Logs rows/sec per partition; returns rows inserted.
+    """
+    jobs = [
+        (dsn, index, part, batch_size)
+        for index, part in enumerate(partition_rows(rows, workers))
+        if part
+    ]
+    if not jobs:
+        return 0
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        stats = list(pool.map(_load_partition, jobs))
+    for stat in stats:
+        logger.info(
+            "partition %d: %d rows, %d inserted in %.3fs (%.0f rows/s)",
+            stat["partition"], stat["rows"], stat["inserted"],
+            stat["seconds"], stat["rows_per_sec"],
+        )
+    return sum(int(stat["inserted"]) for stat in stats)
+
+
 def upsert_analytics_cache(conn: psycopg.Connection, metrics: Dict[str, str]) -> None:
     """Upsert computed metrics into analytics_cache."""
     with conn.cursor() as cur:
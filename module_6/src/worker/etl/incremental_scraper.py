@@ -1,10 +1,24 @@
 from __future__ import annotations
 
+import codecs
+import hashlib
 import json
+import re
+from dataclasses import dataclass
 from datetime import date, datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+# Bytes hashed at the start of the file and just before the stored offset.
+FINGERPRINT_WINDOW = 1 << 16
+# Bytes read per step when parsing appended JSON array elements.
+READ_CHUNK = 1 << 16
+_ARRAY_GAP = " \t\r\n,"
+_ELEMENT_END = _ARRAY_GAP + "]"
+# What a JSON value cut at EOF can leave after the decoder's error position:
+# part of a number, a literal (tru, nul) or a \uXXXX escape.
+_TOKEN_FRAGMENT = re.compile(r"[\w.+-]*")
+
 
 def _parse_date(value: object) -> Optional[date]:
     """
@@ -65,3 +79,142 @@ def incremental_from_watermark(rows: List[Dict],
                 max_seen = iso
 
     return new_rows, max_seen
+
+
+def latest_date(rows: List[Dict], last_seen: Optional[str]) -> Optional[str]:
+    """Newest ISO date_added among rows, never older than last_seen."""
+    latest = last_seen
+    for row in rows:
+        parsed = _parse_date(row.get("date_added"))
+        if parsed is not None and (latest is None or parsed.isoformat() > latest):
+            latest = parsed.isoformat()
+    return latest
+
+
+def file_fingerprint(path: str, offset: int) -> str:
+    """
+    Hash of the file's first FINGERPRINT_WINDOW bytes and the window ending
+    at `offset`. If either changed, the file was rewritten rather than
+    appended to, and the offset no longer points at the same data.
+    """
+    digest = hashlib.sha256(str(offset).encode("ascii"))
+    with open(path, "rb") as f:
+        digest.update(f.read(min(offset, FINGERPRINT_WINDOW)))
+        tail = max(FINGERPRINT_WINDOW, offset - FINGERPRINT_WINDOW)
+        if tail < offset:
+            f.seek(tail)
+            digest.update(f.read(offset - tail))
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class AppendedRows:
+    """Rows read past a byte-offset watermark, and the watermark to store next."""
+
+    rows: List[Dict]
+    offset: int
+    fingerprint: str
+    full_scan: bool
+
+
+def _read_jsonl_from(f, start: int) -> Tuple[List[Dict], int]:
+    """Complete JSONL records after `start`; a half-written last line is left for later."""
+    f.seek(start)
+    rows: List[Dict] = []
+    end = start
+    for line in f:
+        if line.strip():
+            try:
+                rows.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                if line.endswith(b"\n"):
+                    raise
+                break  # still being written, possibly mid-character
+        end += len(line)
+    return rows, end
+
+
+def _truncated(err: json.JSONDecodeError) -> bool:
+    """True if the decode error only says the input ended mid-value."""
+    if err.msg.startswith("Unterminated string"):
+        return True  # no closing quote anywhere before EOF
+    return _TOKEN_FRAGMENT.fullmatch(err.doc[err.pos:].strip()) is not None
+
+
+def _read_array_from(f, start: int) -> Tuple[List[Dict], int]:
+    """
+    JSON array elements after `start`, parsed READ_CHUNK bytes at a time so
+    only one chunk and the element being parsed are held in memory. The
+    returned offset sits just past the last element (before any "]"), so
+    elements appended before the closing bracket are picked up next time.
+    An element cut off at EOF (even inside a multi-byte character) is left
+    for later; a malformed one before EOF raises, like a bad complete JSONL
+    line.
+    """
+    f.seek(start)
+    # final=False holds back a trailing partial UTF-8 sequence instead of raising.
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    decoder = json.JSONDecoder()
+    rows: List[Dict] = []
+    text = ""  # decoded input not yet consumed; starts at byte offset `end`
+    end = start
+    opened = start != 0
+    closed = False
+    while not closed:
+        chunk = f.read(READ_CHUNK)
+        text += utf8.decode(chunk, final=False)
+        pos = consumed = 0
+        if not opened:
+            bracket = text.find("[")
+            opened = bracket >= 0
+            pos = consumed = bracket + 1 if opened else len(text)
+        while opened:
+            while pos < len(text) and text[pos] in _ARRAY_GAP:
+                pos += 1
+            if pos >= len(text):
+                break
+            if text[pos] == "]":
+                closed = True
+                break
+            try:
+                row, pos = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as err:
+                if not _truncated(err):
+                    raise
+                break  # continues in the next chunk, or is still being written
+            if chunk and (pos == len(text) or text[pos] not in _ELEMENT_END):
+                break  # a number at the chunk edge may go on ("12" of "12.5")
+            rows.append(row)
+            consumed = pos
+        end += len(text[:consumed].encode("utf-8"))
+        text = text[consumed:]
+        closed = closed or not chunk
+    return rows, end
+
+
+def read_appended(path: str, position: Optional[Tuple[int, str]]) -> AppendedRows:
+    """
+    Parse only what was appended since `position` (byte offset, fingerprint).
+
+    With no position, or when the file is shorter than the offset or its
+    fingerprint differs (it was rewritten, not appended to), the whole file
+    is scanned again; inserts are idempotent, so re-read rows are skipped.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Missing seed JSON: {p.resolve()}")
+
+    start = 0
+    if position is not None:
+        offset, fingerprint = position
+        if offset <= p.stat().st_size and file_fingerprint(path, offset) == fingerprint:
+            start = offset
+
+    with p.open("rb") as f:
+        is_array = f.read(FINGERPRINT_WINDOW).lstrip()[:1] == b"["
+        if is_array:
+            rows, end = _read_array_from(f, start)
+        else:
+            rows, end = _read_jsonl_from(f, start)
+
+    return AppendedRows(rows, end, file_fingerprint(path, end), full_scan=start == 0)
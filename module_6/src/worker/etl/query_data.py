@@ -29,8 +29,10 @@ def recompute_metrics(conn: psycopg.Connection) -> Dict[str, str]:
 
     fall_2026 = _scalar(
         conn,
-        sql.SQL("SELECT COUNT(*) FROM {t} WHERE TRIM(term) = %s LIMIT 1;").format(t=tbl),
-        ("Fall 2026",),
+        sql.SQL(
+            "SELECT COUNT(*) FROM {t} WHERE term_season = %s AND term_year = %s LIMIT 1;"
+        ).format(t=tbl),
+        ("Fall", 2026),
     )
 
     intl_pct = _scalar(
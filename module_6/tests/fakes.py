@@ -3,16 +3,36 @@ from __future__ import annotations
 from typing import Any, Callable, List, Optional, Tuple
 
 
+class FakeCopy:
+    def __init__(self, stmt: str):
+        self.stmt = stmt
+        self.rows: List[tuple] = []
+
+    def write_row(self, row):
+        self.rows.append(tuple(row))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
 class FakeCursor:
     def __init__(self, fetchone_queue: Optional[List[Any]] = None, fetchall_value=None):
         self.fetchone_queue = list(fetchone_queue or [])
         self.fetchall_value = fetchall_value
         self.executed: List[Tuple[str, tuple]] = []
+        self.copies: List[FakeCopy] = []
         self.rowcount = 0
 
     def execute(self, stmt, params=()):
         self.executed.append((str(stmt), tuple(params)))
 
+    def copy(self, stmt):
+        self.copies.append(FakeCopy(str(stmt)))
+        return self.copies[-1]
+
     def fetchone(self):
         if self.fetchone_queue:
             return self.fetchone_queue.pop(0)
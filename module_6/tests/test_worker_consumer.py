@@ -74,12 +74,88 @@ def test_handle_scrape_new_data_uses_payload_since(env, monkeypatch):
     assert calls["cache"] == 1
 
 
-def test_handle_scrape_new_data_no_new_rows_returns(env, monkeypatch):
+def _stub_file_tail(monkeypatch, c, rows, positions):
+    from src.worker.etl.incremental_scraper import AppendedRows
+
+    monkeypatch.setattr(c, "read_file_position", lambda conn, source: (10, "old"))
+    monkeypatch.setattr(
+        c, "read_appended",
+        lambda path, position: AppendedRows(rows, 42, "new", full_scan=False),
+    )
+    monkeypatch.setattr(
+        c, "write_file_position",
+        lambda conn, source, offset, fp: positions.append((source, offset, fp)),
+    )
+
+
+def test_handle_scrape_new_data_tails_file_from_offset(env, monkeypatch, caplog):
+    import src.worker.consumer as c
+
+    monkeypatch.setenv("WATERMARK_SOURCE", "applicant_data")
+    positions = []
+    _stub_file_tail(monkeypatch, c, [{"date_added": "2026-01-03", "url": "u"}], positions)
+    monkeypatch.setattr(c, "load_all", lambda path: pytest.fail("full file parse"))
+    monkeypatch.setattr(c, "read_watermark", lambda conn, source: "2026-01-01")
+
+    calls = []
+    monkeypatch.setattr(c, "insert_applicants", lambda conn, rows: calls.append(len(rows)))
+    monkeypatch.setattr(c, "write_watermark", lambda conn, source, ls: calls.append(ls))
+    monkeypatch.setattr(c, "recompute_metrics", lambda conn: {})
+    monkeypatch.setattr(c, "upsert_analytics_cache", lambda conn, m: calls.append("cache"))
+
+    with caplog.at_level("INFO", logger=c.__name__):
+        c.handle_scrape_new_data(FakeConn(lambda: FakeCursor()), payload={})
+
+    assert positions == [("applicant_data", 42, "new")]
+    assert calls == [1, "2026-01-03", "cache"]
+    assert "1 rows up to byte 42" in caplog.text
+
+
+def test_handle_scrape_new_data_accepts_dateless_appended_rows(env, monkeypatch):
+    import src.worker.consumer as c
+
+    rows = [{"date_added": "2026-01-03", "url": "a"}, {"url": "b"}, {"date_added": "?", "url": "c"}]
+    _stub_file_tail(monkeypatch, c, rows, [])
+    monkeypatch.setattr(c, "read_watermark", lambda conn, source: "2026-01-01")
+    monkeypatch.setattr(c, "recompute_metrics", lambda conn: {})
+    monkeypatch.setattr(c, "upsert_analytics_cache", lambda conn, m: None)
+
+    calls = []
+    monkeypatch.setattr(c, "insert_applicants", lambda conn, rows: calls.append([r["url"] for r in rows]))
+    monkeypatch.setattr(c, "write_watermark", lambda conn, source, ls: calls.append(ls))
+
+    c.handle_scrape_new_data(FakeConn(lambda: FakeCursor()), payload={})
+    # the offset is this path's watermark; dates only advance the date watermark
+    assert calls == [["a", "b", "c"], "2026-01-03"]
+
+
+def test_handle_scrape_new_data_parallel_with_ingest_workers(env, monkeypatch):
     import src.worker.consumer as c
 
+    monkeypatch.setenv("INGEST_WORKERS", "4")
+    _stub_file_tail(monkeypatch, c, [{"date_added": "bad", "url": "u"}], [])
+    monkeypatch.setattr(c, "read_watermark", lambda conn, source: None)
+    monkeypatch.setattr(c, "write_watermark", lambda conn, source, ls: pytest.fail("no date"))
+    monkeypatch.setattr(c, "recompute_metrics", lambda conn: {})
+    monkeypatch.setattr(c, "upsert_analytics_cache", lambda conn, m: None)
+
+    calls = []
+    monkeypatch.setattr(c, "insert_applicants", lambda conn, rows: calls.append("single"))
+    monkeypatch.setattr(
+        c, "parallel_insert_applicants",
+        lambda dsn, rows, workers: calls.append((dsn, workers)) or 1,
+    )
+
+    c.handle_scrape_new_data(FakeConn(lambda: FakeCursor()), payload={})
+    assert calls == [("postgresql://u:p@db:5432/x", 4)]
+
+
+def test_handle_scrape_new_data_no_new_rows_still_saves_offset(env, monkeypatch):
+    import src.worker.consumer as c
+
+    positions = []
+    _stub_file_tail(monkeypatch, c, [], positions)
     monkeypatch.setattr(c, "read_watermark", lambda conn, source: None)
-    monkeypatch.setattr(c, "load_all", lambda path: [])
-    monkeypatch.setattr(c, "incremental_from_watermark", lambda rows, since: ([], None))
 
     called = {"insert": 0}
     monkeypatch.setattr(c, "insert_applicants", lambda conn, rows: called.__setitem__("insert", 1))
@@ -88,6 +164,28 @@ def test_handle_scrape_new_data_no_new_rows_returns(env, monkeypatch):
     c.handle_scrape_new_data(conn, payload={})
 
     assert called["insert"] == 0
+    assert positions == [("applicant_data", 42, "new")]
+
+
+def test_get_ingest_workers_validates_and_clamps(monkeypatch):
+    import src.worker.consumer as c
+
+    monkeypatch.delenv("INGEST_WORKERS", raising=False)
+    assert c.get_ingest_workers() == 1
+    monkeypatch.setenv("INGEST_WORKERS", "0")
+    assert c.get_ingest_workers() == 1
+    monkeypatch.setenv("INGEST_WORKERS", "three")
+    with pytest.raises(RuntimeError, match="INGEST_WORKERS must be an integer"):
+        c.get_ingest_workers()
+
+
+def test_main_rejects_bad_ingest_workers_before_consuming(monkeypatch):
+    import src.worker.consumer as c
+
+    monkeypatch.setenv("INGEST_WORKERS", "4.5")
+    monkeypatch.setattr(c, "_open_rmq_channel", lambda: pytest.fail("connected"))
+    with pytest.raises(RuntimeError):
+        c.main()
 
 
 def test_handle_recompute_analytics_calls_cache(env, monkeypatch):
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import date
+
 from fakes import FakeConn, FakeCursor
 
 
@@ -22,36 +24,79 @@ def test_read_write_watermark():
     assert params == ("src", "2026-01-02")
 
 
-def test_insert_applicants_uses_parameters_and_conflict():
+def test_read_write_file_position():
     from src.worker.etl import db_ops as d
 
-    cur = FakeCursor()
-    # emulate rowcount increments (two inserts)
-    def cursor_factory():
-        return cur
+    cur1 = FakeCursor(fetchone_queue=[(1234, "abc")])
+    assert d.read_file_position(FakeConn(lambda: cur1), "src") == (1234, "abc")
+    assert "SELECT byte_offset, fingerprint" in cur1.executed[0][0]
+
+    # no row, or a row written before byte offsets were tracked
+    assert d.read_file_position(FakeConn(lambda: FakeCursor()), "src") is None
+    cur2 = FakeCursor(fetchone_queue=[(None, None)])
+    assert d.read_file_position(FakeConn(lambda: cur2), "src") is None
+
+    cur3 = FakeCursor()
+    d.write_file_position(FakeConn(lambda: cur3), "src", 99, "fp")
+    sql_text, params = cur3.executed[0]
+    assert "ON CONFLICT (source)" in sql_text and "byte_offset" in sql_text
+    assert params == ("src", 99, "fp")
 
-    conn = FakeConn(cursor_factory)
+
+def test_insert_applicants_stages_batches_and_merges(caplog):
+    from src.worker.etl import db_ops as d
+
+    cur = FakeCursor()
+    conn = FakeConn(lambda: cur)
 
     rows = [
         {"program": "P", "date_added": "2026-01-01", "url": "u1"},
         {"program": "P", "date_added": "2026-01-02", "url": "u2"},
+        {"program": "P", "date_added": "2026-01-03", "url": "u1"},
     ]
 
-    # monkey rowcount behavior
+    # emulate the merge: staged rows whose url is already stored are skipped
+    stored = set()
     orig_execute = cur.execute
     def execute(stmt, params=()):
         orig_execute(stmt, params)
-        cur.rowcount = 1
+        cur.rowcount = -1
+        if "ON CONFLICT" in str(stmt):
+            urls = {row[d.APPLICANT_COLUMNS.index("url")] for row in cur.copies[-1].rows}
+            cur.rowcount = len(urls - stored)
+            stored.update(urls)
     cur.execute = execute
 
-    inserted = d.insert_applicants(conn, rows)
+    with caplog.at_level("INFO", logger=d.__name__):
+        inserted = d.insert_applicants(conn, rows, batch_size=2)
     assert inserted == 2
 
-    stmt_text, params0 = cur.executed[0]
-    assert "ON CONFLICT (url) DO NOTHING" in stmt_text
-    # params should be a tuple, not string interpolation
-    assert isinstance(params0, tuple)
-    assert "u1" in params0
+    statements = [stmt for stmt, _ in cur.executed]
+    assert "CREATE TEMP TABLE IF NOT EXISTS" in statements[0]
+    merges = [stmt for stmt in statements if "ON CONFLICT (url) DO NOTHING" in stmt]
+    assert len(merges) == 2
+    assert "SELECT" in merges[0] and "applicants_staging" in merges[0]
+    assert sum("TRUNCATE" in stmt for stmt in statements) == 2
+
+    # rows go through COPY as typed tuples, not string interpolation
+    assert [len(c.rows) for c in cur.copies] == [2, 1]
+    assert "COPY" in cur.copies[0].stmt
+    first = cur.copies[0].rows[0]
+    assert first[d.APPLICANT_COLUMNS.index("url")] == "u1"
+    assert first[d.APPLICANT_COLUMNS.index("date_added")] == date(2026, 1, 1)
+
+    batches = [r.getMessage() for r in caplog.records if "ingest batch" in r.getMessage()]
+    assert len(batches) == 2
+    assert batches[0].startswith("ingest batch 1: 2 rows, 2 inserted")
+    assert batches[1].startswith("ingest batch 2: 1 rows, 0 inserted")
+
+
+def test_insert_applicants_empty_rows_skips_sql():
+    from src.worker.etl import db_ops as d
+
+    cur = FakeCursor()
+    assert d.insert_applicants(FakeConn(lambda: cur), []) == 0
+    assert cur.executed == []
 
 
 def test_upsert_analytics_cache():
@@ -62,4 +107,52 @@ def test_upsert_analytics_cache():
 
     d.upsert_analytics_cache(conn, {"A": "1", "B": "2"})
     assert len(cur.executed) == 2
-    assert "INSERT INTO analytics_cache" in cur.executed[0][0]
\ No newline at end of file
+    assert "INSERT INTO analytics_cache" in cur.executed[0][0]
+
+def test_partition_rows_keeps_urls_together():
+    from src.worker.etl import db_ops as d
+
+    rows = [{"url": f"u{i % 7}"} for i in range(30)] + [{"program": "no url"}]
+    parts = d.partition_rows(rows, 3)
+
+    assert sum(len(p) for p in parts) == len(rows)
+    homes = {}
+    for index, part in enumerate(parts):
+        for row in part:
+            assert homes.setdefault(row.get("url"), index) == index
+    assert d.partition_rows(rows, 0) == [rows]
+
+
+def test_parallel_insert_applicants_loads_each_partition(monkeypatch, caplog):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.worker.etl import db_ops as d
+
+    conns = []
+
+    def connect(dsn):
+        cur = FakeCursor()
+        orig_execute = cur.execute
+        def execute(stmt, params=()):
+            orig_execute(stmt, params)
+            cur.rowcount = sum(len(c.rows) for c in cur.copies[-1:])
+        cur.execute = execute
+        conns.append((dsn, cur, FakeConn(lambda: cur)))
+        return conns[-1][2]
+
+    # threads stand in for processes so the fakes stay visible here
+    monkeypatch.setattr(d, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(d.psycopg, "connect", connect)
+
+    rows = [{"url": f"u{i}"} for i in range(12)]
+    with caplog.at_level("INFO", logger=d.__name__):
+        assert d.parallel_insert_applicants("postgresql://db", rows, workers=3) == 12
+
+    assert {dsn for dsn, _, _ in conns} == {"postgresql://db"}
+    assert all(conn.committed == 1 for _, _, conn in conns)
+    assert sorted(len(cur.copies[0].rows) for _, cur, _ in conns) == sorted(
+        len(p) for p in d.partition_rows(rows, 3) if p
+    )
+    assert sum("rows/s" in r.getMessage() for r in caplog.records) == len(conns)
+
+    assert d.parallel_insert_applicants("postgresql://db", [], workers=3) == 0
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import json
 from pathlib import Path
 
@@ -46,4 +47,184 @@ def test_incremental_from_watermark():
 
     all_rows, last2 = incremental_from_watermark(rows, None)
     assert len(all_rows) == 2
-    assert last2 == "2026-01-02"
\ No newline at end of file
+    assert last2 == "2026-01-02"
+
+def test_latest_date_keeps_newest():
+    from src.worker.etl.incremental_scraper import latest_date
+
+    rows = [{"date_added": "January 3, 2026"}, {"date_added": "bad"}, {}]
+    assert latest_date(rows, "2026-01-01") == "2026-01-03"
+    assert latest_date(rows, "2026-02-01") == "2026-02-01"
+    assert latest_date([], None) is None
+
+
+def test_read_appended_jsonl_resumes_after_offset(tmp_path: Path):
+    from src.worker.etl.incremental_scraper import read_appended
+
+    p = tmp_path / "data.jsonl"
+    p.write_text('{"a":1}\n{"a":2}\n', encoding="utf-8")
+    first = read_appended(str(p), None)
+    assert first.rows == [{"a": 1}, {"a": 2}]
+    assert first.full_scan and first.offset == p.stat().st_size
+
+    with p.open("a", encoding="utf-8") as f:
+        f.write('{"a":3}\n\n{"a":4')  # last line still being written
+    second = read_appended(str(p), (first.offset, first.fingerprint))
+    assert second.rows == [{"a": 3}]
+    assert not second.full_scan
+
+    with p.open("a", encoding="utf-8") as f:
+        f.write("}\n")
+    third = read_appended(str(p), (second.offset, second.fingerprint))
+    assert third.rows == [{"a": 4}]
+
+    unchanged = read_appended(str(p), (third.offset, third.fingerprint))
+    assert unchanged.rows == [] and unchanged.offset == third.offset
+
+
+def test_read_appended_jsonl_bad_complete_line_raises(tmp_path: Path):
+    from src.worker.etl.incremental_scraper import read_appended
+
+    p = tmp_path / "data.jsonl"
+    p.write_text('{"a":1}\nnot json\n', encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        read_appended(str(p), None)
+
+
+def test_read_appended_array_resumes_before_closing_bracket(tmp_path: Path):
+    from src.worker.etl.incremental_scraper import read_appended
+
+    p = tmp_path / "data.json"
+    p.write_text('[\n{"a":1},\n{"a":2}\n]\n', encoding="utf-8")
+    first = read_appended(str(p), None)
+    assert first.rows == [{"a": 1}, {"a": 2}]
+    assert p.read_bytes()[first.offset:].strip() == b"]"
+
+    # writer replaces the closing bracket with more elements
+    head = p.read_bytes()[:first.offset]
+    p.write_bytes(head + b',\n{"a":3},\n{"a":4}\n]\n')
+    second = read_appended(str(p), (first.offset, first.fingerprint))
+    assert second.rows == [{"a": 3}, {"a": 4}]
+    assert not second.full_scan
+
+    # a truncated element is left for the next run
+    head = p.read_bytes()[:second.offset]
+    p.write_bytes(head + b',\n{"a":5},\n{"a":')
+    third = read_appended(str(p), (second.offset, second.fingerprint))
+    assert third.rows == [{"a": 5}]
+
+
+def test_read_appended_rewritten_file_rescans(tmp_path: Path):
+    from src.worker.etl.incremental_scraper import read_appended
+
+    p = tmp_path / "data.jsonl"
+    p.write_text('{"a":1}\n{"a":2}\n', encoding="utf-8")
+    first = read_appended(str(p), None)
+
+    p.write_text('{"b":1}\n{"b":2}\n{"b":3}\n', encoding="utf-8")
+    rewritten = read_appended(str(p), (first.offset, first.fingerprint))
+    assert rewritten.full_scan
+    assert len(rewritten.rows) == 3
+
+    p.write_text('{"c":1}\n', encoding="utf-8")  # shorter than the stored offset
+    shrunk = read_appended(str(p), (rewritten.offset, rewritten.fingerprint))
+    assert shrunk.full_scan and shrunk.rows == [{"c": 1}]
+
+
+def test_read_appended_large_file_fingerprints_tail_window(tmp_path: Path, monkeypatch):
+    from src.worker.etl import incremental_scraper as s
+
+    monkeypatch.setattr(s, "FINGERPRINT_WINDOW", 16)
+    p = tmp_path / "data.jsonl"
+    p.write_text("".join(f'{{"a":{i}}}\n' for i in range(10)), encoding="utf-8")
+    first = s.read_appended(str(p), None)
+
+    # an edit in the middle window (not the head) is still detected
+    data = bytearray(p.read_bytes())
+    data[first.offset - 3] = ord("8")
+    p.write_bytes(bytes(data) + b'{"a":10}\n')
+    again = s.read_appended(str(p), (first.offset, first.fingerprint))
+    assert again.full_scan and len(again.rows) == 11
+
+
+def test_read_appended_missing_raises(tmp_path: Path):
+    from src.worker.etl.incremental_scraper import read_appended
+
+    with pytest.raises(FileNotFoundError):
+        read_appended(str(tmp_path / "nope.json"), None)
+
+
+def test_read_appended_waits_for_split_multibyte_character(tmp_path: Path):
+    from src.worker.etl.incremental_scraper import read_appended
+
+    row = '{"program": "Génie"}'.encode("utf-8")
+    cut = row.index("é".encode("utf-8")) + 1  # inside the two-byte "é"
+
+    p = tmp_path / "data.jsonl"
+    p.write_bytes(b'{"a":1}\n' + row[:cut])
+    first = read_appended(str(p), None)
+    assert first.rows == [{"a": 1}] and first.offset == 8
+    with p.open("ab") as f:
+        f.write(row[cut:] + b"\n")
+    assert read_appended(str(p), (first.offset, first.fingerprint)).rows == [{"program": "Génie"}]
+
+    p = tmp_path / "data.json"
+    p.write_bytes(b'[{"a":1},' + row[:cut])
+    first = read_appended(str(p), None)
+    assert first.rows == [{"a": 1}]
+    with p.open("ab") as f:
+        f.write(row[cut:] + b"]")
+    assert read_appended(str(p), (first.offset, first.fingerprint)).rows == [{"program": "Génie"}]
+
+
+@pytest.mark.parametrize("chunk", [3, 1 << 16])
+def test_read_appended_array_any_cut_is_left_for_later(tmp_path: Path, monkeypatch, chunk):
+    from src.worker.etl import incremental_scraper as s
+    from src.worker.etl.incremental_scraper import read_appended
+
+    monkeypatch.setattr(s, "READ_CHUNK", chunk)
+
+    element = (
+        '{"url": "a\\"é", "n": -12.5e3, "ok": true, "x": null, '
+        '"l": [1, {"k": "v"}], "u": "\\u00e9"}'
+    ).encode("utf-8")
+    p = tmp_path / "data.json"
+    for cut in range(len(element)):
+        p.write_bytes(b'[{"a":1},\n' + element[:cut])
+        assert read_appended(str(p), None).rows == [{"a": 1}], element[:cut]
+
+
+def test_read_appended_array_bad_element_before_eof_raises(tmp_path: Path):
+    from src.worker.etl.incremental_scraper import read_appended
+
+    p = tmp_path / "data.json"
+    p.write_text('[{"url":"a"},{"url": bad},{"url":"c"}]', encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        read_appended(str(p), None)
+
+
+@pytest.mark.parametrize("chunk", [1, 4, 5, 9])
+def test_read_appended_array_reads_in_bounded_chunks(tmp_path: Path, monkeypatch, chunk):
+    from src.worker.etl import incremental_scraper as s
+
+    monkeypatch.setattr(s, "READ_CHUNK", chunk)
+    rows = [{"program": "Génie ✓", "n": 12345}, 678901, {"l": [1, "]"]}, 12345678.5, -2.5e10]
+    body = ", ".join(json.dumps(r, ensure_ascii=False) for r in rows)
+    data = (" " * 10 + "[" + body + "\n]\n").encode("utf-8")
+
+    sizes = []
+
+    class Recording(io.BytesIO):
+        def read(self, size=-1):
+            sizes.append(size)
+            return super().read(size)
+
+    got, end = s._read_array_from(Recording(data), 0)
+    assert got == rows  # numbers cut at a chunk edge are not taken early
+    assert data[end:].strip() == b"]"
+    assert set(sizes) == {chunk}  # never the whole remainder in one read
+
+    p = tmp_path / "data.json"
+    p.write_bytes(data[:end] + b",\n" + json.dumps({"a": "é" * 9}).encode("utf-8") + b"]")
+    again = s.read_appended(str(p), (end, s.file_fingerprint(str(p), end)))
+    assert again.rows == [{"a": "é" * 9}] and not again.full_scan